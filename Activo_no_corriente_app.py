@@ -1,21 +1,24 @@
 # =================================================================
 # APLICACIÓN CONSOLIDADA: ACTIVO NO CORRIENTE
 # =================================================================
+# PyPDF2 se importa dentro de las funciones que lo usan, para que el arranque
+# en frío no pague su costo de importación.
 import pandas as pd
-import numpy as np
-import random
-from faker import Faker
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import zscore
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
-from pandas.tseries.offsets import DateOffset
-from mpl_toolkits.mplot3d import Axes3D
 import streamlit as st
 import os
-import PyPDF2
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from datetime import date
+from auditoria_activos import UMBRAL_Z_MAQUINARIAS, UMBRAL_ZSCORE_INMUEBLES, CONTAMINACION
+from ingesta_activos import ruta_cache, ErrorValidacionDatos
+from esquema_activos import memoria_mb
+from historial_auditorias import HistorialAuditorias
+from ejecucion_paralela import CacheResultados
+from graficos_activos import sumar_por, contar_por, huella_agregado, especificacion_barras
+from consolidacion_activos import (CuboConsolidado, hechos_consolidados, huella_tipos_cambio, tipos_cambio,
+                                   fecha_minima, DIMENSIONES, MONEDA_BASE, RUTA_TIPOS_CAMBIO)
+from busqueda_informes import (IndiceInformes, IndexadorEnSegundoPlano, extraer_paginas, numero_paginas,
+                               DIRECTORIO_INFORMES)
 
 # =================================================================
 # CONFIGURACIÓN GENERAL
@@ -23,290 +26,32 @@ import PyPDF2
 st.set_page_config(layout="wide", page_title="Análisis de Activo No Corriente")
 
 # =================================================================
-# FUNCIONES DE GENERACIÓN DE DATOS - MAQUINARIAS
+# GRÁFICOS (VEGA-LITE SOBRE AGREGADOS DEL SERVIDOR)
 # =================================================================
 
-@st.cache_data
-def generar_datos_maquinarias():
-    """Genera datos simulados de inventario de maquinarias."""
-    fake = Faker('es_AR')
-    random.seed(42)
-    np.random.seed(42)
-    Faker.seed(42)
-    
-    num_equipos = 30
-    tipos_maquinaria = ["Torno CNC", "Fresadora", "Impresora industrial", "Camión", "Grua hidráulica"]
-    ubicaciones = ["Planta A", "Planta B", "Depósito Central", "Taller de Mantenimiento"]
-    estados = ["Operativo", "En reparación", "Fuera de servicio", "Pendiente de baja"]
-
-    maquinarias = []
-    for i in range(num_equipos):
-        tipo = random.choice(tipos_maquinaria)
-        fecha_adquisicion = fake.date_between(start_date='-10y', end_date='-1y')
-        valor_adquisicion = round(random.uniform(200000, 5000000), 2)
-        vida_util_anios = random.randint(5, 15)
-        maquinarias.append({
-            "id_equipo": f"EQ-{1000 + i}",
-            "tipo_equipo": tipo,
-            "descripcion": f"{tipo} modelo {fake.bothify(text='???-####')}",
-            "ubicacion": random.choice(ubicaciones),
-            "estado": random.choices(estados, weights=[0.7, 0.15, 0.1, 0.05])[0],
-            "fecha_adquisicion": fecha_adquisicion,
-            "valor_adquisicion": valor_adquisicion,
-            "vida_util_anios": vida_util_anios,
-            "fecha_fin_vida_util": fecha_adquisicion + timedelta(days=vida_util_anios * 365)
-        })
-    return pd.DataFrame(maquinarias)
-
-
-# =================================================================
-# FUNCIONES DE GENERACIÓN DE DATOS - INMUEBLES
-# =================================================================
-
-@st.cache_data
-def generar_datos_inmuebles():
-    """Genera datos simulados de inventario de inmuebles."""
-    fake = Faker('es_AR')
-    random.seed(101)
-    np.random.seed(101)
-    Faker.seed(101)
-
-    num_inmuebles = 30
-    tipos_inmuebles = ["Oficina", "Depósito", "Terreno", "Planta industrial",
-                      "Local comercial", "Edificio", "Galpón", "Centro logístico"]
-    estados_inmueble = ["Operativo", "Arrendado", "Mantenimiento", "Disponible", "Inactivo"]
-    ubicaciones = ["CABA", "Gran Buenos Aires", "Córdoba", "Mendoza", "Rosario", "Neuquén", "Salta"]
-
-    inmuebles = []
-    for i in range(num_inmuebles):
-        tipo = random.choice(tipos_inmuebles)
-        direccion = fake.address().replace("\n", ", ")
-        ciudad = random.choice(ubicaciones)
-        estado = random.choices(estados_inmueble, weights=[0.5, 0.2, 0.1, 0.1, 0.1])[0]
-        fecha_adquisicion = fake.date_between(start_date='-25y', end_date='-2y')
-        valor_adquisicion = round(random.uniform(100000.0, 15000000.0), 2)
-        superficie_m2 = round(random.uniform(100.0, 5000.0), 2)
-        
-        inmuebles.append({
-            "id_inmueble": f"INM-{1000 + i}",
-            "tipo_inmueble": tipo,
-            "direccion": direccion,
-            "ubicacion": ciudad,
-            "estado": estado,
-            "fecha_adquisicion": fecha_adquisicion,
-            "valor_adquisicion": valor_adquisicion,
-            "superficie_m2": superficie_m2
-        })
-    return pd.DataFrame(inmuebles)
-
-
-# =================================================================
-# FUNCIONES DE GENERACIÓN DE DATOS - ACTIVOS INTANGIBLES
-# =================================================================
-
-@st.cache_data
-def generar_datos_intangibles():
-    """Genera datos simulados de activos intangibles."""
-    np.random.seed(789)
-    random.seed(789)
-    fake = Faker('es_AR')
-    Faker.seed(789)
-
-    num_activos_intangibles = 30
-    tipos_activo_intangible = ['Software Licencia', 'Patente', 'Marca Registrada', 'Derechos de Autor',
-                               'Fondo de Comercio', 'Lista de Clientes', 'Tecnología no Patentada']
-    vida_util_rangos = {'Software Licencia': (3, 7), 'Patente': (10, 20), 'Marca Registrada': (5, 15),
-                        'Derechos de Autor': (5, 10), 'Fondo de Comercio': (5, 10), 'Lista de Clientes': (2, 5),
-                        'Tecnología no Patentada': (3, 8)}
-    empresas_propietarias = [
-        {'empresa_id': 3000 + i, 'nombre_empresa': fake.company(), 'cuit': fake.unique.bothify(text='30-########-#')}
-        for i in range(10)]
-
-    activos_intangibles = []
-    for i in range(num_activos_intangibles):
-        propietaria = random.choice(empresas_propietarias)
-        tipo = random.choice(tipos_activo_intangible)
-        fecha_adquisicion = fake.date_between(start_date='-10y', end_date='-30d')
-        min_vida, max_vida = vida_util_rangos.get(tipo, (5, 10))
-        vida_util_anios = random.randint(min_vida, max_vida)
-        costo_adquisicion = round(random.uniform(50000, 2000000), 2)
-        
-        today = datetime.now().date()
-        days_since_acquisition = (today - fecha_adquisicion).days
-        amortizacion_anual = costo_adquisicion / vida_util_anios
-        amortizacion_acumulada_simulada = round(amortizacion_anual * (days_since_acquisition / 365.25), 2)
-        amortizacion_acumulada_simulada = min(amortizacion_acumulada_simulada, costo_adquisicion)
-        valor_neto_contable_simulado = round(costo_adquisicion - amortizacion_acumulada_simulada, 2)
-        
-        if valor_neto_contable_simulado <= 0.01:
-            estado = 'Totalmente Amortizado'
-        else:
-            estado = 'Activo'
-        if random.random() < 0.05 and estado == 'Activo':
-            estado = 'Vendido'
-            
-        activos_intangibles.append({
-            'activo_id': f'INT-{30000 + i}',
-            'empresa_id': propietaria['empresa_id'],
-            'tipo_activo_intangible': tipo,
-            'fecha_adquisicion': fecha_adquisicion,
-            'costo_adquisicion': costo_adquisicion,
-            'vida_util_anios': vida_util_anios,
-            'amortizacion_acumulada_simulada': amortizacion_acumulada_simulada,
-            'valor_neto_contable_simulado': valor_neto_contable_simulado,
-            'estado_activo': estado,
-            'nombre_empresa_propietaria': propietaria['nombre_empresa'],
-            'cuit_empresa_propietaria': propietaria['cuit']
-        })
-
-    return pd.DataFrame(activos_intangibles)
-
-
-# =================================================================
-# FUNCIONES DE GENERACIÓN DE DATOS - OTROS ACTIVOS
-# =================================================================
-
-@st.cache_data
-def generar_datos_otros_activos():
-    """Genera datos simulados de otros activos no corrientes."""
-    np.random.seed(901)
-    random.seed(901)
-    fake = Faker('es_AR')
-    Faker.seed(901)
-
-    num_registros = 50
-    tipos_activo = ['Valores a cobrar LP', 'Inversiones a Largo Plazo', 
-                    'Activos por Impuestos Diferidos', 'Cuentas por Cobrar LP']
-    monedas = ['ARS', 'USD', 'EUR']
-
-    activos = []
-    for i in range(num_registros):
-        activos.append({
-            'id_activo': f'OA-{1000 + i}',
-            'tipo_activo': random.choice(tipos_activo),
-            'monto': round(random.uniform(10000, 250000), 2),
-            'moneda': random.choice(monedas),
-            'fecha_registro': fake.date_between(start_date='-120d', end_date='today'),
-            'descripcion': f'Activo {random.choice(tipos_activo)}'
-        })
-    return pd.DataFrame(activos)
-
-
-# =================================================================
-# FUNCIONES DE AUDITORÍA - MAQUINARIAS
-# =================================================================
-
-def auditar_maquinarias(df):
-    """Aplica auditoría a maquinarias."""
-    df['fecha_adquisicion'] = pd.to_datetime(df['fecha_adquisicion'])
-    df['fecha_fin_vida_util'] = pd.to_datetime(df['fecha_fin_vida_util'])
-    fecha_actual = datetime.now()
-    df['edad_anios'] = ((fecha_actual - df['fecha_adquisicion']).dt.days / 365.25).round(2)
-    df['vida_util_restante_anios'] = ((df['fecha_fin_vida_util'] - fecha_actual).dt.days / 365.25).round(2)
-    df.loc[df['vida_util_restante_anios'] < 0, 'vida_util_restante_anios'] = 0
-    df['valor_adquisicion_zscore'] = zscore(df['valor_adquisicion'])
-
-    umbral_z = 2.5
-    features = df[['valor_adquisicion', 'edad_anios', 'vida_util_restante_anios']].copy()
-    iso = IsolationForest(random_state=42, contamination=0.1)
-    df['is_anomaly_ia'] = iso.fit_predict(features)
-
-    df['alerta_combinada'] = df.apply(lambda row: 'Z-score alto y Anomalía IA' if (
-                abs(row['valor_adquisicion_zscore']) > umbral_z and row['is_anomaly_ia'] == -1) else (
-        'Z-score alto' if abs(row['valor_adquisicion_zscore']) > umbral_z else (
-            'Anomalía IA' if row['is_anomaly_ia'] == -1 else 'Sin alerta')), axis=1)
-
-    return df
-
-
-# =================================================================
-# FUNCIONES DE AUDITORÍA - INMUEBLES
-# =================================================================
-
-def auditar_inmuebles(df):
-    """Aplica auditoría a inmuebles."""
-    df['fecha_adquisicion'] = pd.to_datetime(df['fecha_adquisicion'], errors='coerce')
-    df['fecha_adquisicion'].fillna(pd.to_datetime('2020-01-01'), inplace=True)
-
-    if 'fecha_fin_vida_util' not in df.columns:
-        df['fecha_fin_vida_util'] = df.apply(
-            lambda row: row['fecha_adquisicion'] + DateOffset(years=np.random.randint(50, 100)), axis=1)
-    else:
-        df['fecha_fin_vida_util'] = pd.to_datetime(df['fecha_fin_vida_util'], errors='coerce')
-        df['fecha_fin_vida_util'].fillna(df['fecha_adquisicion'] + DateOffset(years=75), inplace=True)
-
-    fecha_actual_referencia = datetime.now()
-    df['edad_anios'] = ((fecha_actual_referencia - df['fecha_adquisicion']).dt.days / 365.25).round(2)
-    df['vida_util_restante_anios'] = ((df['fecha_fin_vida_util'] - fecha_actual_referencia).dt.days / 365.25).round(2)
-    df.loc[df['vida_util_restante_anios'] < 0, 'vida_util_restante_anios'] = 0
-
-    df['valor_adquisicion_zscore'] = zscore(df['valor_adquisicion'])
-    umbral_zscore = 3
-    df['is_anomaly_zscore'] = np.where(
-        (df['valor_adquisicion_zscore'] > umbral_zscore) | (df['valor_adquisicion_zscore'] < -umbral_zscore), -1, 1)
+@st.cache_data(max_entries=256, show_spinner=False)
+def _especificacion_cacheada(huella, _agregado, x, y, titulo, **opciones):
+    """Especificación Vega-Lite cacheada por la huella del agregado (no por las filas)."""
+    return especificacion_barras(_agregado, x, y, titulo, **opciones)
 
-    features_for_anomaly_detection = df[
-        ['valor_adquisicion', 'edad_anios', 'vida_util_restante_anios', 'superficie_m2']].copy()
-    features_for_anomaly_detection.replace([np.inf, -np.inf], np.nan, inplace=True)
-    features_for_anomaly_detection.fillna(features_for_anomaly_detection.median(), inplace=True)
 
-    iso_forest = IsolationForest(random_state=42, contamination=0.1)
-    df['is_anomaly_ia'] = iso_forest.fit_predict(features_for_anomaly_detection)
+def mostrar_barras(agregado, x, y, titulo, **opciones):
+    """Gráfico de barras interactivo de un agregado ya calculado en el servidor."""
+    especificacion = _especificacion_cacheada(huella_agregado(agregado), agregado, x, y, titulo, **opciones)
+    st.vega_lite_chart(spec=especificacion, width='stretch')
 
-    df['resultado_auditoria'] = 'Normal'
-    df.loc[
-        (df['is_anomaly_zscore'] == -1) & (df['is_anomaly_ia'] == -1), 'resultado_auditoria'] = 'Anomalía Z-score e IA'
-    df.loc[(df['is_anomaly_zscore'] == -1) & (df['is_anomaly_ia'] != -1), 'resultado_auditoria'] = 'Anomalía Z-score'
-    df.loc[(df['is_anomaly_zscore'] != -1) & (df['is_anomaly_ia'] == -1), 'resultado_auditoria'] = 'Anomalía IA'
-
-    return df
-
-
-# =================================================================
-# FUNCIONES DE AUDITORÍA - ACTIVOS INTANGIBLES
-# =================================================================
-
-def auditar_intangibles(df):
-    """Aplica auditoría a activos intangibles."""
-    df['fecha_adquisicion'] = pd.to_datetime(df['fecha_adquisicion'])
-    numeric_cols = ['costo_adquisicion', 'vida_util_anios', 'amortizacion_acumulada_simulada',
-                    'valor_neto_contable_simulado']
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    df.fillna(0, inplace=True)
-
-    df['valor_neto_calculado'] = df['costo_adquisicion'] - df['amortizacion_acumulada_simulada']
-    df['discrepancia_vnc'] = df['valor_neto_calculado'] - df['valor_neto_contable_simulado']
-
-    fecha_auditoria = datetime.now()
-    df['amortizacion_anual_calculada'] = df['costo_adquisicion'] / df['vida_util_anios']
-    df['amortizacion_anual_calculada'] = df['amortizacion_anual_calculada'].replace([np.inf, -np.inf], np.nan)
-    df['amortizacion_anual_calculada'] = df['amortizacion_anual_calculada'].fillna(0)
-
-    df['anios_transcurridos'] = (fecha_auditoria - df['fecha_adquisicion']).dt.days / 365.25
-    df['amortizacion_acumulada_esperada'] = df.apply(
-        lambda row: min(row['costo_adquisicion'], row['amortizacion_anual_calculada'] * row['anios_transcurridos']),
-        axis=1)
-    df['discrepancia_amortizacion'] = df['amortizacion_acumulada_esperada'] - df['amortizacion_acumulada_simulada']
-    df['antiguedad_anios'] = (fecha_auditoria - df['fecha_adquisicion']).dt.days / 365.25
-
-    return df
-
-
-# =================================================================
-# FUNCIONES DE AUDITORÍA - OTROS ACTIVOS
-# =================================================================
-
-def auditar_otros_activos(df):
-    """Aplica auditoría a otros activos."""
-    df['fecha_registro'] = pd.to_datetime(df['fecha_registro'])
-    df['monto'] = pd.to_numeric(df['monto'], errors='coerce').fillna(0)
-
-    fecha_auditoria = datetime.now()
-    df['dias_desde_registro'] = (fecha_auditoria - df['fecha_registro']).dt.days
-
-    return df
 
+def mostrar_duplicados(df, columnas):
+    """Tabla de posibles duplicados agrupados (nada si no hay o si la foto es anterior a la detección)."""
+    if 'is_anomaly_duplicado' not in df.columns or not (df['is_anomaly_duplicado'] == -1).any():
+        return
+    duplicados = df.loc[df['is_anomaly_duplicado'] == -1, ['grupo_duplicado'] + columnas]
+    st.subheader("🧾 Posibles duplicados")
+    st.caption(f"{len(duplicados)} registros en {duplicados['grupo_duplicado'].nunique()} grupos; "
+               "cada grupo lleva el ID de su primer registro")
+    st.dataframe(duplicados.sort_values('grupo_duplicado', kind='stable'), hide_index=True,
+                 column_config={'grupo_duplicado': st.column_config.TextColumn("Grupo"),
+                                'valor_adquisicion': st.column_config.NumberColumn("Valor", format="localized")})
 
 # =================================================================
 # FUNCIONES DE ANÁLISIS Y VISUALIZACIÓN - MAQUINARIAS
@@ -334,28 +79,18 @@ def analizar_maquinarias(df):
     col_viz1, col_viz2 = st.columns(2)
     with col_viz1:
         # Gráfico 1: Valor Total por Tipo
-        valor_total_tipo = df.groupby('tipo_equipo')['valor_adquisicion'].sum().sort_values(ascending=False)
-        fig1, ax1 = plt.subplots(figsize=(10, 6))
-        sns.barplot(x=valor_total_tipo.index, y=valor_total_tipo.values, hue=valor_total_tipo.index, 
-                   palette='viridis', ax=ax1, legend=False)
-        ax1.set_title('Valor Total de Adquisición por Tipo de Equipo')
-        ax1.set_xlabel('')
-        ax1.set_ylabel('Valor Total ($)')
-        plt.xticks(rotation=45, ha='right')
-        st.pyplot(fig1)
-        plt.close(fig1)
+        valor_total_tipo = sumar_por(df, 'tipo_equipo', 'valor_adquisicion')
+        mostrar_barras(valor_total_tipo, 'tipo_equipo', 'valor_adquisicion',
+                       'Valor Total de Adquisición por Tipo de Equipo', etiqueta_y='Valor Total ($)')
 
     with col_viz2:
         # Gráfico 2: Conteo por Ubicación y Estado
-        conteo = df.groupby(['ubicacion', 'estado']).size().unstack(fill_value=0)
-        fig2, ax2 = plt.subplots(figsize=(10, 7))
-        conteo.plot(kind='bar', stacked=True, colormap='Paired', ax=ax2)
-        ax2.set_title('Conteo de Equipos por Ubicación y Estado')
-        ax2.set_xlabel('Ubicación')
-        ax2.set_ylabel('Número de Equipos')
-        plt.xticks(rotation=45, ha='right')
-        st.pyplot(fig2)
-        plt.close(fig2)
+        conteo = contar_por(df, ['ubicacion', 'estado'])
+        mostrar_barras(conteo, 'ubicacion', 'cantidad', 'Conteo de Equipos por Ubicación y Estado',
+                       etiqueta_x='Ubicación', etiqueta_y='Número de Equipos', color='estado')
+
+    mostrar_duplicados(df, ['id_equipo', 'tipo_equipo', 'descripcion', 'ubicacion', 'fecha_adquisicion',
+                            'valor_adquisicion'])
 
 
 # =================================================================
@@ -366,29 +101,44 @@ def analizar_inmuebles(df):
     """Análisis completo de inmuebles."""
     st.subheader("📊 Análisis de Inmuebles")
 
+    # Fotos guardadas antes del índice de precio/m² no tienen la marca
+    con_precio_m2 = 'is_anomaly_precio_m2' in df.columns
+    precio_atipico = df['is_anomaly_precio_m2'] == -1 if con_precio_m2 else pd.Series(False, index=df.index)
+
     # Métricas clave
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Total de Inmuebles", len(df))
     with col2:
-        anomalias_count = len(df[df['resultado_auditoria'] != 'Normal'])
+        anomalias_count = int(((df['resultado_auditoria'] != 'Normal') | precio_atipico).sum())
         st.metric("Anomalías Detectadas", anomalias_count)
+    with col3:
+        st.metric("Precio/m² Atípico", int(precio_atipico.sum()) if con_precio_m2 else "—")
 
     # Visualizaciones
     st.markdown("---")
     st.subheader("📈 Visualizaciones")
 
     # Gráfico 1: Valor Total por Tipo
-    valor_total_por_tipo = df.groupby('tipo_inmueble')['valor_adquisicion'].sum().sort_values(ascending=False)
-    fig1, ax1 = plt.subplots(figsize=(12, 7))
-    sns.barplot(x=valor_total_por_tipo.index, y=valor_total_por_tipo.values, hue=valor_total_por_tipo.index,
-               palette='viridis', ax=ax1, legend=False)
-    ax1.set_title('Valor Total de Adquisición por Tipo de Inmueble')
-    ax1.set_xlabel('Tipo de Inmueble')
-    ax1.set_ylabel('Valor Total de Adquisición')
-    plt.xticks(rotation=45, ha='right')
-    st.pyplot(fig1)
-    plt.close(fig1)
+    valor_total_por_tipo = sumar_por(df, 'tipo_inmueble', 'valor_adquisicion')
+    mostrar_barras(valor_total_por_tipo, 'tipo_inmueble', 'valor_adquisicion',
+                   'Valor Total de Adquisición por Tipo de Inmueble',
+                   etiqueta_x='Tipo de Inmueble', etiqueta_y='Valor Total de Adquisición')
+
+    if con_precio_m2 and precio_atipico.any():
+        # Tabla: inmuebles cuyo precio/m² se aparta de los de su ubicación, tipo y año
+        st.subheader("📐 Precio por m² fuera de referencia")
+        atipicos = df.loc[precio_atipico, ['id_inmueble', 'ubicacion', 'tipo_inmueble', 'fecha_adquisicion',
+                                           'precio_m2', 'precio_m2_referencia', 'precio_m2_zscore']]
+        st.dataframe(atipicos.sort_values('precio_m2_zscore', key=abs, ascending=False), hide_index=True,
+                     column_config={'fecha_adquisicion': st.column_config.DateColumn("Adquisición"),
+                                    'precio_m2': st.column_config.NumberColumn("Precio/m²", format="localized"),
+                                    'precio_m2_referencia': st.column_config.NumberColumn("Referencia/m²",
+                                                                                          format="localized"),
+                                    'precio_m2_zscore': st.column_config.NumberColumn("Puntaje", format="%.2f")})
+
+    mostrar_duplicados(df, ['id_inmueble', 'tipo_inmueble', 'direccion', 'ubicacion', 'superficie_m2',
+                            'valor_adquisicion'])
 
 
 # =================================================================
@@ -411,17 +161,9 @@ def analizar_intangibles(df):
     st.markdown("---")
     st.subheader("📈 Visualizaciones")
 
-    fig, ax = plt.subplots(figsize=(12, 7))
-    df['tipo_activo_intangible'].value_counts().plot(
-        kind='bar', 
-        color=sns.color_palette("viridis", len(df['tipo_activo_intangible'].unique())),
-        ax=ax
-    )
-    ax.set_title('Distribución de Tipos de Activos Intangibles')
-    ax.set_ylabel('Cantidad')
-    plt.xticks(rotation=45, ha='right')
-    st.pyplot(fig)
-    plt.close(fig)
+    conteo = contar_por(df, 'tipo_activo_intangible')
+    mostrar_barras(conteo, 'tipo_activo_intangible', 'cantidad',
+                   'Distribución de Tipos de Activos Intangibles', etiqueta_y='Cantidad')
 
 
 # =================================================================
@@ -447,34 +189,78 @@ def analizar_otros_activos(df):
     st.markdown("---")
     st.subheader("📈 Visualizaciones")
 
-    fig, ax = plt.subplots(figsize=(12, 7))
-    df['tipo_activo'].value_counts().plot(
-        kind='bar', 
-        color=sns.color_palette("viridis", len(df['tipo_activo'].unique())),
-        ax=ax
-    )
-    ax.set_title('Distribución de Tipos de Activos')
-    ax.set_ylabel('Cantidad')
-    plt.xticks(rotation=45, ha='right')
-    st.pyplot(fig)
-    plt.close(fig)
+    conteo = contar_por(df, 'tipo_activo')
+    mostrar_barras(conteo, 'tipo_activo', 'cantidad', 'Distribución de Tipos de Activos',
+                   etiqueta_y='Cantidad')
 
 
 # =================================================================
 # FUNCIONES PARA INFORMES DE AUDITORÍA
 # =================================================================
 
-def extraer_texto_pdf(ruta_archivo):
-    """Extrae texto de un archivo PDF"""
-    try:
-        with open(ruta_archivo, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            texto = ""
-            for page in pdf_reader.pages:
-                texto += page.extract_text() + "\n"
-            return texto
-    except Exception as e:
-        return f"Error al leer el PDF: {str(e)}"
+@st.cache_resource
+def obtener_indexador_informes():
+    """Indexador de texto de los informes en segundo plano, compartido por todas las sesiones."""
+    return IndexadorEnSegundoPlano(IndiceInformes(directorio=DIRECTORIO_INFORMES))
+
+
+def titulo_informe(archivo):
+    return archivo.replace('_', ' ').replace('.pdf', '').title()
+
+
+# Páginas que se muestran por vez en la vista previa
+PAGINAS_POR_VISTA = [1, 2, 5]
+
+
+@st.cache_data(max_entries=2048, show_spinner=False)
+def _texto_pagina(huella, _ruta, pagina):
+    """Texto de una página, extraído una sola vez por (huella del archivo, página)."""
+    return extraer_paginas(_ruta, [pagina])[0]
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _paginas_informe(huella, _ruta):
+    return numero_paginas(_ruta)
+
+
+def _lector_diferido(ruta):
+    """Contenido del PDF para la descarga; Streamlit lo invoca recién al hacer clic."""
+    def leer():
+        with open(ruta, 'rb') as archivo:
+            return archivo.read()
+    return leer
+
+
+def mostrar_vista_previa(ruta, huella, total_paginas):
+    """Vista previa del texto de un rango de páginas; sólo se leen del PDF las páginas mostradas."""
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        desde = st.number_input(f"Página (1 a {total_paginas})", min_value=1, max_value=max(total_paginas, 1),
+                                value=1, step=1, key=f"pagina_{huella}")
+    with col2:
+        por_vista = st.segmented_control("Páginas por vista", PAGINAS_POR_VISTA, default=1,
+                                         key="paginas_por_vista") or 1
+    for pagina in range(desde, min(desde + por_vista, total_paginas + 1)):
+        with st.container(border=True):
+            st.caption(f"Página {pagina} de {total_paginas}")
+            st.text(_texto_pagina(huella, ruta, pagina))
+
+
+def buscar_en_informes(indexador):
+    """Búsqueda por palabras en el texto de todos los informes, con la página de cada coincidencia."""
+    consulta = st.text_input("🔎 Buscar en los informes", placeholder="Ej.: isolation forest, EQ-1005, ISA 520")
+    if not consulta.strip():
+        return
+    resultados = indexador.indice.buscar(consulta, limite=100)
+    if resultados.empty:
+        st.info("No hay páginas que contengan todas las palabras buscadas.")
+        return
+    st.caption(f"{len(resultados)} páginas encontradas"
+               + (" (se muestran las 100 más relevantes)" if len(resultados) == 100 else ""))
+    resultados['informe'] = resultados['archivo'].map(titulo_informe)
+    st.dataframe(resultados[['informe', 'pagina', 'fragmento']], hide_index=True,
+                 column_config={'pagina': st.column_config.NumberColumn("Página"),
+                                'fragmento': st.column_config.TextColumn("Fragmento", width='large')})
 
 
 def mostrar_informes_auditoria():
@@ -485,7 +271,7 @@ def mostrar_informes_auditoria():
     """)
     
     # Ruta de los informes
-    ruta_informes = "data/informes_auditoria_activos"
+    ruta_informes = DIRECTORIO_INFORMES
     
     # Verificar si existe el directorio
     if not os.path.exists(ruta_informes):
@@ -493,39 +279,268 @@ def mostrar_informes_auditoria():
         st.info("Los informes se generarán automáticamente cuando se configure el sistema.")
         return
     
-    # Buscar archivos PDF
-    archivos_pdf = sorted([f for f in os.listdir(ruta_informes) if f.endswith('.pdf')])
+    # Los informes se listan desde la última revisión del indexador, que corre en segundo plano
+    indexador = obtener_indexador_informes()
+    documentos = indexador.indice.documentos().set_index('archivo')
+    archivos_pdf = indexador.archivos
+    if archivos_pdf is None:
+        # Primer arranque: el indexador todavía no revisó el directorio
+        archivos_pdf = sorted(f for f in os.listdir(ruta_informes) if f.endswith('.pdf'))
+    if indexador.ultimo_resumen is None:
+        st.info("⏳ Indexando el texto de los informes; la búsqueda estará completa en unos instantes.")
     
     if not archivos_pdf:
         st.warning("⚠️ No se encontraron informes de auditoría en el directorio.")
         return
     
     st.success(f"✅ Se encontraron {len(archivos_pdf)} informes de auditoría")
+    buscar_en_informes(indexador)
     st.markdown("---")
     
     # Selector de informe
     informe_seleccionado = st.selectbox(
         "📂 Seleccione un informe:",
         archivos_pdf,
-        format_func=lambda x: x.replace('_', ' ').replace('.pdf', '').title()
+        format_func=titulo_informe
     )
     
     if informe_seleccionado:
         ruta_completa = os.path.join(ruta_informes, informe_seleccionado)
+        if not os.path.exists(ruta_completa):
+            # El índice puede listar por unos segundos un informe ya borrado
+            indexador.solicitar()
+            st.warning(f"⚠️ El informe {informe_seleccionado} ya no está disponible.")
+            return
+        
+        # Huella del índice (hash del contenido); si el informe aún no se indexó o cambió
+        # después de indexarlo, fecha y tamaño
+        estado = os.stat(ruta_completa)
+        if (informe_seleccionado in documentos.index
+                and documentos.at[informe_seleccionado, 'mtime'] == estado.st_mtime):
+            huella = documentos.at[informe_seleccionado, 'huella']
+            total_paginas = int(documentos.at[informe_seleccionado, 'paginas'])
+        else:
+            huella = f"{estado.st_mtime_ns}-{estado.st_size}"
+            total_paginas = _paginas_informe(huella, ruta_completa)
         
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            st.subheader(f"📋 {informe_seleccionado.replace('_', ' ').replace('.pdf', '').title()}")
+            st.subheader(f"📋 {titulo_informe(informe_seleccionado)}")
         
         with col2:
-            with open(ruta_completa, 'rb') as file:
-                st.download_button(
-                    label="⬇️ Descargar PDF",
-                    data=file.read(),
-                    file_name=informe_seleccionado,
-                    mime="application/pdf"
-                )
+            st.download_button(
+                label="⬇️ Descargar PDF",
+                data=_lector_diferido(ruta_completa),
+                file_name=informe_seleccionado,
+                mime="application/pdf"
+            )
+        
+        mostrar_vista_previa(ruta_completa, huella, total_paginas)
+
+
+# =================================================================
+# FUENTE DE DATOS: SIMULADOS O EXPORTACIONES DEL ERP
+# =================================================================
+
+ETIQUETAS_CLASES = {
+    'maquinarias': "Maquinarias",
+    'inmuebles': "Inmuebles",
+    'intangibles': "Activos Intangibles",
+    'otros_activos': "Otros Activos",
+}
+
+
+def seleccionar_fuente_datos():
+    """Permite elegir en la barra lateral entre datos simulados y exportaciones del ERP."""
+    st.sidebar.header("📥 Fuente de Datos")
+    fuente = st.sidebar.radio("Origen de los datos", ["Datos simulados", "Exportaciones del ERP"])
+    rutas = {}
+    if fuente == "Exportaciones del ERP":
+        st.sidebar.caption("Rutas a archivos CSV/Excel. Las clases sin archivo usan datos simulados.")
+        for clase, etiqueta in ETIQUETAS_CLASES.items():
+            rutas[clase] = st.sidebar.text_input(f"Archivo de {etiqueta}").strip()
+    return rutas
+
+
+def resolver_fuente(clase, rutas):
+    """Ruta del ERP para la clase (None = datos simulados) y huella de la entrada.
+
+    La huella es el nombre del Parquet en caché, derivado del hash del archivo.
+    """
+    ruta = rutas.get(clase)
+    if ruta:
+        try:
+            return ruta, os.path.basename(ruta_cache(ruta, clase))
+        except OSError as e:
+            st.error(f"❌ No se pudo leer {ruta}: {e}. Se usan datos simulados.")
+    return None, f"simulado-{clase}"
+
+
+# =================================================================
+# CACHÉ DE RESULTADOS Y EJECUCIÓN PARALELA
+# =================================================================
+
+# Cantidad máxima de resultados auditados en caché (se descartan los menos usados)
+MAX_RESULTADOS_CACHE = 16
+OPCIONES_SEGMENTACION_IA = {None: "Un modelo global", 'tipo': "Un modelo por tipo de activo",
+                            'ubicacion': "Un modelo por ubicación"}
+
+
+def seleccionar_parametros_auditoria():
+    """Parámetros de auditoría configurables desde la barra lateral."""
+    with st.sidebar.expander("⚙️ Parámetros de Auditoría"):
+        return {
+            'umbral_z': st.number_input("Umbral Z-score (maquinarias)", value=UMBRAL_Z_MAQUINARIAS, step=0.5),
+            'umbral_zscore': st.number_input("Umbral Z-score (inmuebles)", value=float(UMBRAL_ZSCORE_INMUEBLES),
+                                             step=0.5),
+            'contamination': st.number_input("Contaminación Isolation Forest", value=CONTAMINACION,
+                                             min_value=0.01, max_value=0.5, step=0.01),
+            'segmentar_ia': st.selectbox("Modelo de IA", [None, 'tipo', 'ubicacion'],
+                                         format_func=lambda opcion: OPCIONES_SEGMENTACION_IA[opcion]),
+        }
+
+
+@st.cache_resource
+def obtener_cache_resultados():
+    """Pool de procesos y caché de resultados auditados, compartidos por todas las sesiones."""
+    return CacheResultados(max_entradas=MAX_RESULTADOS_CACHE)
+
+
+def solicitar_auditoria(cache, clase, ruta, huella, fecha_referencia, parametros):
+    """Futuro con la auditoría de una clase; la clave cubre entrada, fecha y parámetros."""
+    clave = (clase, huella, fecha_referencia, tuple(sorted(parametros.items())))
+    return cache.obtener(clave, clase, ruta=ruta, fecha_referencia=fecha_referencia, parametros=parametros)
+
+
+# =================================================================
+# PERÍODO E HISTORIAL DE AUDITORÍAS (FOTOS FECHADAS)
+# =================================================================
+
+@st.cache_resource
+def obtener_historial():
+    """Historial de fotos auditadas, compartido por todas las sesiones."""
+    return HistorialAuditorias()
+
+
+def seleccionar_periodo(historial):
+    """Fecha de referencia de la auditoría y si se muestra una foto guardada en lugar de auditar."""
+    st.sidebar.header("📅 Período")
+    fechas = historial.fechas()
+    if fechas and st.sidebar.toggle("Ver una foto guardada", key="ver_historial"):
+        fecha = st.sidebar.selectbox("Fecha de la foto", fechas, format_func=lambda f: f.strftime('%d/%m/%Y'))
+        return fecha, True
+    return st.sidebar.date_input("Fecha de referencia", value=date.today(), format="DD/MM/YYYY"), False
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def leer_foto(ruta):
+    """Resultado auditado leído de una foto del historial (inmutable: basta la ruta como clave)."""
+    inicio = time.perf_counter()
+    df = obtener_historial().cargar(ruta)
+    memoria = round(float(memoria_mb(df)), 3)
+    return {'df': df, 'tiempo_s': time.perf_counter() - inicio, 'tiempos_modelo': {},
+            'memoria': {'antes_mb': memoria, 'despues_mb': memoria, 'reduccion': 1.0}}
+
+
+def mostrar_tiempos(resultados):
+    """Muestra en la barra lateral el tiempo y la memoria de cada clase y de su modelo de IA."""
+    filas = [{
+        'clase': clase,
+        'tiempo_s': resultado['tiempo_s'],
+        'entrenamiento_s': resultado['tiempos_modelo'].get('entrenamiento_s'),
+        'puntuacion_s': resultado['tiempos_modelo'].get('puntuacion_s'),
+        'memoria_mb': resultado['memoria']['despues_mb'],
+        'memoria_antes_compactar_mb': resultado['memoria']['antes_mb'],
+    } for clase, resultado in resultados.items()]
+    with st.sidebar.expander("⏱️ Tiempos y memoria por clase de activo"):
+        st.dataframe(pd.DataFrame(filas), hide_index=True)
+
+
+# =================================================================
+# RESUMEN CONSOLIDADO (CUBO POR EMPRESA, CLASE, UBICACIÓN, TIPO Y MONEDA)
+# =================================================================
+
+ETIQUETAS_DIMENSIONES = {
+    'empresa': "Empresa",
+    'clase': "Clase de activo",
+    'ubicacion': "Ubicación",
+    'tipo': "Tipo de activo",
+    'moneda': "Moneda de origen",
+}
+
+
+@st.cache_data(max_entries=8, show_spinner="Consolidando...")
+def obtener_cubo_consolidado(huellas, fecha_referencia, parametros, huella_tipos, _resultados):
+    """Cubo consolidado en pesos, calculado una vez por combinación de entradas auditadas,
+    parámetros de auditoría y versión de la tabla de tipos de cambio (None = simulada):
+    _resultados queda fuera de la clave, así que todo lo que lo determina debe estar en ella."""
+    dfs = {clase: resultado['df'] for clase, resultado in _resultados.items()}
+    tipos = tipos_cambio(fecha_minima(dfs), fecha_referencia)
+    return CuboConsolidado(hechos_consolidados(dfs, tipos))
+
+
+def mostrar_consolidado(cubo, tipos_simulados=False):
+    """Totales en pesos por clase y apertura por empresa, clase, ubicación, tipo o moneda."""
+    st.header("📊 Resumen Consolidado del Activo No Corriente")
+    if tipos_simulados and (cubo.consultar(['moneda'])['moneda'] != MONEDA_BASE).any():
+        st.warning(f"⚠️ No se encontró {RUTA_TIPOS_CAMBIO}: los importes en moneda extranjera se convirtieron a "
+                   "pesos con tipos de cambio simulados y los totales en ARS no son reales.")
+    st.markdown("---")
+
+    # Métricas consolidadas
+    por_clase = cubo.consultar(['clase']).set_index('clase')
+    columnas = st.columns(len(ETIQUETAS_CLASES))
+    for columna, (clase, etiqueta) in zip(columnas, ETIQUETAS_CLASES.items()):
+        with columna:
+            st.subheader(etiqueta)
+            fila = por_clase.loc[clase] if clase in por_clase.index else None
+            st.metric("Registros", int(fila['registros']) if fila is not None else 0)
+            st.metric("Valor Total (ARS)", f"${fila['valor_ars'] if fila is not None else 0:,.0f}")
+
+    st.markdown("---")
+
+    total = cubo.consultar().iloc[0]
+    st.subheader("💰 TOTAL ACTIVO NO CORRIENTE")
+    st.metric("Valor Total Estimado (ARS)", f"${total['valor_ars']:,.2f}")
+    if total['sin_tipo_cambio']:
+        st.warning(f"⚠️ {int(total['sin_tipo_cambio'])} activos en moneda extranjera no tienen tipo de cambio "
+                   "a su fecha y no se incluyen en el total.")
+
+    st.markdown("---")
+
+    # Gráfico comparativo
+    st.subheader("📊 Comparación de Componentes")
+    componentes = pd.DataFrame({
+        'componente': list(ETIQUETAS_CLASES.values()),
+        'monto': [por_clase['valor_ars'].get(clase, 0.0) for clase in ETIQUETAS_CLASES],
+    })
+    mostrar_barras(componentes, 'componente', 'monto', "Composición del Activo No Corriente",
+                   etiqueta_y="Monto Total (ARS)", formato_valor='$,.0f',
+                   orden=list(componentes['componente']))
+
+    st.markdown("---")
+
+    # Apertura: los filtros y las dimensiones se resuelven sobre agregados precalculados
+    st.subheader("🏢 Apertura por Empresa, Clase y Ubicación")
+    filtros = {}
+    columnas = st.columns(len(DIMENSIONES))
+    for columna, dimension in zip(columnas, DIMENSIONES):
+        with columna:
+            filtros[dimension] = st.multiselect(ETIQUETAS_DIMENSIONES[dimension], cubo.valores[dimension],
+                                                key=f"filtro_{dimension}")
+    por = st.multiselect("Abrir por", DIMENSIONES, default=['empresa', 'clase'],
+                         format_func=ETIQUETAS_DIMENSIONES.get, key="apertura_consolidado")
+    apertura = cubo.consultar(por, filtros)
+    if por:
+        mostrar_barras(cubo.consultar(por[:1], filtros), por[0], 'valor_ars',
+                       f"Valor en pesos por {ETIQUETAS_DIMENSIONES[por[0]].lower()}",
+                       etiqueta_x=ETIQUETAS_DIMENSIONES[por[0]], etiqueta_y="Valor (ARS)", formato_valor='$,.0f')
+    st.dataframe(apertura, hide_index=True,
+                 column_config={'valor_ars': st.column_config.NumberColumn("Valor (ARS)", format="localized"),
+                                'registros': st.column_config.NumberColumn("Registros"),
+                                'alertas': st.column_config.NumberColumn("Alertas"),
+                                'sin_tipo_cambio': st.column_config.NumberColumn("Sin tipo de cambio")})
 
 
 # =================================================================
@@ -551,98 +566,69 @@ def main():
         "📄 Informes de Auditoría"
     ])
 
-    # Generar datos
-    with st.spinner("Generando datos..."):
-        df_maquinarias = generar_datos_maquinarias()
-        df_inmuebles = generar_datos_inmuebles()
-        df_intangibles = generar_datos_intangibles()
-        df_otros_activos = generar_datos_otros_activos()
-        
-        df_maquinarias = auditar_maquinarias(df_maquinarias)
-        df_inmuebles = auditar_inmuebles(df_inmuebles)
-        df_intangibles = auditar_intangibles(df_intangibles)
-        df_otros_activos = auditar_otros_activos(df_otros_activos)
-
-    # Pestaña 1: Maquinarias
-    with tab1:
-        st.header("🏭 Inventario de Maquinarias")
-        analizar_maquinarias(df_maquinarias)
-
-    # Pestaña 2: Inmuebles
-    with tab2:
-        st.header("🏢 Inventario de Inmuebles")
-        analizar_inmuebles(df_inmuebles)
-
-    # Pestaña 3: Activos Intangibles
-    with tab3:
-        st.header("💡 Activos Intangibles")
-        analizar_intangibles(df_intangibles)
-
-    # Pestaña 4: Otros Activos
-    with tab4:
-        st.header("📦 Otros Activos No Corrientes")
-        analizar_otros_activos(df_otros_activos)
+    rutas = seleccionar_fuente_datos()
+    parametros = seleccionar_parametros_auditoria()
+    historial = obtener_historial()
+    fecha_referencia, ver_historial = seleccionar_periodo(historial)
+
+    pestanas = {
+        'maquinarias': (tab1, "🏭 Inventario de Maquinarias", analizar_maquinarias),
+        'inmuebles': (tab2, "🏢 Inventario de Inmuebles", analizar_inmuebles),
+        'intangibles': (tab3, "💡 Activos Intangibles", analizar_intangibles),
+        'otros_activos': (tab4, "📦 Otros Activos No Corrientes", analizar_otros_activos),
+    }
+
+    def mostrar_pestana(clase, foto=None):
+        tab, titulo, analizar = pestanas[clase]
+        with tab:
+            st.header(titulo)
+            if foto:
+                st.caption(f"📅 Foto guardada al {fecha_referencia:%d/%m/%Y}")
+            analizar(resultados[clase]['df'])
+
+    # Las clases con foto guardada para esta entrada, fecha y parámetros se leen del historial;
+    # las demás se auditan en paralelo y cada pestaña se muestra apenas termina su clase
+    cache = obtener_cache_resultados()
+    pendientes = {}
+    huellas = {}
+    resultados = {}
+    for clase in pestanas:
+        ruta, huellas[clase] = resolver_fuente(clase, rutas)
+        foto = (historial.ultima(clase, fecha_referencia) if ver_historial
+                else historial.ruta(clase, fecha_referencia, huellas[clase], parametros))
+        if foto and os.path.exists(foto):
+            huellas[clase] = foto
+            resultados[clase] = leer_foto(foto)
+            mostrar_pestana(clase, foto)
+            continue
+        pendientes[solicitar_auditoria(cache, clase, ruta, huellas[clase], fecha_referencia, parametros)] = clase
+
+    with st.spinner("Auditando activos..."):
+        while pendientes:
+            listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                clase = pendientes.pop(futuro)
+                try:
+                    resultados[clase] = futuro.result()
+                except (OSError, ErrorValidacionDatos) as e:
+                    st.error(f"❌ No se pudo cargar {rutas[clase]}: {e}. Se usan datos simulados.")
+                    huellas[clase] = f"simulado-{clase}"
+                    futuro = solicitar_auditoria(cache, clase, None, huellas[clase], fecha_referencia,
+                                                 parametros)
+                    pendientes[futuro] = clase
+                    continue
+
+                historial.guardar(clase, resultados[clase]['df'], fecha_referencia, huellas[clase], parametros)
+                mostrar_pestana(clase)
+
+    mostrar_tiempos(resultados)
 
     # Pestaña 5: Resumen Consolidado
     with tab5:
-        st.header("📊 Resumen Consolidado del Activo No Corriente")
-        st.markdown("---")
-
-        # Métricas consolidadas
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.subheader("🏭 Maquinarias")
-            st.metric("Total Equipos", len(df_maquinarias))
-            st.metric("Valor Total", f"${df_maquinarias['valor_adquisicion'].sum():,.0f}")
-        
-        with col2:
-            st.subheader("🏢 Inmuebles")
-            st.metric("Total Inmuebles", len(df_inmuebles))
-            st.metric("Valor Total", f"${df_inmuebles['valor_adquisicion'].sum():,.0f}")
-        
-        with col3:
-            st.subheader("💡 Intangibles")
-            st.metric("Total Activos", len(df_intangibles))
-            st.metric("Valor Total", f"${df_intangibles['costo_adquisicion'].sum():,.0f}")
-        
-        with col4:
-            st.subheader("📦 Otros Activos")
-            st.metric("Total Registros", len(df_otros_activos))
-            st.metric("Monto Total", f"${df_otros_activos['monto'].sum():,.0f}")
-
-        st.markdown("---")
-
-        # Total consolidado
-        total_activo_nc = (
-            df_maquinarias['valor_adquisicion'].sum() +
-            df_inmuebles['valor_adquisicion'].sum() +
-            df_intangibles['costo_adquisicion'].sum() +
-            df_otros_activos['monto'].sum()
-        )
-        st.subheader("💰 TOTAL ACTIVO NO CORRIENTE")
-        st.metric("Valor Total Estimado", f"${total_activo_nc:,.2f}")
-
-        st.markdown("---")
-
-        # Gráfico comparativo
-        st.subheader("📊 Comparación de Componentes")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        componentes = ["Maquinarias", "Inmuebles", "Intangibles", "Otros Activos"]
-        valores = [
-            df_maquinarias['valor_adquisicion'].sum(),
-            df_inmuebles['valor_adquisicion'].sum(),
-            df_intangibles['costo_adquisicion'].sum(),
-            df_otros_activos['monto'].sum()
-        ]
-        colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728"]
-        ax.bar(componentes, valores, color=colors)
-        ax.set_ylabel("Monto Total (ARS)", fontsize=12)
-        ax.set_title("Composición del Activo No Corriente", fontsize=16)
-        for i, v in enumerate(valores):
-            ax.text(i, v, f"${v:,.0f}", ha="center", va="bottom", fontsize=10)
-        st.pyplot(fig)
-        plt.close(fig)
+        huella_tipos = huella_tipos_cambio()
+        cubo = obtener_cubo_consolidado(tuple(sorted(huellas.items())), fecha_referencia,
+                                        tuple(sorted(parametros.items())), huella_tipos, resultados)
+        mostrar_consolidado(cubo, huella_tipos is None)
 
     # Pestaña 6: Informes de Auditoría
     with tab6:
@@ -0,0 +1,97 @@
+# =================================================================
+# DETECCIÓN DE ANOMALÍAS CON UN MODELO POR SEGMENTO
+# =================================================================
+# Un único IsolationForest compara un Camión con un Torno CNC y una Oficina
+# con un Terreno. Aquí cada segmento (tipo de equipo o de inmueble, o
+# ubicación) con al menos MIN_FILAS_SEGMENTO filas tiene su propio modelo;
+# las filas de los segmentos chicos se puntúan con el modelo global. Los
+# modelos se ajustan en paralelo en un pool de procesos y pasan por el
+# registro de modelos en disco, así que un segmento que no cambió no se
+# vuelve a ajustar.
+import os
+
+import numpy as np
+import pandas as pd
+
+from auditoria_activos import detectar_anomalias_ia, CONTAMINACION
+
+# Segmentación elegible -> columna de cada clase
+SEGMENTACIONES_IA = {
+    'tipo': {'maquinarias': 'tipo_equipo', 'inmuebles': 'tipo_inmueble'},
+    'ubicacion': {'maquinarias': 'ubicacion', 'inmuebles': 'ubicacion'},
+}
+
+# Segmentos más chicos usan el modelo global (un IsolationForest de pocas filas no es confiable)
+MIN_FILAS_SEGMENTO = 200
+MODELO_GLOBAL = 'global'
+
+
+def columna_segmento(clase, segmentacion):
+    """Columna de la clase para una segmentación ('tipo' o 'ubicacion')."""
+    if segmentacion not in SEGMENTACIONES_IA:
+        raise ValueError(f"Segmentación desconocida: {segmentacion}")
+    return SEGMENTACIONES_IA[segmentacion][clase]
+
+
+def _detectar_en_proceso(clase_modelo, features, contamination, directorio_modelos):
+    """Tarea del pool: etiquetas de un segmento con el registro de modelos del proceso."""
+    from ejecucion_paralela import _registro_del_proceso
+
+    registro = _registro_del_proceso(directorio_modelos) if directorio_modelos else None
+    return detectar_anomalias_ia(clase_modelo, features, contamination, registro, n_jobs=1)
+
+
+def detectar_por_segmento(clase, features, segmentos, contamination=CONTAMINACION, registro_modelos=None,
+                          n_jobs=None, max_workers=None, min_filas=MIN_FILAS_SEGMENTO, pool=None):
+    """Etiquetas -1/1 de IsolationForest con un modelo por segmento.
+
+    features: DataFrame de features; segmentos: Series con el segmento de cada
+    fila (misma longitud; su nombre entra en la clave del registro de
+    modelos). Con más de un proceso disponible (max_workers, por defecto los
+    núcleos) los segmentos se ajustan en un pool; con uno, en este proceso.
+    Devuelve (etiquetas, modelo_ia) donde modelo_ia indica el segmento
+    cuyo modelo puntuó cada fila o MODELO_GLOBAL.
+    """
+    segmentos = pd.Series(segmentos).reset_index(drop=True).astype(str)
+    etiquetas = np.ones(len(features), dtype=np.int64)
+    modelo_ia = np.full(len(features), MODELO_GLOBAL, dtype=object)
+    if not len(features):
+        return etiquetas, modelo_ia
+
+    # Una clave de registro por clase y columna; la huella de las features distingue los segmentos
+    clase_modelo = f"{clase}_{segmentos.name or 'segmento'}"
+    grupos = segmentos.groupby(segmentos, sort=True).indices
+    grandes = {valor: indices for valor, indices in grupos.items() if len(indices) >= min_filas}
+    chicas = np.concatenate([indices for valor, indices in grupos.items() if valor not in grandes]
+                            or [np.empty(0, dtype=np.int64)])
+
+    if len(chicas):
+        # Global ajustado con todas las filas, igual que sin segmentar
+        global_ = detectar_anomalias_ia(clase, features, contamination, registro_modelos, n_jobs)
+        etiquetas[chicas] = global_[chicas]
+
+    max_workers = min(len(grandes), max_workers or os.cpu_count() or 1)
+    if pool is None and max_workers <= 1:
+        for valor, indices in grandes.items():
+            etiquetas[indices] = detectar_anomalias_ia(clase_modelo, features.iloc[indices], contamination,
+                                                       registro_modelos, n_jobs)
+            modelo_ia[indices] = valor
+        return etiquetas, modelo_ia
+
+    from ejecucion_paralela import crear_pool
+
+    directorio = registro_modelos.directorio if registro_modelos is not None else None
+    propio = pool is None
+    if propio:
+        pool = crear_pool(max_workers)
+    try:
+        futuros = {valor: pool.submit(_detectar_en_proceso, clase_modelo,
+                                      features.iloc[indices].reset_index(drop=True), contamination, directorio)
+                   for valor, indices in grandes.items()}
+        for valor, futuro in futuros.items():
+            etiquetas[grandes[valor]] = futuro.result()
+            modelo_ia[grandes[valor]] = valor
+    finally:
+        if propio:
+            pool.shutdown()
+    return etiquetas, modelo_ia
@@ -0,0 +1,358 @@
+# =================================================================
+# FUNCIONES DE AUDITORÍA - ACTIVO NO CORRIENTE
+# =================================================================
+# Lógica de auditoría sin dependencias de Streamlit ni de gráficos, para que
+# la usen tanto el dashboard como los procesos por lotes. Los pasos
+# deterministas (edades, vida útil, amortización, antigüedad) están separados
+# en funciones propias que también aplica la auditoría por lotes.
+# scipy y sklearn se importan recién al usarse: importar este módulo es liviano.
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from pandas.tseries.offsets import DateOffset
+
+from reglas_auditoria import clasificar_alerta_combinada, clasificar_resultado, sumar_anios, minimo_por_fila
+
+UMBRAL_Z_MAQUINARIAS = 2.5
+UMBRAL_ZSCORE_INMUEBLES = 3
+CONTAMINACION = 0.1
+# Parámetros de auditar_clase que cambian el resultado (los del dashboard)
+PARAMETROS_POR_DEFECTO = {'umbral_z': UMBRAL_Z_MAQUINARIAS, 'umbral_zscore': UMBRAL_ZSCORE_INMUEBLES,
+                          'contamination': CONTAMINACION, 'segmentar_ia': None}
+
+FEATURES_MAQUINARIAS = ['valor_adquisicion', 'edad_anios', 'vida_util_restante_anios']
+FEATURES_INMUEBLES = ['valor_adquisicion', 'edad_anios', 'vida_util_restante_anios', 'superficie_m2']
+COLUMNAS_PRECIO_M2 = ['precio_m2', 'precio_m2_referencia', 'precio_m2_zscore', 'is_anomaly_precio_m2']
+COLUMNAS_DUPLICADOS = ['grupo_duplicado', 'is_anomaly_duplicado']
+# Vida útil simulada (años, [mínimo, máximo)) de los inmuebles sin fecha_fin_vida_util
+VIDA_UTIL_INMUEBLES = (50, 100)
+SEMILLA_VIDA_UTIL = 0
+# Fecha de adquisición de los inmuebles que no la traen y años de vida útil si fecha_fin_vida_util está vacía
+FECHA_ADQUISICION_FALTANTE = '2020-01-01'
+VIDA_UTIL_FECHA_VACIA = 75
+
+
+def resolver_fecha_referencia(fecha_referencia):
+    """Fecha de referencia de la auditoría a medianoche (por defecto, hoy).
+
+    Sin la hora del día, dos ejecuciones con la misma fecha dan el mismo resultado.
+    """
+    if fecha_referencia is None:
+        fecha_referencia = datetime.now()
+    return pd.Timestamp(fecha_referencia).normalize().to_pydatetime()
+
+
+# =================================================================
+# PASOS DETERMINISTAS
+# =================================================================
+
+def calcular_vida_util(df, fecha_referencia):
+    """Agrega edad_anios y vida_util_restante_anios a partir de las fechas de adquisición y fin de vida útil."""
+    df['edad_anios'] = ((fecha_referencia - df['fecha_adquisicion']).dt.days / 365.25).round(2)
+    df['vida_util_restante_anios'] = ((df['fecha_fin_vida_util'] - fecha_referencia).dt.days / 365.25).round(2)
+    df.loc[df['vida_util_restante_anios'] < 0, 'vida_util_restante_anios'] = 0
+    return df
+
+
+def preparar_maquinarias(df, fecha_referencia):
+    """Convierte fechas y calcula la vida útil de maquinarias."""
+    df['fecha_adquisicion'] = pd.to_datetime(df['fecha_adquisicion'])
+    df['fecha_fin_vida_util'] = pd.to_datetime(df['fecha_fin_vida_util'])
+    return calcular_vida_util(df, fecha_referencia)
+
+
+def vida_util_por_id(ids, semilla=SEMILLA_VIDA_UTIL):
+    """Años de vida útil (entre VIDA_UTIL_INMUEBLES) a partir de un hash de cada id con la semilla."""
+    minimo, maximo = VIDA_UTIL_INMUEBLES
+    if isinstance(ids, (pd.Series, pd.Index)):
+        claves = pd.Series(ids, dtype=object).astype(str).to_numpy(dtype=object)
+        faltantes = True
+    else:
+        # Unos pocos ids sueltos (servicio de puntuación): el mismo texto que astype(str), sin pandas
+        claves = np.array([np.nan if pd.isna(c) else str(c) for c in ids], dtype=object)
+        faltantes = any(isinstance(c, float) for c in claves)
+    # Sin faltantes, categorize=False da el mismo hash sin factorizar (con NaN, el hash del faltante cambia)
+    hashes = pd.util.hash_array(claves, hash_key=f"{semilla:016d}", categorize=faltantes)
+    return minimo + (hashes % np.uint64(maximo - minimo)).astype(np.int64)
+
+
+def vida_util_simulada(df, semilla=SEMILLA_VIDA_UTIL):
+    """Años de vida útil (entre VIDA_UTIL_INMUEBLES) de cada inmueble, reproducibles.
+
+    Salen de un hash de id_inmueble con la semilla, así que un inmueble recibe
+    la misma vida útil en cualquier orden, lote o ejecución; sin id_inmueble,
+    de default_rng(semilla) por posición.
+    """
+    minimo, maximo = VIDA_UTIL_INMUEBLES
+    if 'id_inmueble' in df.columns:
+        return vida_util_por_id(df['id_inmueble'], semilla)
+    return np.random.default_rng(semilla).integers(minimo, maximo, size=len(df))
+
+
+def preparar_inmuebles(df, fecha_referencia, semilla=SEMILLA_VIDA_UTIL):
+    """Convierte y completa fechas y calcula la vida útil de inmuebles."""
+    df['fecha_adquisicion'] = pd.to_datetime(df['fecha_adquisicion'], errors='coerce')
+    df['fecha_adquisicion'] = df['fecha_adquisicion'].fillna(pd.to_datetime(FECHA_ADQUISICION_FALTANTE))
+
+    if 'fecha_fin_vida_util' not in df.columns:
+        df['fecha_fin_vida_util'] = sumar_anios(df['fecha_adquisicion'], vida_util_simulada(df, semilla))
+    else:
+        df['fecha_fin_vida_util'] = pd.to_datetime(df['fecha_fin_vida_util'], errors='coerce')
+        df['fecha_fin_vida_util'] = df['fecha_fin_vida_util'].fillna(
+            df['fecha_adquisicion'] + DateOffset(years=VIDA_UTIL_FECHA_VACIA))
+
+    return calcular_vida_util(df, fecha_referencia)
+
+
+def preparar_intangibles(df, fecha_referencia):
+    """Calcula valor neto, amortización esperada y discrepancias de intangibles."""
+    df['fecha_adquisicion'] = pd.to_datetime(df['fecha_adquisicion'])
+    numeric_cols = ['costo_adquisicion', 'vida_util_anios', 'amortizacion_acumulada_simulada',
+                    'valor_neto_contable_simulado']
+    for col in numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df.fillna(0, inplace=True)
+
+    df['valor_neto_calculado'] = df['costo_adquisicion'] - df['amortizacion_acumulada_simulada']
+    df['discrepancia_vnc'] = df['valor_neto_calculado'] - df['valor_neto_contable_simulado']
+
+    df['amortizacion_anual_calculada'] = df['costo_adquisicion'] / df['vida_util_anios']
+    df['amortizacion_anual_calculada'] = df['amortizacion_anual_calculada'].replace([np.inf, -np.inf], np.nan)
+    df['amortizacion_anual_calculada'] = df['amortizacion_anual_calculada'].fillna(0)
+
+    df['anios_transcurridos'] = (fecha_referencia - df['fecha_adquisicion']).dt.days / 365.25
+    df['amortizacion_acumulada_esperada'] = minimo_por_fila(
+        df['costo_adquisicion'], df['amortizacion_anual_calculada'] * df['anios_transcurridos'])
+    df['discrepancia_amortizacion'] = df['amortizacion_acumulada_esperada'] - df['amortizacion_acumulada_simulada']
+    df['antiguedad_anios'] = (fecha_referencia - df['fecha_adquisicion']).dt.days / 365.25
+    return df
+
+
+def preparar_otros_activos(df, fecha_referencia):
+    """Convierte tipos y calcula los días desde el registro de otros activos."""
+    df['fecha_registro'] = pd.to_datetime(df['fecha_registro'])
+    df['monto'] = pd.to_numeric(df['monto'], errors='coerce').fillna(0)
+    df['dias_desde_registro'] = (fecha_referencia - df['fecha_registro']).dt.days
+    return df
+
+
+def marcar_zscore(zscores, umbral_zscore):
+    """-1 si el Z-score supera el umbral en valor absoluto, 1 en otro caso."""
+    return np.where((zscores > umbral_zscore) | (zscores < -umbral_zscore), -1, 1)
+
+
+def clasificar_resultado_inmuebles(df):
+    """Rótulo resultado_auditoria de inmuebles a partir de las marcas Z-score e IA."""
+    df['resultado_auditoria'] = clasificar_resultado(df['is_anomaly_zscore'], df['is_anomaly_ia'])
+    return df
+
+
+def marcar_precio_m2(df, indice=None):
+    """Agrega precio_m2, su referencia (ubicación × tipo × año), el puntaje robusto y is_anomaly_precio_m2."""
+    from indice_precio_m2 import IndicePrecioM2
+
+    if indice is None:
+        indice = IndicePrecioM2.construir(df)
+    evaluados = indice.evaluar(df)
+    for col in COLUMNAS_PRECIO_M2:
+        df[col] = evaluados[col]
+    return df
+
+
+def marcar_duplicados(df, clase):
+    """Agrega grupo_duplicado e is_anomaly_duplicado (activos registrados más de una vez)."""
+    from duplicados_activos import detectar_duplicados
+
+    duplicados = detectar_duplicados(df, clase)
+    for col in COLUMNAS_DUPLICADOS:
+        df[col] = duplicados[col]
+    return df
+
+
+def features_maquinarias(df):
+    """Features para IsolationForest de maquinarias."""
+    return df[FEATURES_MAQUINARIAS].copy()
+
+
+def features_inmuebles(df, medianas=None):
+    """Features para IsolationForest de inmuebles, con infinitos y faltantes reemplazados por la mediana.
+
+    medianas: valores de reemplazo por columna (p. ej. los de la auditoría que
+    ajustó el modelo); por defecto, las medianas de df.
+    """
+    features = df[FEATURES_INMUEBLES].copy()
+    features.replace([np.inf, -np.inf], np.nan, inplace=True)
+    features.fillna(features.median() if medianas is None else medianas, inplace=True)
+    return features
+
+
+# =================================================================
+# DETECCIÓN DE ANOMALÍAS CON IA
+# =================================================================
+
+def detectar_anomalias_ia(clase, features, contamination=CONTAMINACION, registro_modelos=None, n_jobs=None):
+    """Etiquetas de IsolationForest; con un registro de modelos se reutiliza el modelo ya ajustado."""
+    from sklearn.ensemble import IsolationForest
+
+    if registro_modelos is not None:
+        return registro_modelos.predecir(clase, features, contamination=contamination, random_state=42,
+                                         n_jobs=n_jobs)
+    iso = IsolationForest(random_state=42, contamination=contamination, n_jobs=n_jobs)
+    return iso.fit_predict(features)
+
+
+def detectar_ia(clase, df, features, contamination, registro_modelos, n_jobs, segmentar_ia):
+    """Agrega is_anomaly_ia a df; con segmentar_ia, también modelo_ia (segmento del modelo o 'global')."""
+    if not segmentar_ia:
+        df['is_anomaly_ia'] = detectar_anomalias_ia(clase, features, contamination, registro_modelos, n_jobs)
+        return df
+    from anomalias_por_segmento import detectar_por_segmento, columna_segmento
+
+    # Con n_jobs fijado por quien llama (p. ej. un proceso del pool del dashboard), no más procesos que eso
+    df['is_anomaly_ia'], df['modelo_ia'] = detectar_por_segmento(
+        clase, features, df[columna_segmento(clase, segmentar_ia)], contamination, registro_modelos,
+        n_jobs, max_workers=n_jobs)
+    return df
+
+
+# =================================================================
+# FUNCIONES DE AUDITORÍA - MAQUINARIAS
+# =================================================================
+
+def auditar_maquinarias(df, fecha_referencia=None, umbral_z=UMBRAL_Z_MAQUINARIAS, contamination=CONTAMINACION,
+                        registro_modelos=None, n_jobs=None, segmentar_ia=None):
+    """Aplica auditoría a maquinarias.
+
+    segmentar_ia ('tipo' o 'ubicacion'): un IsolationForest por segmento en lugar de uno global.
+    """
+    from scipy.stats import zscore
+
+    preparar_maquinarias(df, resolver_fecha_referencia(fecha_referencia))
+    df['valor_adquisicion_zscore'] = zscore(df['valor_adquisicion'])
+
+    detectar_ia('maquinarias', df, features_maquinarias(df), contamination, registro_modelos, n_jobs, segmentar_ia)
+
+    df['alerta_combinada'] = clasificar_alerta_combinada(
+        df['valor_adquisicion_zscore'], df['is_anomaly_ia'], umbral_z)
+    marcar_duplicados(df, 'maquinarias')
+
+    return df
+
+
+# =================================================================
+# FUNCIONES DE AUDITORÍA - INMUEBLES
+# =================================================================
+
+def auditar_inmuebles(df, fecha_referencia=None, umbral_zscore=UMBRAL_ZSCORE_INMUEBLES, contamination=CONTAMINACION,
+                      registro_modelos=None, n_jobs=None, segmentar_ia=None, indice_precio_m2=None,
+                      semilla=SEMILLA_VIDA_UTIL):
+    """Aplica auditoría a inmuebles.
+
+    segmentar_ia ('tipo' o 'ubicacion'): un IsolationForest por segmento en lugar de uno global.
+    indice_precio_m2: IndicePrecioM2 de referencia; por defecto se construye con los mismos inmuebles.
+    semilla: de la vida útil simulada de los inmuebles sin fecha_fin_vida_util.
+    """
+    from scipy.stats import zscore
+
+    preparar_inmuebles(df, resolver_fecha_referencia(fecha_referencia), semilla)
+
+    df['valor_adquisicion_zscore'] = zscore(df['valor_adquisicion'])
+    df['is_anomaly_zscore'] = marcar_zscore(df['valor_adquisicion_zscore'], umbral_zscore)
+
+    detectar_ia('inmuebles', df, features_inmuebles(df), contamination, registro_modelos, n_jobs, segmentar_ia)
+    marcar_precio_m2(df, indice_precio_m2)
+    marcar_duplicados(df, 'inmuebles')
+
+    return clasificar_resultado_inmuebles(df)
+
+
+# =================================================================
+# FUNCIONES DE AUDITORÍA - ACTIVOS INTANGIBLES
+# =================================================================
+
+def auditar_intangibles(df, fecha_referencia=None):
+    """Aplica auditoría a activos intangibles."""
+    return preparar_intangibles(df, resolver_fecha_referencia(fecha_referencia))
+
+
+# =================================================================
+# FUNCIONES DE AUDITORÍA - OTROS ACTIVOS
+# =================================================================
+
+def auditar_otros_activos(df, fecha_referencia=None):
+    """Aplica auditoría a otros activos."""
+    return preparar_otros_activos(df, resolver_fecha_referencia(fecha_referencia))
+
+
+# Función de auditoría por clase de activo
+AUDITORIAS = {
+    'maquinarias': auditar_maquinarias,
+    'inmuebles': auditar_inmuebles,
+    'intangibles': auditar_intangibles,
+    'otros_activos': auditar_otros_activos,
+}
+
+
+def auditar_clase(clase, df, fecha_referencia=None, umbral_z=UMBRAL_Z_MAQUINARIAS,
+                  umbral_zscore=UMBRAL_ZSCORE_INMUEBLES, contamination=CONTAMINACION,
+                  registro_modelos=None, n_jobs=None, segmentar_ia=None, indice_precio_m2=None,
+                  semilla=SEMILLA_VIDA_UTIL):
+    """Audita una clase de activo pasando a cada función sólo los parámetros que usa."""
+    if clase == 'maquinarias':
+        return auditar_maquinarias(df, fecha_referencia, umbral_z=umbral_z, contamination=contamination,
+                                   registro_modelos=registro_modelos, n_jobs=n_jobs, segmentar_ia=segmentar_ia)
+    if clase == 'inmuebles':
+        return auditar_inmuebles(df, fecha_referencia, umbral_zscore=umbral_zscore, contamination=contamination,
+                                 registro_modelos=registro_modelos, n_jobs=n_jobs, segmentar_ia=segmentar_ia,
+                                 indice_precio_m2=indice_precio_m2, semilla=semilla)
+    if clase in AUDITORIAS:
+        return AUDITORIAS[clase](df, fecha_referencia)
+    raise ValueError(f"Clase de activo desconocida: {clase}")
+
+
+# Columnas que necesitan resumir_auditoria y mascara_alertas (para leer sólo esas de un Parquet)
+COLUMNAS_RESUMEN = {
+    'maquinarias': ['valor_adquisicion', 'is_anomaly_ia', 'alerta_combinada', 'is_anomaly_duplicado'],
+    'inmuebles': ['valor_adquisicion', 'resultado_auditoria', 'is_anomaly_precio_m2', 'is_anomaly_duplicado'],
+    'intangibles': ['costo_adquisicion', 'discrepancia_vnc'],
+    'otros_activos': ['monto', 'dias_desde_registro'],
+}
+
+
+def _con_marcas(df, mascara):
+    """Suma a la máscara las marcas de precio/m² y de duplicados (los resultados guardados antes no las tienen)."""
+    for marca in ('is_anomaly_precio_m2', 'is_anomaly_duplicado'):
+        if marca in df.columns:
+            mascara = mascara | (df[marca] == -1)
+    return mascara
+
+
+def mascara_alertas(clase, df, umbral_z=UMBRAL_Z_MAQUINARIAS):
+    """Filas con alerta de una clase auditada (los mismos criterios que el dashboard).
+
+    Un lote auditado sin modelo de IA (auditoria_por_lotes) no tiene los rótulos
+    combinados: cuentan sus marcas de Z-score (umbral_z para maquinarias).
+    """
+    if clase == 'maquinarias':
+        if 'alerta_combinada' not in df.columns:
+            return _con_marcas(df, df['valor_adquisicion_zscore'].abs() > umbral_z)
+        return _con_marcas(df, df['alerta_combinada'] != 'Sin alerta')
+    if clase == 'inmuebles':
+        if 'resultado_auditoria' not in df.columns:
+            return _con_marcas(df, df['is_anomaly_zscore'] == -1)
+        return _con_marcas(df, df['resultado_auditoria'] != 'Normal')
+    if clase == 'intangibles':
+        return df['discrepancia_vnc'].abs() > 0.01
+    if clase == 'otros_activos':
+        return df['dias_desde_registro'] > 90
+    raise ValueError(f"Clase de activo desconocida: {clase}")
+
+
+def resumir_auditoria(clase, df):
+    """Totales y cantidad de alertas de una clase auditada (los mismos criterios que el dashboard)."""
+    alertas = int(mascara_alertas(clase, df).sum())
+    if clase == 'maquinarias':
+        return {'registros': len(df), 'valor_total': float(df['valor_adquisicion'].sum()),
+                'anomalias_ia': int((df['is_anomaly_ia'] == -1).sum()), 'alertas': alertas}
+    valor = {'inmuebles': 'valor_adquisicion', 'intangibles': 'costo_adquisicion', 'otros_activos': 'monto'}[clase]
+    return {'registros': len(df), 'valor_total': float(df[valor].sum()), 'alertas': alertas}
@@ -0,0 +1,205 @@
+"""
+AUDITORÍA DEL ACTIVO NO CORRIENTE SIN INTERFAZ (LÍNEA DE COMANDOS)
+
+Ejecuta las auditorías sobre exportaciones del ERP (o datos simulados) sin
+Streamlit, matplotlib ni seaborn, escribe los resultados en Parquet/CSV/JSON y
+termina con un código de salida apto para cron:
+
+    0  auditoría completa sin alertas (o sin --estricto)
+    1  error de datos o de lectura de archivos
+    3  auditoría completa con alertas y --estricto
+
+Ejemplo:
+    python auditoria_cli.py --maquinarias maq.csv --inmuebles inm.xlsx --salida resultados/
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from auditoria_activos import auditar_clase, resumir_auditoria, resolver_fecha_referencia, PARAMETROS_POR_DEFECTO
+from esquema_activos import compactar_con_informe
+from generador_datos_activos import generar_datos
+from ingesta_activos import cargar_activos, ruta_cache, ErrorValidacionDatos
+
+CLASES = ['maquinarias', 'inmuebles', 'intangibles', 'otros_activos']
+
+SALIDA_OK = 0
+SALIDA_ERROR_DATOS = 1
+SALIDA_CON_ALERTAS = 3
+
+
+def escribir_resultado(df, ruta_base, formato):
+    """Escribe un DataFrame auditado en el formato pedido y devuelve la ruta."""
+    ruta = f"{ruta_base}.{formato}"
+    if formato == 'parquet':
+        df.to_parquet(ruta, index=False)
+    elif formato == 'csv':
+        df.to_csv(ruta, index=False)
+    else:
+        df.to_json(ruta, orient='records', date_format='iso', force_ascii=False)
+    return ruta
+
+
+def auditar_lotes_cli(clase, ruta, args, fecha_referencia, indice_precio_m2=None):
+    """Audita una clase en modo por lotes (archivos mayores que la memoria)."""
+    from auditoria_por_lotes import auditar_por_lotes, SumideroParquet, SumideroCSV
+
+    if args.formato == 'json':
+        raise ValueError("El modo por lotes sólo admite salida parquet o csv")
+    destino = os.path.join(args.salida, f"{clase}.{args.formato}")
+    sumidero = SumideroParquet(destino) if args.formato == 'parquet' else SumideroCSV(destino)
+    estadisticos = None
+    if args.estadisticos:
+        from estadisticos_activos import AlmacenEstadisticos
+
+        estadisticos = AlmacenEstadisticos.cargar(args.estadisticos).resumen(clase)
+    with sumidero:
+        resumen = auditar_por_lotes(ruta, clase, sumidero, tamano_lote=args.tamano_lote,
+                                    fecha_referencia=fecha_referencia, estadisticos=estadisticos,
+                                    indice_precio_m2=indice_precio_m2)
+    resumen['archivo'] = destino
+    return resumen
+
+
+def auditar_incremental_cli(clase, df, args, fecha_referencia):
+    """Audita sólo lo que cambió respecto de la última ejecución incremental y guarda el nuevo estado."""
+    from auditoria_incremental import auditar_incremental, cargar_estado, guardar_estado
+
+    df, estado, incremental = auditar_incremental(clase, df, cargar_estado(clase, args.directorio_estado),
+                                                  fecha_referencia, reentrenar=args.reentrenar)
+    guardar_estado(estado, args.directorio_estado)
+    if incremental['requiere_reentrenamiento']:
+        print(f"⚠️ {clase}: conviene reajustar el modelo de IA ({'; '.join(incremental['motivos'])})",
+              file=sys.stderr)
+    return df, incremental
+
+
+def guardar_en_historial(clase, df, ruta, args, fecha_referencia):
+    """Guarda la foto fechada del resultado; la entrada se identifica igual que en el dashboard."""
+    from historial_auditorias import HistorialAuditorias
+
+    if ruta:
+        entrada = os.path.basename(ruta_cache(ruta, clase))
+    else:
+        entrada = f"simulado-{clase}" if args.simulados is None else f"simulado-{clase}-{args.simulados}"
+    parametros = {**PARAMETROS_POR_DEFECTO, 'segmentar_ia': args.segmentar_ia}
+    if args.indice_precio_m2:
+        parametros['indice_precio_m2'] = os.path.basename(args.indice_precio_m2)
+    return HistorialAuditorias(args.directorio_historial).guardar(clase, df, fecha_referencia, entrada, parametros)
+
+
+def informar_clase(clase, datos, inicio, resumen, args, codigo):
+    """Registra el resultado de una clase en el resumen, lo imprime y devuelve el código de salida."""
+    datos['tiempo_s'] = round(time.perf_counter() - inicio, 3)
+    resumen['clases'][clase] = datos
+    print(f"✅ {clase}: {datos['registros']} registros, {datos['alertas']} alertas ({datos['tiempo_s']} s)")
+    if args.estricto and datos['alertas'] and codigo == SALIDA_OK:
+        return SALIDA_CON_ALERTAS
+    return codigo
+
+
+def ejecutar(args):
+    """Audita las clases pedidas y devuelve (código de salida, resumen)."""
+    fecha_referencia = resolver_fecha_referencia(args.fecha_referencia)
+    os.makedirs(args.salida, exist_ok=True)
+
+    rutas = {clase: getattr(args, clase) for clase in CLASES if getattr(args, clase)}
+    clases = list(rutas) if rutas else CLASES
+    if rutas and args.simulados:
+        clases = CLASES
+
+    resumen = {'fecha_referencia': fecha_referencia.isoformat(), 'clases': {}}
+    codigo = SALIDA_OK
+    indice_precio_m2 = None
+    if args.indice_precio_m2:
+        from indice_precio_m2 import IndicePrecioM2
+
+        try:
+            indice_precio_m2 = IndicePrecioM2.cargar(args.indice_precio_m2)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ índice de precio/m²: {e}", file=sys.stderr)
+            return SALIDA_ERROR_DATOS, resumen
+    for clase in clases:
+        inicio = time.perf_counter()
+        ruta = rutas.get(clase)
+        try:
+            if ruta and args.tamano_lote:
+                datos = auditar_lotes_cli(clase, ruta, args, fecha_referencia, indice_precio_m2)
+                datos['registros'] = datos['filas']
+                codigo = informar_clase(clase, datos, inicio, resumen, args, codigo)
+                continue
+            df = cargar_activos(ruta, clase) if ruta else generar_datos(
+                clase, args.simulados, fecha_referencia=fecha_referencia)
+            if args.incremental:
+                df, incremental = auditar_incremental_cli(clase, df, args, fecha_referencia)
+            else:
+                df = auditar_clase(clase, df, fecha_referencia, segmentar_ia=args.segmentar_ia,
+                                   indice_precio_m2=indice_precio_m2)
+        except (OSError, ErrorValidacionDatos, ValueError) as e:
+            print(f"❌ {clase}: {e}", file=sys.stderr)
+            resumen['clases'][clase] = {'error': str(e)}
+            codigo = SALIDA_ERROR_DATOS
+            continue
+
+        df, datos_memoria = compactar_con_informe(df, clase)
+        datos = resumir_auditoria(clase, df)
+        datos['memoria'] = datos_memoria
+        if args.incremental:
+            datos['incremental'] = incremental
+        datos['archivo'] = escribir_resultado(df, os.path.join(args.salida, clase), args.formato)
+        if args.historial:
+            datos['foto'] = guardar_en_historial(clase, df, ruta, args, fecha_referencia)
+        codigo = informar_clase(clase, datos, inicio, resumen, args, codigo)
+
+    with open(os.path.join(args.salida, 'resumen.json'), 'w', encoding='utf-8') as f:
+        json.dump(resumen, f, ensure_ascii=False, indent=2)
+    return codigo, resumen
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Auditoría del Activo No Corriente sin interfaz gráfica")
+    for clase in CLASES:
+        parser.add_argument(f"--{clase.replace('_', '-')}", dest=clase, metavar='ARCHIVO',
+                            help=f"Exportación del ERP de {clase} (CSV/Excel/Parquet)")
+    parser.add_argument('--simulados', type=int, metavar='N', default=None,
+                        help="Audita datos simulados de N registros para las clases sin archivo")
+    parser.add_argument('--salida', default='resultados_auditoria', help="Directorio de resultados")
+    parser.add_argument('--formato', choices=['parquet', 'csv', 'json'], default='parquet')
+    parser.add_argument('--fecha-referencia', default=None, help="Fecha de la auditoría (AAAA-MM-DD)")
+    parser.add_argument('--tamano-lote', type=int, default=None,
+                        help="Procesa los archivos por lotes de este tamaño (registros mayores que la RAM)")
+    parser.add_argument('--estadisticos', default=None, metavar='RESUMEN',
+                        help="En modo por lotes, toma media y desvío de este resumen (estadisticos_activos) "
+                             "en lugar de releer el archivo")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Recalcula sólo los activos nuevos o modificados desde la última ejecución incremental")
+    parser.add_argument('--directorio-estado', default='data/estado_auditoria',
+                        help="Dónde se guarda la última foto auditada para el modo incremental")
+    parser.add_argument('--reentrenar', action='store_true',
+                        help="En modo incremental, reajusta el modelo de IA si el cambio lo justifica")
+    parser.add_argument('--segmentar-ia', choices=['tipo', 'ubicacion'], default=None,
+                        help="Un modelo de IA por tipo de activo o por ubicación (no aplica a --incremental "
+                             "ni a --tamano-lote)")
+    parser.add_argument('--indice-precio-m2', default=None, metavar='INDICE',
+                        help="Índice de precio/m² de referencia (indice_precio_m2.py construir); por defecto "
+                             "los inmuebles se comparan entre sí")
+    parser.add_argument('--historial', action='store_true',
+                        help="Guarda además una foto fechada de cada resultado en el historial de auditorías")
+    parser.add_argument('--directorio-historial', default='data/historial_auditorias',
+                        help="Raíz del historial (Parquet particionado por clase y fecha de referencia)")
+    parser.add_argument('--estricto', action='store_true',
+                        help=f"Termina con código {SALIDA_CON_ALERTAS} si hay alertas")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    codigo, _ = ejecutar(args)
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
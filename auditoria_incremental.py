@@ -0,0 +1,257 @@
+# =================================================================
+# AUDITORÍA INCREMENTAL (SÓLO ACTIVOS NUEVOS O MODIFICADOS)
+# =================================================================
+# Compara la nueva foto de una clase con la última auditada por clave primaria
+# (hash de las columnas de entrada de cada fila) y:
+#   - recalcula los pasos deterministas sólo para altas y modificaciones,
+#   - actualiza la media y el desvío de valor_adquisicion quitando las filas
+#     viejas y sumando las nuevas (sin recorrer el registro completo),
+#   - recalcula Z-scores y rótulos de todas las filas (vectorizado, barato),
+#   - puntúa con el IsolationForest ya ajustado sólo las filas que cambiaron y
+#     avisa cuando la magnitud del cambio justifica reajustar el modelo.
+# El estado (última foto auditada + estadísticos + modelo) se guarda en disco.
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from auditoria_activos import (auditar_clase, marcar_zscore, marcar_precio_m2, marcar_duplicados,
+                               clasificar_resultado_inmuebles, resolver_fecha_referencia, UMBRAL_Z_MAQUINARIAS,
+                               UMBRAL_ZSCORE_INMUEBLES, CONTAMINACION)
+from auditoria_por_lotes import EstadisticosCorrientes, auditar_lote, CLASES_CON_ZSCORE
+from ingesta_activos import ESQUEMAS, ErrorValidacionDatos
+from modelos_anomalias import RegistroModelos
+from reglas_auditoria import clasificar_alerta_combinada
+
+DIRECTORIO_ESTADO = "data/estado_auditoria"
+
+CLAVES_PRIMARIAS = {
+    'maquinarias': 'id_equipo',
+    'inmuebles': 'id_inmueble',
+    'intangibles': 'activo_id',
+    'otros_activos': 'id_activo',
+}
+
+# Por encima de esta fracción de filas cambiadas conviene reajustar el modelo de IA
+UMBRAL_CAMBIOS = 0.10
+# Deriva máxima de la media (en desvíos) o del desvío (relativa) antes de reajustar
+UMBRAL_DERIVA = 0.10
+
+COLUMNA_HUELLA = 'huella_fila'
+
+
+class EstadoAuditoria:
+    """Última foto auditada de una clase, con los estadísticos y el modelo de IA que se usaron."""
+
+    def __init__(self, clase, df, fecha_referencia, contamination=CONTAMINACION, estadisticos=None,
+                 clave_modelo=None):
+        self.clase = clase
+        self.df = df
+        self.fecha_referencia = pd.Timestamp(fecha_referencia)
+        self.contamination = contamination
+        self.estadisticos = estadisticos
+        self.clave_modelo = clave_modelo
+
+
+def _rutas_estado(clase, directorio):
+    base = os.path.join(directorio, clase)
+    return f"{base}.parquet", f"{base}.json"
+
+
+def guardar_estado(estado, directorio=DIRECTORIO_ESTADO):
+    """Guarda la foto auditada (Parquet) y sus metadatos (JSON) de forma atómica."""
+    os.makedirs(directorio, exist_ok=True)
+    ruta_datos, ruta_meta = _rutas_estado(estado.clase, directorio)
+    meta = {
+        'fecha_referencia': estado.fecha_referencia.isoformat(),
+        'contamination': estado.contamination,
+        'clave_modelo': estado.clave_modelo,
+        'estadisticos': None if estado.estadisticos is None else {
+            'n': estado.estadisticos.n, 'media': estado.estadisticos.media, 'm2': estado.estadisticos.m2},
+    }
+    tmp = f"{ruta_datos}.{os.getpid()}.tmp"
+    estado.df.to_parquet(tmp, index=False)
+    os.replace(tmp, ruta_datos)
+    tmp = f"{ruta_meta}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, ruta_meta)
+
+
+def cargar_estado(clase, directorio=DIRECTORIO_ESTADO):
+    """Estado guardado de la clase, o None si todavía no se auditó."""
+    ruta_datos, ruta_meta = _rutas_estado(clase, directorio)
+    if not (os.path.exists(ruta_datos) and os.path.exists(ruta_meta)):
+        return None
+    with open(ruta_meta, encoding='utf-8') as f:
+        meta = json.load(f)
+    estadisticos = None
+    if meta['estadisticos'] is not None:
+        estadisticos = EstadisticosCorrientes()
+        estadisticos.n, estadisticos.media, estadisticos.m2 = (
+            meta['estadisticos']['n'], meta['estadisticos']['media'], meta['estadisticos']['m2'])
+    return EstadoAuditoria(clase, pd.read_parquet(ruta_datos), meta['fecha_referencia'],
+                           meta['contamination'], estadisticos, meta['clave_modelo'])
+
+
+# =================================================================
+# DIFERENCIAS ENTRE FOTOS
+# =================================================================
+
+def huellas_filas(df, clase):
+    """Hash de las columnas de entrada de cada fila, indexado por la clave primaria."""
+    clave = CLAVES_PRIMARIAS[clase]
+    if df[clave].duplicated().any():
+        raise ErrorValidacionDatos(f"Hay valores repetidos en la clave primaria '{clave}' de {clase}")
+    columnas = [col for col in ESQUEMAS[clase] if col in df.columns]
+    huellas = pd.util.hash_pandas_object(df[columnas], index=False)
+    return pd.Series(huellas.to_numpy(), index=pd.Index(df[clave], name=clave), name=COLUMNA_HUELLA)
+
+
+def diferenciar(huellas_anteriores, huellas_nuevas):
+    """Claves dadas de alta, dadas de baja y modificadas entre dos fotos."""
+    comunes = huellas_nuevas.index.intersection(huellas_anteriores.index)
+    distintas = huellas_nuevas.loc[comunes].to_numpy() != huellas_anteriores.loc[comunes].to_numpy()
+    return {
+        'altas': huellas_nuevas.index.difference(huellas_anteriores.index),
+        'bajas': huellas_anteriores.index.difference(huellas_nuevas.index),
+        'modificadas': comunes[distintas],
+    }
+
+
+def evaluar_reentrenamiento(n_anterior, cambios, estadisticos_anteriores, estadisticos_nuevos,
+                            umbral_cambios=UMBRAL_CAMBIOS, umbral_deriva=UMBRAL_DERIVA):
+    """Motivos para reajustar el IsolationForest (lista vacía si alcanza con puntuar las filas nuevas)."""
+    motivos = []
+    n_cambios = sum(len(claves) for claves in cambios.values())
+    if n_anterior == 0 or n_cambios / n_anterior > umbral_cambios:
+        motivos.append(f"{n_cambios} filas cambiadas (más del {umbral_cambios:.0%} del registro)")
+    desvio = estadisticos_anteriores.desviacion
+    if desvio and np.isfinite(desvio):
+        deriva_media = abs(estadisticos_nuevos.media - estadisticos_anteriores.media) / desvio
+        deriva_desvio = abs(estadisticos_nuevos.desviacion / desvio - 1)
+        if deriva_media > umbral_deriva:
+            motivos.append(f"la media de valor_adquisicion se movió {deriva_media:.2f} desvíos")
+        if deriva_desvio > umbral_deriva:
+            motivos.append(f"el desvío de valor_adquisicion cambió {deriva_desvio:.0%}")
+    return motivos
+
+
+# =================================================================
+# AUDITORÍA INCREMENTAL
+# =================================================================
+
+def _reclasificar(df, clase, estadisticos, umbral_z, umbral_zscore):
+    """Z-score y rótulos de todas las filas con los estadísticos actualizados."""
+    if clase not in CLASES_CON_ZSCORE:
+        return df
+    df['valor_adquisicion_zscore'] = estadisticos.zscore(df['valor_adquisicion'])
+    # Un alta puede duplicar una fila conservada: los grupos se rearman con todas las filas
+    marcar_duplicados(df, clase)
+    if clase == 'maquinarias':
+        df['alerta_combinada'] = clasificar_alerta_combinada(
+            df['valor_adquisicion_zscore'], df['is_anomaly_ia'], umbral_z)
+        return df
+    df['is_anomaly_zscore'] = marcar_zscore(df['valor_adquisicion_zscore'], umbral_zscore)
+    # El índice de precio/m² se rearma con todas las filas, igual que en la auditoría completa
+    marcar_precio_m2(df)
+    return clasificar_resultado_inmuebles(df)
+
+
+def _auditoria_completa(clase, nuevo, huellas, fecha_referencia, umbral_z, umbral_zscore, contamination,
+                        registro_modelos, n_jobs):
+    df = auditar_clase(clase, nuevo.copy(), fecha_referencia, umbral_z=umbral_z, umbral_zscore=umbral_zscore,
+                       contamination=contamination, registro_modelos=registro_modelos, n_jobs=n_jobs)
+    df[COLUMNA_HUELLA] = huellas.to_numpy()
+    estadisticos = None
+    if clase in CLASES_CON_ZSCORE:
+        estadisticos = EstadisticosCorrientes().actualizar(df['valor_adquisicion'])
+    return EstadoAuditoria(clase, df, fecha_referencia, contamination, estadisticos,
+                           registro_modelos.clave_ultimo(clase) if clase in CLASES_CON_ZSCORE else None)
+
+
+def _motivo_auditoria_completa(estado, clase, fecha_referencia, contamination):
+    """Motivo por el que no se puede reutilizar el estado (None si se puede)."""
+    if estado is None:
+        return 'sin auditoría anterior'
+    if pd.Timestamp(fecha_referencia).normalize() != estado.fecha_referencia.normalize():
+        return 'cambió la fecha de referencia'
+    if contamination != estado.contamination:
+        return 'cambió la contaminación del modelo'
+    if clase in CLASES_CON_ZSCORE and estado.clave_modelo is None:
+        return 'no hay modelo de IA anterior'
+    return None
+
+
+def auditar_incremental(clase, nuevo, estado=None, fecha_referencia=None, umbral_z=UMBRAL_Z_MAQUINARIAS,
+                        umbral_zscore=UMBRAL_ZSCORE_INMUEBLES, contamination=CONTAMINACION,
+                        registro_modelos=None, n_jobs=None, reentrenar=False,
+                        umbral_cambios=UMBRAL_CAMBIOS, umbral_deriva=UMBRAL_DERIVA):
+    """Audita la nueva foto de una clase reutilizando la última auditoría (estado).
+
+    Hace una auditoría completa si no hay estado, si cambió el día de referencia
+    o la contaminación, si no se encuentra el modelo de IA usado, o si
+    reentrenar=True y el cambio lo justifica. En otro caso sólo recalcula las
+    filas nuevas o modificadas.
+
+    Devuelve (df auditado, nuevo estado, resumen) donde el resumen indica el
+    modo ('completa'/'incremental'), los conteos de altas/bajas/modificadas y
+    si hace falta reajustar el modelo (requiere_reentrenamiento, motivos).
+    """
+    fecha_referencia = resolver_fecha_referencia(fecha_referencia)
+    registro_modelos = registro_modelos or RegistroModelos()
+    clave = CLAVES_PRIMARIAS[clase]
+    huellas = huellas_filas(nuevo, clase)
+
+    def completa(motivo, motivos=(), cambios=None):
+        nuevo_estado = _auditoria_completa(clase, nuevo, huellas, fecha_referencia, umbral_z, umbral_zscore,
+                                           contamination, registro_modelos, n_jobs)
+        df = nuevo_estado.df.drop(columns=COLUMNA_HUELLA)
+        resumen = {'modo': 'completa', 'motivo': motivo, 'registros': len(df), 'recalculadas': len(df),
+                   'requiere_reentrenamiento': False, 'motivos': list(motivos)}
+        resumen.update({k: len(v) for k, v in (cambios or {}).items()})
+        return df, nuevo_estado, resumen
+
+    motivo = _motivo_auditoria_completa(estado, clase, fecha_referencia, contamination)
+    modelo = None
+    if motivo is None and clase in CLASES_CON_ZSCORE:
+        modelo = registro_modelos.cargar(estado.clave_modelo)
+        if modelo is None:
+            motivo = 'no se encontró el modelo de IA anterior'
+    if motivo is not None:
+        return completa(motivo)
+
+    anterior = estado.df.set_index(clave, drop=False)
+    cambios = diferenciar(anterior[COLUMNA_HUELLA], huellas)
+    salientes = cambios['bajas'].append(cambios['modificadas'])
+    entrantes = cambios['altas'].append(cambios['modificadas'])
+    filas_nuevas = nuevo.set_index(clave, drop=False).loc[entrantes].reset_index(drop=True)
+
+    estadisticos = None
+    motivos = []
+    if clase in CLASES_CON_ZSCORE:
+        estadisticos = EstadisticosCorrientes().combinar(estado.estadisticos)
+        estadisticos.retirar(anterior.loc[salientes, 'valor_adquisicion'])
+        estadisticos.actualizar(filas_nuevas['valor_adquisicion'])
+        motivos = evaluar_reentrenamiento(len(anterior), cambios, estado.estadisticos, estadisticos,
+                                          umbral_cambios, umbral_deriva)
+        if motivos and reentrenar:
+            return completa('reentrenamiento del modelo de IA', motivos, cambios)
+
+    conservadas = anterior.drop(index=salientes).reset_index(drop=True)
+    if len(filas_nuevas):
+        recalculadas = auditar_lote(filas_nuevas, clase, fecha_referencia, estadisticos, modelo,
+                                    umbral_z=umbral_z, umbral_zscore=umbral_zscore)
+        recalculadas[COLUMNA_HUELLA] = huellas.loc[entrantes].to_numpy()
+        # reindex: auditar_lote no calcula las columnas que se recalculan para todas las filas
+        # (precio/m², duplicados)
+        conservadas = pd.concat([conservadas, recalculadas.reindex(columns=anterior.columns)], ignore_index=True)
+    df = conservadas.iloc[pd.Index(conservadas[clave]).get_indexer(huellas.index)].reset_index(drop=True)
+    df = _reclasificar(df, clase, estadisticos, umbral_z, umbral_zscore)
+
+    nuevo_estado = EstadoAuditoria(clase, df, fecha_referencia, contamination, estadisticos, estado.clave_modelo)
+    resumen = {'modo': 'incremental', 'motivo': None, 'registros': len(df), 'recalculadas': len(entrantes),
+               'requiere_reentrenamiento': bool(motivos), 'motivos': motivos}
+    resumen.update({k: len(v) for k, v in cambios.items()})
+    return df.drop(columns=COLUMNA_HUELLA), nuevo_estado, resumen
@@ -0,0 +1,252 @@
+# =================================================================
+# AUDITORÍA POR LOTES (STREAMING) PARA REGISTROS MAYORES QUE LA RAM
+# =================================================================
+# Procesa la entrada en lotes de tamaño fijo en dos pasadas:
+#   1. Media y varianza corrientes (Welford/Chan) de valor_adquisicion.
+#   2. Pasos deterministas de auditoria_activos + Z-score con las estadísticas
+#      de la primera pasada; cada lote se escribe en un sumidero por lotes.
+# Sólo hay un lote en memoria a la vez, sin importar el tamaño del archivo.
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from auditoria_activos import (preparar_maquinarias, preparar_inmuebles, preparar_intangibles,
+                               preparar_otros_activos, marcar_zscore, clasificar_resultado_inmuebles,
+                               marcar_precio_m2, features_maquinarias, features_inmuebles, mascara_alertas,
+                               UMBRAL_Z_MAQUINARIAS, UMBRAL_ZSCORE_INMUEBLES, resolver_fecha_referencia)
+from ingesta_activos import validar_columnas, tipar_columnas
+from reglas_auditoria import clasificar_alerta_combinada
+
+TAMANO_LOTE = 100_000
+
+# Clases cuya auditoría calcula el Z-score de valor_adquisicion
+CLASES_CON_ZSCORE = {'maquinarias', 'inmuebles'}
+
+
+# =================================================================
+# ESTADÍSTICOS CORRIENTES
+# =================================================================
+
+class EstadisticosCorrientes:
+    """Media y varianza poblacional acumuladas por lotes (algoritmo de Welford/Chan)."""
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+
+    def actualizar(self, valores):
+        """Incorpora un lote de valores (se ignoran los NaN)."""
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return self
+        n_lote = valores.size
+        media_lote = valores.mean()
+        m2_lote = ((valores - media_lote) ** 2).sum()
+        self._combinar(n_lote, media_lote, m2_lote)
+        return self
+
+    def combinar(self, otro):
+        """Combina con los estadísticos de otro lote o partición."""
+        if otro.n:
+            self._combinar(otro.n, otro.media, otro.m2)
+        return self
+
+    def retirar(self, valores):
+        """Quita de la población un lote de valores ya incorporado (se ignoran los NaN)."""
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return self
+        n_b = valores.size
+        n = self.n - n_b
+        if n <= 0:
+            self.n, self.media, self.m2 = 0, 0.0, 0.0
+            return self
+        media_b = valores.mean()
+        media = (self.n * self.media - n_b * media_b) / n
+        delta = media_b - media
+        self.m2 = max(self.m2 - ((valores - media_b) ** 2).sum() - delta ** 2 * n * n_b / self.n, 0.0)
+        self.media = media
+        self.n = n
+        return self
+
+    def _combinar(self, n_b, media_b, m2_b):
+        n = self.n + n_b
+        delta = media_b - self.media
+        self.media += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+
+    @property
+    def desviacion(self):
+        """Desvío estándar poblacional (ddof=0, como scipy.stats.zscore)."""
+        return np.sqrt(self.m2 / self.n) if self.n else np.nan
+
+    def zscore(self, valores):
+        """Z-score de los valores respecto de la población acumulada."""
+        return (np.asarray(valores, dtype=float) - self.media) / self.desviacion
+
+
+# =================================================================
+# LECTURA Y ESCRITURA POR LOTES
+# =================================================================
+
+def leer_por_lotes(ruta, clase, tamano_lote=TAMANO_LOTE, separador=','):
+    """Itera la entrada (Parquet o CSV) en DataFrames de a lo sumo tamano_lote filas."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.parquet':
+        archivo = pq.ParquetFile(ruta)
+        lotes = (lote.to_pandas() for lote in archivo.iter_batches(batch_size=tamano_lote))
+    elif extension in ('.csv', '.txt'):
+        lotes = pd.read_csv(ruta, sep=separador, chunksize=tamano_lote)
+    else:
+        raise ValueError(f"Formato no soportado para lectura por lotes: {extension}")
+
+    for lote in lotes:
+        lote.columns = [str(col).strip() for col in lote.columns]
+        validar_columnas(lote, clase)
+        yield tipar_columnas(lote, clase)
+
+
+class SumideroParquet:
+    """Escribe lotes de DataFrames en un único archivo Parquet (un row group por lote)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._escritor = None
+        self._esquema = None
+
+    def escribir(self, df):
+        """Escribe un lote (DataFrame o pyarrow.Table) como un row group."""
+        if isinstance(df, pa.Table):
+            tabla = df if self._esquema is None else df.cast(self._esquema)
+        else:
+            tabla = pa.Table.from_pandas(df, schema=self._esquema, preserve_index=False)
+        if self._escritor is None:
+            self._esquema = tabla.schema
+            self._escritor = pq.ParquetWriter(self.ruta, self._esquema)
+        self._escritor.write_table(tabla)
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class SumideroCSV:
+    """Agrega lotes de DataFrames a un archivo CSV (encabezado sólo en el primero)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._primero = True
+
+    def escribir(self, df):
+        df.to_csv(self.ruta, mode='w' if self._primero else 'a', header=self._primero, index=False)
+        self._primero = False
+
+    def cerrar(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+# =================================================================
+# AUDITORÍA POR LOTES
+# =================================================================
+
+def calcular_estadisticos(ruta, clase, tamano_lote=TAMANO_LOTE, columna='valor_adquisicion'):
+    """Primera pasada: estadísticos corrientes de una columna de la entrada."""
+    estadisticos = EstadisticosCorrientes()
+    for lote in leer_por_lotes(ruta, clase, tamano_lote):
+        estadisticos.actualizar(lote[columna])
+    return estadisticos
+
+
+def auditar_lote(lote, clase, fecha_referencia, estadisticos=None, modelo_ia=None,
+                 umbral_z=UMBRAL_Z_MAQUINARIAS, umbral_zscore=UMBRAL_ZSCORE_INMUEBLES, indice_precio_m2=None):
+    """Aplica a un lote los pasos de auditoría que no dependen del resto del registro.
+
+    Con estadísticos de población se agrega el Z-score; con un IsolationForest ya
+    ajustado, además, las marcas de IA y los rótulos combinados. Con un índice de
+    precio/m², los inmuebles se comparan con él.
+    """
+    if clase == 'maquinarias':
+        preparar_maquinarias(lote, fecha_referencia)
+    elif clase == 'inmuebles':
+        preparar_inmuebles(lote, fecha_referencia)
+        if indice_precio_m2 is not None:
+            marcar_precio_m2(lote, indice_precio_m2)
+    elif clase == 'intangibles':
+        return preparar_intangibles(lote, fecha_referencia)
+    elif clase == 'otros_activos':
+        return preparar_otros_activos(lote, fecha_referencia)
+    else:
+        raise ValueError(f"Clase de activo desconocida: {clase}")
+
+    if estadisticos is None:
+        return lote
+    lote['valor_adquisicion_zscore'] = estadisticos.zscore(lote['valor_adquisicion'])
+
+    if clase == 'maquinarias':
+        if modelo_ia is not None:
+            lote['is_anomaly_ia'] = modelo_ia.predict(features_maquinarias(lote))
+            lote['alerta_combinada'] = clasificar_alerta_combinada(
+                lote['valor_adquisicion_zscore'], lote['is_anomaly_ia'], umbral_z)
+    else:
+        lote['is_anomaly_zscore'] = marcar_zscore(lote['valor_adquisicion_zscore'], umbral_zscore)
+        if modelo_ia is not None:
+            # La mediana para completar faltantes es la del lote, no la del registro completo
+            lote['is_anomaly_ia'] = modelo_ia.predict(features_inmuebles(lote))
+            clasificar_resultado_inmuebles(lote)
+    return lote
+
+
+def auditar_por_lotes(ruta_entrada, clase, sumidero, tamano_lote=TAMANO_LOTE, fecha_referencia=None,
+                      modelo_ia=None, umbral_z=UMBRAL_Z_MAQUINARIAS, umbral_zscore=UMBRAL_ZSCORE_INMUEBLES,
+                      estadisticos=None, indice_precio_m2=None):
+    """Audita un archivo por lotes y escribe cada lote auditado en el sumidero.
+
+    Todos los lotes usan la misma fecha de referencia y, para maquinarias e
+    inmuebles, la media y el desvío del registro completo (primera pasada), por
+    lo que el resultado coincide con la auditoría en una sola pasada. Con
+    estadísticos ya calculados (por ejemplo, un resumen de estadisticos_activos
+    combinado de varios días) se omite la primera pasada. El precio/m² de los
+    inmuebles sólo se marca con un índice ya construido (indice_precio_m2).
+    Devuelve un resumen con filas, lotes, alertas (contadas lote a lote con los
+    criterios de mascara_alertas) y estadísticos usados.
+    """
+    fecha_referencia = resolver_fecha_referencia(fecha_referencia)
+    if clase not in CLASES_CON_ZSCORE:
+        estadisticos = None
+    elif estadisticos is None:
+        estadisticos = calcular_estadisticos(ruta_entrada, clase, tamano_lote)
+
+    filas = 0
+    lotes = 0
+    alertas = 0
+    for lote in leer_por_lotes(ruta_entrada, clase, tamano_lote):
+        auditado = auditar_lote(lote, clase, fecha_referencia, estadisticos, modelo_ia,
+                                umbral_z=umbral_z, umbral_zscore=umbral_zscore, indice_precio_m2=indice_precio_m2)
+        alertas += int(mascara_alertas(clase, auditado, umbral_z).sum())
+        sumidero.escribir(auditado)
+        filas += len(auditado)
+        lotes += 1
+
+    resumen = {'clase': clase, 'filas': filas, 'lotes': lotes, 'alertas': alertas}
+    if estadisticos is not None:
+        resumen.update({'media': estadisticos.media, 'desviacion': estadisticos.desviacion})
+    return resumen
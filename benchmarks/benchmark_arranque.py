@@ -0,0 +1,117 @@
+"""
+BENCHMARK DE ARRANQUE EN FRÍO DEL DASHBOARD
+
+Mide, en procesos nuevos (sin cachés de importación en memoria):
+  - el tiempo de importar Activo_no_corriente_app,
+  - qué dependencias pesadas quedan cargadas tras la importación,
+  - el tiempo hasta el primer render (primer st.title) y hasta el render completo.
+
+Termina con código 1 si se excede algún presupuesto o si se importa una
+dependencia pesada al arrancar, para poder usarlo como control en CI.
+
+    python benchmarks/benchmark_arranque.py --repeticiones 5 --salida arranque.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = 'Activo_no_corriente_app.py'
+
+PRESUPUESTO_IMPORTACION_S = 1.5
+PRESUPUESTO_PRIMER_RENDER_S = 3.0
+
+# Dependencias que sólo deben cargarse al usarse, nunca al importar la app
+MODULOS_DIFERIDOS = ['sklearn', 'scipy', 'matplotlib', 'seaborn', 'PyPDF2', 'faker', 'reportlab']
+
+_CODIGO_IMPORTACION = """
+import json, sys, time
+inicio = time.perf_counter()
+import Activo_no_corriente_app
+tiempo = time.perf_counter() - inicio
+print(json.dumps({'tiempo_s': tiempo,
+                  'cargados': [m for m in %r if m in sys.modules]}))
+"""
+
+_CODIGO_RENDER = """
+import json, time
+inicio = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+marcas = {}
+titulo_original = streamlit.title
+
+def titulo_medido(*args, **kwargs):
+    marcas.setdefault('primer_render_s', time.perf_counter() - inicio)
+    return titulo_original(*args, **kwargs)
+
+streamlit.title = titulo_medido
+prueba = AppTest.from_file(%r, default_timeout=600)
+prueba.run()
+marcas['render_completo_s'] = time.perf_counter() - inicio
+marcas['excepciones'] = [str(e.value) for e in prueba.exception]
+print(json.dumps(marcas))
+"""
+
+
+def _ejecutar(codigo):
+    """Ejecuta código en un intérprete nuevo desde la raíz del repositorio y lee su JSON."""
+    salida = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def medir(repeticiones=5, medir_render=True):
+    """Mediana de las mediciones de importación y (opcionalmente) de render."""
+    importaciones = [_ejecutar(_CODIGO_IMPORTACION % MODULOS_DIFERIDOS) for _ in range(repeticiones)]
+    resultado = {
+        'importacion_s': statistics.median(m['tiempo_s'] for m in importaciones),
+        'modulos_diferidos_cargados': sorted(set().union(*(m['cargados'] for m in importaciones))),
+    }
+    if medir_render:
+        renders = [_ejecutar(_CODIGO_RENDER % APP) for _ in range(repeticiones)]
+        resultado['primer_render_s'] = statistics.median(m['primer_render_s'] for m in renders)
+        resultado['render_completo_s'] = statistics.median(m['render_completo_s'] for m in renders)
+        resultado['excepciones'] = sorted(set().union(*(m['excepciones'] for m in renders)))
+    return resultado
+
+
+def verificar_presupuesto(resultado, presupuesto_importacion, presupuesto_primer_render):
+    """Lista de incumplimientos del presupuesto (vacía si todo está dentro)."""
+    fallas = []
+    if resultado['importacion_s'] > presupuesto_importacion:
+        fallas.append(f"importación {resultado['importacion_s']:.2f} s > {presupuesto_importacion} s")
+    if resultado['modulos_diferidos_cargados']:
+        fallas.append(f"dependencias cargadas al importar: {', '.join(resultado['modulos_diferidos_cargados'])}")
+    if 'primer_render_s' in resultado and resultado['primer_render_s'] > presupuesto_primer_render:
+        fallas.append(f"primer render {resultado['primer_render_s']:.2f} s > {presupuesto_primer_render} s")
+    if resultado.get('excepciones'):
+        fallas.append(f"excepciones en el render: {resultado['excepciones']}")
+    return fallas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío del dashboard")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--sin-render', action='store_true', help="Mide sólo la importación")
+    parser.add_argument('--presupuesto-importacion', type=float, default=PRESUPUESTO_IMPORTACION_S)
+    parser.add_argument('--presupuesto-primer-render', type=float, default=PRESUPUESTO_PRIMER_RENDER_S)
+    parser.add_argument('--salida', help="Archivo JSON con los resultados")
+    args = parser.parse_args(argv)
+
+    resultado = medir(args.repeticiones, medir_render=not args.sin_render)
+    resultado['fallas'] = verificar_presupuesto(resultado, args.presupuesto_importacion,
+                                                args.presupuesto_primer_render)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+    return 1 if resultado['fallas'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
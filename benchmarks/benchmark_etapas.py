@@ -0,0 +1,197 @@
+"""
+BENCHMARK DE ETAPAS: GENERACIÓN, AUDITORÍA Y ANÁLISIS
+
+Mide generar_datos, auditar_clase y las funciones analizar_* del dashboard
+para cada clase de activo con 1k/100k/1M registros (configurable). Por cada
+combinación registra:
+  - tiempo de pared (mediana de las repeticiones),
+  - RSS pico del proceso y su incremento durante la etapa,
+  - pico de memoria asignada por Python/NumPy (tracemalloc).
+
+Cada medición corre en un proceso nuevo, así el RSS pico no arrastra etapas
+anteriores. Todo corre sin red. Los resultados se guardan en JSON y se pueden
+comparar con los de otro commit:
+
+    python benchmarks/benchmark_etapas.py --salida bench_actual.json
+    python benchmarks/benchmark_etapas.py --tamanos 1000 100000 --comparar-con bench_base.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TAMANOS = [1_000, 100_000, 1_000_000]
+CLASES = ['maquinarias', 'inmuebles', 'intangibles', 'otros_activos']
+ETAPAS = ['generar', 'auditar', 'analizar']
+FECHA_REFERENCIA = '2025-12-31'
+TOLERANCIA = 0.20
+
+
+def _rss_pico_mb():
+    """RSS pico del proceso actual en MB (ru_maxrss está en KB en Linux y en bytes en macOS)."""
+    import resource
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def _rss_actual_mb():
+    """RSS actual del proceso en MB (Linux); None si no se puede leer."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        return None
+
+
+def _preparar_etapa(etapa, clase, n_registros):
+    """Devuelve (preparar, ejecutar): preparar arma la entrada fuera de la medición."""
+    sys.path.insert(0, RAIZ)
+    from generador_datos_activos import generar_datos
+    from auditoria_activos import auditar_clase
+
+    if etapa == 'generar':
+        return (lambda: None), (lambda _: generar_datos(clase, n_registros, fecha_referencia=FECHA_REFERENCIA))
+
+    datos = generar_datos(clase, n_registros, fecha_referencia=FECHA_REFERENCIA)
+    if etapa == 'auditar':
+        return (lambda: datos.copy()), (lambda df: auditar_clase(clase, df, FECHA_REFERENCIA))
+
+    # analizar: funciones analizar_* del dashboard, sin servidor de Streamlit
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+    import Activo_no_corriente_app as app
+
+    auditado = auditar_clase(clase, datos, FECHA_REFERENCIA)
+    analizar = getattr(app, f"analizar_{clase}")
+    return (lambda: auditado), analizar
+
+
+def _medir(etapa, clase, n_registros, repeticiones, medir_asignaciones):
+    """Mide una etapa en el proceso actual (se invoca dentro de un proceso nuevo)."""
+    import tracemalloc
+
+    preparar, ejecutar = _preparar_etapa(etapa, clase, n_registros)
+    rss_inicial = _rss_actual_mb()
+
+    tiempos = []
+    for _ in range(repeticiones):
+        entrada = preparar()
+        inicio = time.perf_counter()
+        ejecutar(entrada)
+        tiempos.append(time.perf_counter() - inicio)
+        del entrada
+
+    resultado = {
+        'etapa': etapa,
+        'clase': clase,
+        'registros': n_registros,
+        'tiempo_s': statistics.median(tiempos),
+        'tiempo_min_s': min(tiempos),
+        'rss_pico_mb': _rss_pico_mb(),
+        'rss_incremento_mb': None if rss_inicial is None else _rss_pico_mb() - rss_inicial,
+    }
+    if medir_asignaciones:
+        entrada = preparar()
+        tracemalloc.start()
+        ejecutar(entrada)
+        resultado['asignacion_pico_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return resultado
+
+
+def _commit_actual():
+    """Commit corto de HEAD, para identificar el informe; None fuera de un repositorio git."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar_suite(tamanos=TAMANOS, clases=CLASES, etapas=ETAPAS, repeticiones=3, medir_asignaciones=True):
+    """Corre todas las combinaciones, cada una en un proceso nuevo, y devuelve el informe."""
+    contexto = multiprocessing.get_context('spawn')
+    mediciones = []
+    for n_registros in tamanos:
+        for clase in clases:
+            for etapa in etapas:
+                with contexto.Pool(1) as pool:
+                    medicion = pool.apply(_medir, (etapa, clase, n_registros, repeticiones, medir_asignaciones))
+                print(f"{etapa:>9} {clase:<14} {n_registros:>9,} filas: {medicion['tiempo_s']:8.3f} s "
+                      f"| RSS pico {medicion['rss_pico_mb']:8.1f} MB", flush=True)
+                mediciones.append(medicion)
+    return {
+        'commit': _commit_actual(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeticiones': repeticiones,
+        'mediciones': mediciones,
+    }
+
+
+def comparar(actual, referencia, tolerancia=TOLERANCIA):
+    """Regresiones de tiempo y RSS pico respecto de un informe anterior."""
+    clave = lambda m: (m['etapa'], m['clase'], m['registros'])
+    base = {clave(m): m for m in referencia['mediciones']}
+    regresiones = []
+    for medicion in actual['mediciones']:
+        anterior = base.get(clave(medicion))
+        if anterior is None:
+            continue
+        for metrica in ('tiempo_s', 'rss_pico_mb'):
+            if anterior[metrica] and medicion[metrica] > anterior[metrica] * (1 + tolerancia):
+                regresiones.append({
+                    'etapa': medicion['etapa'], 'clase': medicion['clase'], 'registros': medicion['registros'],
+                    'metrica': metrica, 'anterior': anterior[metrica], 'actual': medicion[metrica],
+                    'variacion': medicion[metrica] / anterior[metrica] - 1,
+                })
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de generación, auditoría y análisis")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS)
+    parser.add_argument('--clases', nargs='+', choices=CLASES, default=CLASES)
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=ETAPAS)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-asignaciones', action='store_true', help="Omite la pasada con tracemalloc")
+    parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto benchmark_<commit>.json)")
+    parser.add_argument('--comparar-con', help="Informe JSON anterior para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help="Variación relativa admitida antes de reportar una regresión")
+    args = parser.parse_args(argv)
+
+    informe = ejecutar_suite(args.tamanos, args.clases, args.etapas, args.repeticiones,
+                             medir_asignaciones=not args.sin_asignaciones)
+    salida = args.salida or f"benchmark_{informe['commit'] or 'local'}.json"
+
+    codigo = 0
+    if args.comparar_con:
+        with open(args.comparar_con, encoding='utf-8') as f:
+            informe['regresiones'] = comparar(informe, json.load(f), args.tolerancia)
+        for r in informe['regresiones']:
+            print(f"⚠️ Regresión {r['etapa']} {r['clase']} {r['registros']:,}: {r['metrica']} "
+                  f"{r['anterior']:.3f} -> {r['actual']:.3f} ({r['variacion']:+.0%})")
+        codigo = 1 if informe['regresiones'] else 0
+
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}")
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+# =================================================================
+# ÍNDICE DE TEXTO COMPLETO DE LOS INFORMES DE AUDITORÍA (SQLITE FTS5)
+# =================================================================
+# Extrae el texto de cada PDF una sola vez, página por página, y lo guarda en
+# una tabla FTS5 de SQLite. Un PDF se vuelve a leer sólo si cambian su fecha
+# de modificación o su tamaño y, además, su hash de contenido. Las búsquedas
+# devuelven el archivo, la página y un fragmento con los términos resaltados.
+#
+#     python busqueda_informes.py                      # indexa data/informes_auditoria_activos
+#     python busqueda_informes.py --buscar "isolation forest"
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from ingesta_activos import hash_archivo
+
+DIRECTORIO_INFORMES = "data/informes_auditoria_activos"
+RUTA_INDICE = "data/busqueda_informes.sqlite"
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    archivo TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    tamano INTEGER NOT NULL,
+    huella TEXT NOT NULL,
+    paginas INTEGER NOT NULL,
+    indexado REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS paginas USING fts5(
+    archivo UNINDEXED,
+    pagina UNINDEXED,
+    texto,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def extraer_paginas(ruta_archivo, paginas=None):
+    """Texto de las páginas de un PDF (lista de str). paginas: números desde 1; None = todas.
+
+    PyPDF2 lee del archivo sólo los objetos de las páginas pedidas.
+    """
+    import PyPDF2
+
+    with open(ruta_archivo, 'rb') as archivo:
+        lector = PyPDF2.PdfReader(archivo)
+        if paginas is None:
+            return [pagina.extract_text() or "" for pagina in lector.pages]
+        return [lector.pages[numero - 1].extract_text() or "" for numero in paginas]
+
+
+def numero_paginas(ruta_archivo):
+    """Cantidad de páginas de un PDF, sin extraer su texto."""
+    import PyPDF2
+
+    with open(ruta_archivo, 'rb') as archivo:
+        return len(PyPDF2.PdfReader(archivo).pages)
+
+
+def consulta_fts(texto):
+    """Convierte lo que escribe el usuario en una consulta FTS5: cada palabra entre comillas,
+    todas requeridas, y la última como prefijo (los operadores de FTS5 no se interpretan)."""
+    terminos = ['"' + termino.replace('"', '""') + '"' for termino in texto.split()]
+    if not terminos:
+        return None
+    terminos[-1] += '*'
+    return " ".join(terminos)
+
+
+class IndiceInformes:
+    """Índice FTS5 de los PDF de un directorio; cada operación abre su propia conexión
+    (el indexador en segundo plano y las sesiones de Streamlit usan hilos distintos)."""
+
+    def __init__(self, ruta=RUTA_INDICE, directorio=DIRECTORIO_INFORMES):
+        self.ruta = ruta
+        self.directorio = directorio
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        with self._conectar() as conexion:
+            conexion.executescript(ESQUEMA)
+
+    @contextmanager
+    def _conectar(self):
+        """Conexión que confirma la transacción al salir sin errores y siempre se cierra."""
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        try:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            with conexion:
+                yield conexion
+        finally:
+            conexion.close()
+
+    def listar(self):
+        """Entradas (os.DirEntry) de los PDF del directorio, ordenadas por nombre."""
+        if not os.path.isdir(self.directorio):
+            return []
+        return sorted((entrada for entrada in os.scandir(self.directorio)
+                       if entrada.name.endswith('.pdf') and entrada.is_file()), key=lambda e: e.name)
+
+    def actualizar(self, entradas=None, omitir=()):
+        """Indexa los PDF nuevos o modificados y quita los que ya no existen.
+
+        entradas: resultado de listar() si ya se obtuvo. omitir: rutas que no se
+        vuelven a leer (siguen en el índice si ya estaban). Devuelve un dict con
+        las listas de archivos indexados, sin cambios, omitidos, eliminados y con error.
+        """
+        resumen = {'indexados': [], 'sin_cambios': [], 'omitidos': [], 'eliminados': [], 'errores': []}
+        with self._conectar() as conexion:
+            registrados = {archivo: (mtime, tamano, huella) for archivo, mtime, tamano, huella
+                           in conexion.execute("SELECT archivo, mtime, tamano, huella FROM documentos")}
+        presentes = set()
+        for entrada in self.listar() if entradas is None else entradas:
+            presentes.add(entrada.name)
+            estado = entrada.stat()
+            previo = registrados.get(entrada.name)
+            if previo and previo[:2] == (estado.st_mtime, estado.st_size):
+                resumen['sin_cambios'].append(entrada.name)
+                continue
+            if entrada.path in omitir:
+                resumen['omitidos'].append(entrada.name)
+                continue
+            try:
+                huella = hash_archivo(entrada.path)
+                if previo and previo[2] == huella:
+                    # Sólo cambió la fecha (copia, checkout): no se vuelve a extraer el texto
+                    with self._conectar() as conexion:
+                        conexion.execute("UPDATE documentos SET mtime = ?, tamano = ? WHERE archivo = ?",
+                                         (estado.st_mtime, estado.st_size, entrada.name))
+                    resumen['sin_cambios'].append(entrada.name)
+                    continue
+                paginas = extraer_paginas(entrada.path)
+            except Exception:
+                resumen['errores'].append(entrada.name)
+                continue
+            with self._conectar() as conexion:
+                conexion.execute("DELETE FROM paginas WHERE archivo = ?", (entrada.name,))
+                conexion.executemany("INSERT INTO paginas (archivo, pagina, texto) VALUES (?, ?, ?)",
+                                     [(entrada.name, numero, texto) for numero, texto in enumerate(paginas, 1)])
+                conexion.execute("INSERT OR REPLACE INTO documentos VALUES (?, ?, ?, ?, ?, ?)",
+                                 (entrada.name, estado.st_mtime, estado.st_size, huella, len(paginas), time.time()))
+            resumen['indexados'].append(entrada.name)
+
+        eliminados = sorted(set(registrados) - presentes)
+        if eliminados:
+            with self._conectar() as conexion:
+                for archivo in eliminados:
+                    conexion.execute("DELETE FROM paginas WHERE archivo = ?", (archivo,))
+                    conexion.execute("DELETE FROM documentos WHERE archivo = ?", (archivo,))
+            resumen['eliminados'] = eliminados
+        return resumen
+
+    def documentos(self):
+        """Informes indexados (archivo, páginas, fecha de modificación, huella), ordenados por nombre."""
+        with self._conectar() as conexion:
+            return pd.read_sql_query("SELECT archivo, paginas, mtime, huella FROM documentos ORDER BY archivo",
+                                     conexion)
+
+    def buscar(self, texto, limite=50):
+        """Páginas que contienen todas las palabras buscadas, de la más a la menos relevante.
+
+        Devuelve un DataFrame con archivo, pagina y fragmento (términos entre ** **).
+        """
+        consulta = consulta_fts(texto)
+        if consulta is None:
+            return pd.DataFrame(columns=['archivo', 'pagina', 'fragmento'])
+        with self._conectar() as conexion:
+            return pd.read_sql_query(
+                "SELECT archivo, pagina, snippet(paginas, 2, '**', '**', '…', 16) AS fragmento "
+                "FROM paginas WHERE paginas MATCH ? ORDER BY bm25(paginas) LIMIT ?",
+                conexion, params=(consulta, limite))
+
+
+class IndexadorEnSegundoPlano:
+    """Mantiene el índice al día desde un hilo: indexa al arrancar y luego cada `intervalo` segundos.
+
+    `archivos` tiene los PDF de la última revisión del directorio, aunque todavía se estén indexando.
+    Un PDF que no se pudo leer no se vuelve a intentar hasta que cambien su fecha o su tamaño.
+    """
+
+    def __init__(self, indice, intervalo=60):
+        self.indice = indice
+        self.intervalo = intervalo
+        self.archivos = None
+        self.ultimo_resumen = None
+        self.fallidos = {}  # ruta -> (mtime, tamaño) del PDF cuando falló su lectura
+        self._pedido = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, name="indexador-informes", daemon=True)
+        self._hilo.start()
+
+    def _ejecutar(self):
+        while True:
+            try:
+                entradas = self.indice.listar()
+                self.archivos = [entrada.name for entrada in entradas]
+                firmas = {entrada.path: (entrada.stat().st_mtime, entrada.stat().st_size) for entrada in entradas}
+                omitir = {ruta for ruta, firma in self.fallidos.items() if firmas.get(ruta) == firma}
+                self.ultimo_resumen = self.indice.actualizar(entradas, omitir)
+                errores = set(self.ultimo_resumen['errores'])
+                self.fallidos = {entrada.path: firmas[entrada.path] for entrada in entradas
+                                 if entrada.path in omitir or entrada.name in errores}
+            except (sqlite3.Error, OSError) as e:
+                # Un PDF borrado mientras se revisaba el directorio: se reintenta en la próxima vuelta
+                self.ultimo_resumen = {'error': str(e)}
+            self._pedido.wait(self.intervalo)
+            self._pedido.clear()
+
+    def solicitar(self):
+        """Pide una actualización inmediata (por ejemplo, después de generar informes)."""
+        self._pedido.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indexa y busca en los informes PDF de auditoría")
+    parser.add_argument('--directorio', default=DIRECTORIO_INFORMES)
+    parser.add_argument('--indice', default=RUTA_INDICE)
+    parser.add_argument('--buscar', default=None, help="Palabras a buscar (se indexa antes)")
+    parser.add_argument('--limite', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    indice = IndiceInformes(args.indice, args.directorio)
+    inicio = time.perf_counter()
+    resumen = indice.actualizar()
+    print(f"{len(resumen['indexados'])} informes indexados, {len(resumen['sin_cambios'])} sin cambios, "
+          f"{len(resumen['eliminados'])} eliminados, {len(resumen['errores'])} con error "
+          f"({time.perf_counter() - inicio:.2f} s)")
+    if args.buscar:
+        for fila in indice.buscar(args.buscar, args.limite).itertuples(index=False):
+            print(f"{fila.archivo} (pág. {fila.pagina}): {fila.fragmento}")
+    return 1 if resumen['errores'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
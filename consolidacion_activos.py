@@ -0,0 +1,224 @@
+# =================================================================
+# CONSOLIDACIÓN MULTIEMPRESA Y MULTIMONEDA DEL ACTIVO NO CORRIENTE
+# =================================================================
+# Lleva las cuatro clases auditadas a una tabla de hechos común (empresa,
+# clase, ubicación, tipo, moneda, valor en moneda de origen y en pesos,
+# alerta), convirtiendo cada importe con el tipo de cambio vigente a su fecha
+# (merge_asof por moneda, sin recorrer filas). Sobre esa tabla se precalcula
+# un cubo: un agregado por cada combinación de dimensiones, de modo que los
+# filtros y las aperturas del dashboard consultan unas pocas filas ya sumadas.
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from auditoria_activos import mascara_alertas
+from ingesta_activos import ErrorValidacionDatos
+
+MONEDA_BASE = 'ARS'
+RUTA_TIPOS_CAMBIO = "data/tipos_cambio.csv"
+# Primer día de la tabla simulada: la tasa de un día no depende de los datos cargados
+FECHA_ANCLA_TIPOS_CAMBIO = '1990-01-01'
+
+# Empresa de las filas que no traen una columna de empresa
+EMPRESA_SIN_ASIGNAR = "Sin asignar"
+SIN_UBICACION = "Sin ubicación"
+
+# Columnas de cada clase: empresa, ubicación, tipo, importe, moneda (None = MONEDA_BASE) y fecha del importe
+COLUMNAS_CONSOLIDACION = {
+    'maquinarias': ('empresa', 'ubicacion', 'tipo_equipo', 'valor_adquisicion', None, 'fecha_adquisicion'),
+    'inmuebles': ('empresa', 'ubicacion', 'tipo_inmueble', 'valor_adquisicion', None, 'fecha_adquisicion'),
+    'intangibles': ('nombre_empresa_propietaria', None, 'tipo_activo_intangible', 'costo_adquisicion', None,
+                    'fecha_adquisicion'),
+    'otros_activos': ('empresa', None, 'tipo_activo', 'monto', 'moneda', 'fecha_registro'),
+}
+
+DIMENSIONES = ['empresa', 'clase', 'ubicacion', 'tipo', 'moneda']
+# sin_tipo_cambio: activos en moneda extranjera sin cotización a su fecha (no suman en valor_ars)
+MEDIDAS = ['registros', 'valor_ars', 'alertas', 'sin_tipo_cambio']
+
+
+# =================================================================
+# TIPOS DE CAMBIO
+# =================================================================
+
+def generar_tipos_cambio(desde, hasta, semilla=7):
+    """Tabla simulada de tipos de cambio diarios (pesos por unidad) de USD y EUR entre desde y hasta.
+
+    La serie parte siempre de FECHA_ANCLA_TIPOS_CAMBIO y cada moneda tiene su
+    propio generador, así que la tasa de una fecha es la misma para cualquier
+    período pedido. No hay tasas anteriores al ancla.
+    """
+    ancla, hasta = pd.Timestamp(FECHA_ANCLA_TIPOS_CAMBIO), pd.Timestamp(hasta).normalize()
+    fechas = pd.date_range(ancla, max(hasta, ancla), freq='D')
+    rng_usd, rng_eur = (np.random.default_rng([semilla, moneda]) for moneda in range(2))
+    # Devaluación diaria media del 0,074 % con ruido (~30 % anual), partiendo de 1 ARS/USD en el ancla
+    usd = np.exp(np.cumsum(rng_usd.normal(0.00074, 0.004, len(fechas))))
+    eur = usd * (1.1 + np.cumsum(rng_eur.normal(0, 0.001, len(fechas))))
+    en_periodo = (fechas >= pd.Timestamp(desde).normalize()) & (fechas <= hasta)
+    fechas = fechas[en_periodo]
+    return pd.DataFrame({
+        'fecha': np.concatenate([fechas, fechas]),
+        'moneda': ['USD'] * len(fechas) + ['EUR'] * len(fechas),
+        'tasa': np.concatenate([usd[en_periodo], eur[en_periodo]]).round(4),
+    })
+
+
+def cargar_tipos_cambio(ruta=RUTA_TIPOS_CAMBIO):
+    """Tabla local de tipos de cambio (columnas fecha, moneda, tasa en pesos por unidad)."""
+    tipos = pd.read_csv(ruta)
+    faltantes = sorted({'fecha', 'moneda', 'tasa'} - set(tipos.columns))
+    if faltantes:
+        raise ErrorValidacionDatos(f"Faltan columnas en {ruta}: {', '.join(faltantes)}")
+    return pd.DataFrame({
+        'fecha': pd.to_datetime(tipos['fecha']),
+        'moneda': tipos['moneda'].astype(str).str.strip().str.upper(),
+        'tasa': pd.to_numeric(tipos['tasa'], errors='coerce'),
+    }).dropna()
+
+
+def tipos_cambio_simulados(ruta=RUTA_TIPOS_CAMBIO):
+    """True si no hay tabla local de tipos de cambio y tipos_cambio() devuelve una simulada."""
+    return not os.path.exists(ruta)
+
+
+def huella_tipos_cambio(ruta=RUTA_TIPOS_CAMBIO):
+    """Huella de la tabla local de tipos de cambio (mtime y tamaño), o None si se simulan."""
+    try:
+        estado = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return f"{estado.st_mtime_ns}-{estado.st_size}"
+
+
+def tipos_cambio(desde, hasta, ruta=RUTA_TIPOS_CAMBIO):
+    """Tabla de tipos de cambio local si existe; si no, una simulada para el período.
+
+    Las tasas simuladas no son reales: quien muestre importes convertidos con
+    ellas debe advertirlo (ver tipos_cambio_simulados).
+    """
+    if not tipos_cambio_simulados(ruta):
+        return cargar_tipos_cambio(ruta)
+    return generar_tipos_cambio(desde, hasta)
+
+
+def convertir_a_moneda_base(importes, monedas, fechas, tipos):
+    """Importes en MONEDA_BASE con el último tipo de cambio publicado a la fecha de cada uno.
+
+    Quedan en NaN los importes en una moneda sin cotización a esa fecha.
+    """
+    operaciones = pd.DataFrame({
+        'fila': np.arange(len(importes)),
+        'moneda': pd.Series(np.asarray(monedas, dtype=object)).astype(str),
+        'fecha': pd.to_datetime(np.asarray(fechas)).astype('datetime64[ns]'),
+    })
+    tasas = np.ones(len(operaciones))
+    extranjeras = operaciones['moneda'] != MONEDA_BASE
+    if extranjeras.any():
+        consulta = operaciones[extranjeras & operaciones['fecha'].notna()].sort_values('fecha')
+        tabla = tipos.assign(fecha=tipos['fecha'].astype('datetime64[ns]'),
+                             moneda=tipos['moneda'].astype(str)).sort_values('fecha')
+        cruzado = pd.merge_asof(consulta, tabla, on='fecha', by='moneda', direction='backward')
+        tasas[extranjeras.to_numpy()] = np.nan
+        tasas[cruzado['fila'].to_numpy()] = cruzado['tasa'].to_numpy()
+    return np.asarray(importes, dtype='float64') * tasas
+
+
+# =================================================================
+# TABLA DE HECHOS Y CUBO
+# =================================================================
+
+def fecha_minima(resultados):
+    """Fecha más antigua de los importes de las clases (desde dónde hacen falta tipos de cambio)."""
+    fechas = [df[COLUMNAS_CONSOLIDACION[clase][5]].min() for clase, df in resultados.items() if len(df)]
+    fechas = [fecha for fecha in fechas if pd.notna(fecha)]
+    return min(fechas) if fechas else pd.Timestamp.today()
+
+
+def _columna_o_constante(df, columna, valor):
+    if columna and columna in df.columns:
+        return df[columna].astype(object).where(df[columna].notna(), valor).to_numpy()
+    return np.full(len(df), valor, dtype=object)
+
+
+def hechos_consolidados(resultados, tipos, empresa=EMPRESA_SIN_ASIGNAR):
+    """Tabla de hechos con una fila por activo de las clases auditadas.
+
+    resultados: dict clase -> DataFrame auditado. empresa: nombre para las filas
+    sin columna de empresa (para consolidar un grupo, ver consolidar_grupo).
+    """
+    partes = []
+    for clase, df in resultados.items():
+        col_empresa, col_ubicacion, col_tipo, col_importe, col_moneda, col_fecha = COLUMNAS_CONSOLIDACION[clase]
+        monedas = _columna_o_constante(df, col_moneda, MONEDA_BASE)
+        importes = df[col_importe].to_numpy(dtype='float64')
+        partes.append(pd.DataFrame({
+            'empresa': _columna_o_constante(df, col_empresa, empresa),
+            'clase': clase,
+            'ubicacion': _columna_o_constante(df, col_ubicacion, SIN_UBICACION),
+            'tipo': _columna_o_constante(df, col_tipo, "Sin tipo"),
+            'moneda': monedas,
+            'valor_origen': importes,
+            'valor_ars': convertir_a_moneda_base(importes, monedas, df[col_fecha], tipos),
+            'alertas': mascara_alertas(clase, df).to_numpy(dtype='int64'),
+        }))
+    hechos = pd.concat(partes, ignore_index=True)
+    for columna in DIMENSIONES:
+        hechos[columna] = hechos[columna].astype('category')
+    return hechos
+
+
+def consolidar_grupo(resultados_por_empresa, tipos):
+    """Tabla de hechos de un grupo: dict empresa -> dict clase -> DataFrame auditado."""
+    hechos = [hechos_consolidados(resultados, tipos, empresa)
+              for empresa, resultados in resultados_por_empresa.items()]
+    hechos = pd.concat(hechos, ignore_index=True)
+    for columna in DIMENSIONES:
+        hechos[columna] = hechos[columna].astype('category')
+    return hechos
+
+
+def _total(agregado):
+    return pd.DataFrame({medida: [agregado[medida].sum()] for medida in MEDIDAS})
+
+
+class CuboConsolidado:
+    """Agregados precalculados de la tabla de hechos para cada subconjunto de DIMENSIONES.
+
+    Una consulta usa el agregado más chico que contiene las dimensiones pedidas y
+    las filtradas, así que su costo depende de la cantidad de combinaciones y no
+    de la cantidad de activos.
+    """
+
+    def __init__(self, hechos):
+        hechos = hechos.assign(registros=1, sin_tipo_cambio=hechos['valor_ars'].isna().astype('int64'))
+        # Sólo el agregado más fino recorre los activos; los demás se suman a partir de él
+        base = hechos.groupby(DIMENSIONES, observed=True)[MEDIDAS].sum().reset_index()
+        self.agregados = {frozenset(DIMENSIONES): base, frozenset(): _total(base)}
+        for k in range(1, len(DIMENSIONES)):
+            for dimensiones in combinations(DIMENSIONES, k):
+                self.agregados[frozenset(dimensiones)] = (
+                    base.groupby(list(dimensiones), observed=True)[MEDIDAS].sum().reset_index())
+        self.valores = {dimension: sorted(base[dimension].unique()) for dimension in DIMENSIONES}
+
+    def consultar(self, por=(), filtros=None):
+        """Medidas agregadas por las dimensiones `por`, con filtros {dimension: [valores]}."""
+        filtros = {dimension: valores for dimension, valores in (filtros or {}).items() if valores}
+        por = list(por)
+        desconocidas = set(por) | set(filtros)
+        desconocidas -= set(DIMENSIONES)
+        if desconocidas:
+            raise ValueError(f"Dimensiones desconocidas: {', '.join(sorted(desconocidas))}")
+        agregado = self.agregados[frozenset(por) | frozenset(filtros)]
+        if filtros:
+            mascara = np.ones(len(agregado), dtype=bool)
+            for dimension, valores in filtros.items():
+                mascara &= agregado[dimension].isin(valores).to_numpy()
+            agregado = agregado[mascara]
+        if not por:
+            return _total(agregado)
+        if set(por) == set(agregado.columns) - set(MEDIDAS):
+            return agregado[por + MEDIDAS].sort_values('valor_ars', ascending=False, ignore_index=True)
+        return (agregado.groupby(por, observed=True)[MEDIDAS].sum().reset_index()
+                .sort_values('valor_ars', ascending=False, ignore_index=True))
@@ -0,0 +1,264 @@
+# =================================================================
+# MOTOR DE DEPRECIACIÓN Y AMORTIZACIÓN (MATRICES ACTIVOS × MESES)
+# =================================================================
+# El valor en libros de cada activo después de `e` meses de uso tiene forma
+# cerrada para los tres métodos, así que la depreciación de todo el registro
+# se calcula con NumPy sin recorrer activos ni meses:
+#   lineal:               VL(e) = costo - base * min(e, vida) / vida
+#   saldo decreciente:    VL(e) = max(residual, costo * (1 - factor / vida) ** e); residual al cumplir la vida
+#   unidades producidas:  VL(e) = costo - base * min(1, e * unidades_mensuales / unidades_totales)
+# (base = costo - valor_residual). La depreciación de un mes es VL(e) - VL(e + 1).
+# Se deprecia desde el mes de alta completo; "valor al" una fecha es el del
+# cierre del mes de esa fecha. Los registros que no entran en una matriz se
+# escriben a Parquet por bloques de activos.
+#
+#     python depreciacion_activos.py maquinarias.csv --clase maquinarias --al 2024-12-31
+#     python depreciacion_activos.py maquinarias.csv --clase maquinarias --desde 2020-01 --hasta 2034-12 \
+#         --cronograma cronograma.parquet
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+LINEAL = 'lineal'
+SALDO_DECRECIENTE = 'saldo_decreciente'
+UNIDADES_PRODUCIDAS = 'unidades_producidas'
+METODOS = [LINEAL, SALDO_DECRECIENTE, UNIDADES_PRODUCIDAS]
+
+# Factor del saldo decreciente (2 = doble saldo decreciente)
+FACTOR_SALDO_DECRECIENTE = 2.0
+
+# Celdas (activos × meses) por encima de las cuales cronograma() pide usar guardar_cronograma()
+MAX_CELDAS_MATRIZ = 20_000_000
+
+# Columnas del registro de depreciación y valor por defecto de las opcionales
+COLUMNAS_REGISTRO = ['id', 'costo', 'fecha_inicio', 'vida_util_meses']
+OPCIONALES_REGISTRO = {
+    'valor_residual': 0.0,
+    'metodo': LINEAL,
+    'factor': FACTOR_SALDO_DECRECIENTE,
+    'unidades_totales': np.nan,
+    'unidades_mensuales': np.nan,
+}
+
+# Columnas de la exportación que necesita el método de unidades producidas
+COLUMNAS_UNIDADES = ['unidades_totales', 'unidades_mensuales']
+
+# Clase de activo -> (id, costo, fecha de alta, vida útil en meses a partir del df auditado/generado)
+ORIGENES_REGISTRO = {
+    'maquinarias': ('id_equipo', 'valor_adquisicion', 'fecha_adquisicion', 'fecha_fin_vida_util'),
+    'inmuebles': ('id_inmueble', 'valor_adquisicion', 'fecha_adquisicion', 'fecha_fin_vida_util'),
+    'intangibles': ('activo_id', 'costo_adquisicion', 'fecha_adquisicion', 'vida_util_anios'),
+}
+
+
+def numero_mes(fechas):
+    """Meses desde el año 0 (año * 12 + mes - 1) de cada fecha, como float (NaN si falta la fecha)."""
+    fechas = pd.DatetimeIndex(pd.to_datetime(np.atleast_1d(np.asarray(fechas)), errors='coerce'))
+    return (fechas.year * 12 + fechas.month - 1).to_numpy(dtype='float64', na_value=np.nan)
+
+
+def registro_depreciacion(clase, df, metodo=LINEAL, valor_residual=0.0, factor=FACTOR_SALDO_DECRECIENTE):
+    """Registro de depreciación (id, costo, fecha_inicio, vida_util_meses, ...) de una clase de activo.
+
+    La vida útil sale de fecha_fin_vida_util (maquinarias, inmuebles) o de vida_util_anios (intangibles).
+    No se inventan datos: sin fecha de alta, o sin vida útil (inmuebles exportados sin
+    fecha_fin_vida_util), el activo queda con valor NaN. Las unidades del método de
+    unidades producidas se toman de unidades_totales y unidades_mensuales.
+    """
+    from ingesta_activos import COLUMNAS_OPCIONALES
+
+    if clase not in ORIGENES_REGISTRO:
+        raise ValueError(f"La clase {clase} no se deprecia")
+    col_id, col_costo, col_inicio, col_vida = ORIGENES_REGISTRO[clase]
+    faltantes = [col for col in (col_id, col_costo, col_inicio, col_vida)
+                 if col not in df.columns and col not in COLUMNAS_OPCIONALES[clase]]
+    if metodo == UNIDADES_PRODUCIDAS:
+        faltantes += [col for col in COLUMNAS_UNIDADES if col not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas para depreciar {clase} ({metodo}): {', '.join(faltantes)}")
+    inicio = pd.to_datetime(df[col_inicio], errors='coerce')
+    if col_vida not in df.columns:
+        vida = np.full(len(df), np.nan)
+    elif col_vida == 'vida_util_anios':
+        vida = pd.to_numeric(df[col_vida], errors='coerce').to_numpy(dtype='float64') * 12
+    else:
+        vida = numero_mes(df[col_vida]) - numero_mes(inicio)
+    registro = pd.DataFrame({
+        'id': df[col_id].to_numpy(),
+        'costo': pd.to_numeric(df[col_costo], errors='coerce').to_numpy(dtype='float64'),
+        'valor_residual': valor_residual,
+        'fecha_inicio': inicio.to_numpy(),
+        'vida_util_meses': vida,
+        'metodo': metodo,
+        'factor': factor,
+    })
+    for col in COLUMNAS_UNIDADES:
+        if col in df.columns:
+            registro[col] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64')
+    return registro
+
+
+def _parametros(registro, forma):
+    """Arrays de parámetros del registro, con forma (n,) o (n, 1) para operar contra una matriz."""
+    faltantes = [col for col in COLUMNAS_REGISTRO if col not in registro.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el registro de depreciación: {', '.join(faltantes)}")
+    completo = {col: registro[col] if col in registro.columns else pd.Series(valor, index=registro.index)
+                for col, valor in OPCIONALES_REGISTRO.items()}
+    metodo = pd.Categorical(completo['metodo'], categories=METODOS)
+    if (metodo.codes < 0).any():
+        desconocidos = set(completo['metodo'][metodo.codes < 0].astype(str))
+        raise ValueError(f"Métodos de depreciación desconocidos: {', '.join(sorted(desconocidos))}")
+    columna = (lambda valores: valores.reshape(forma)) if forma else (lambda valores: valores)
+    return {
+        'costo': columna(registro['costo'].to_numpy(dtype='float64')),
+        'residual': columna(completo['valor_residual'].to_numpy(dtype='float64')),
+        'vida': columna(registro['vida_util_meses'].to_numpy(dtype='float64')),
+        'factor': columna(completo['factor'].to_numpy(dtype='float64')),
+        'unidades_totales': columna(completo['unidades_totales'].to_numpy(dtype='float64')),
+        'unidades_mensuales': columna(completo['unidades_mensuales'].to_numpy(dtype='float64')),
+        'metodo': metodo.codes,
+        'inicio': columna(numero_mes(registro['fecha_inicio'])),
+    }
+
+
+def _valor_libros_metodo(metodo, p, edad):
+    costo, residual, vida = p['costo'], p['residual'], p['vida']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if metodo == LINEAL:
+            # Vida útil nula: se da de baja en el mes de alta; sin vida útil el valor queda NaN
+            fraccion = np.where(vida > 0, np.minimum(edad, vida) / vida, np.where(np.isnan(vida), np.nan, 1.0))
+            return costo - (costo - residual) * fraccion
+        if metodo == SALDO_DECRECIENTE:
+            tasa = np.clip(np.where(vida > 0, p['factor'] / vida, 1.0), 0.0, 1.0)
+            valores = np.where(edad >= vida, residual, np.maximum(residual, costo * (1 - tasa) ** edad))
+            return np.where(np.isnan(vida), np.nan, valores)
+        # Sin unidades totales o mensuales no se deprecia
+        fraccion = np.minimum(1.0, edad * p['unidades_mensuales'] / p['unidades_totales'])
+        return costo - (costo - residual) * np.nan_to_num(fraccion, nan=0.0)
+
+
+def _valor_libros(p, edad):
+    """Valor en libros después de `edad` meses de uso (edad con la forma de los parámetros o una matriz).
+
+    Cada método se evalúa sólo sobre sus activos; sin fecha de alta (edad NaN), o sin vida
+    útil en los métodos que la usan, el valor es NaN.
+    """
+    edad = np.maximum(edad, 0).astype('float64')
+    edad = np.broadcast_to(edad, np.broadcast_shapes(edad.shape, p['costo'].shape))
+    valores = np.empty(edad.shape)
+    for codigo, metodo in enumerate(METODOS):
+        filas = p['metodo'] == codigo
+        if filas.all():
+            valores = _valor_libros_metodo(metodo, p, edad)
+            break
+        if filas.any():
+            valores[filas] = _valor_libros_metodo(metodo, {k: v[filas] for k, v in p.items()}, edad[filas])
+    return np.where(np.isnan(edad), np.nan, valores)
+
+
+def valor_libros_al(registro, fecha):
+    """Valor en libros de todo el registro al cierre del mes de `fecha` (una sola operación vectorial)."""
+    p = _parametros(registro, None)
+    edad = numero_mes(fecha)[0] - p['inicio'] + 1
+    return pd.Series(_valor_libros(p, edad), index=registro.index, name='valor_libros')
+
+
+def meses_periodo(desde, hasta):
+    """Meses del período (inclusive) como PeriodIndex mensual."""
+    return pd.period_range(pd.Period(desde, 'M'), pd.Period(hasta, 'M'), freq='M')
+
+
+def cronograma(registro, desde, hasta):
+    """Depreciación mensual de todos los activos en el período, como matrices activos × meses.
+
+    Devuelve un dict con 'meses' (PeriodIndex) y las matrices 'depreciacion',
+    'amortizacion_acumulada' y 'valor_libros' (al cierre de cada mes).
+    """
+    meses = meses_periodo(desde, hasta)
+    celdas = len(registro) * len(meses)
+    if celdas > MAX_CELDAS_MATRIZ:
+        raise MemoryError(f"{celdas:,} celdas superan MAX_CELDAS_MATRIZ; use guardar_cronograma() para escribir "
+                          "el cronograma por bloques")
+    p = _parametros(registro, (-1, 1))
+    primer_mes = meses[0].year * 12 + meses[0].month - 1
+    # Meses de uso al comenzar cada mes del período
+    edad = primer_mes + np.arange(len(meses))[None, :] - p['inicio']
+    valor_inicio = _valor_libros(p, edad)
+    valor_cierre = _valor_libros(p, edad + 1)
+    return {
+        'meses': meses,
+        'depreciacion': valor_inicio - valor_cierre,
+        'amortizacion_acumulada': p['costo'] - valor_cierre,
+        'valor_libros': valor_cierre,
+    }
+
+
+def guardar_cronograma(registro, desde, hasta, ruta, max_celdas=MAX_CELDAS_MATRIZ // 4):
+    """Escribe el cronograma en Parquet por bloques de activos, sin armar la matriz completa.
+
+    Formato largo (id, mes, depreciacion, amortizacion_acumulada, valor_libros), sólo
+    con los meses en que el activo se deprecia. Devuelve la cantidad de filas escritas.
+    """
+    import pyarrow as pa
+
+    from auditoria_por_lotes import SumideroParquet
+
+    activos_por_bloque = max(1, max_celdas // len(meses_periodo(desde, hasta)))
+    filas = 0
+    with SumideroParquet(ruta) as sumidero:
+        for inicio in range(0, len(registro), activos_por_bloque):
+            bloque = registro.iloc[inicio:inicio + activos_por_bloque]
+            resultado = cronograma(bloque, desde, hasta)
+            activo, mes = np.nonzero(resultado['depreciacion'] > 0)
+            if not len(activo):
+                continue
+            # Ids con diccionario (índices int32 en todos los bloques), sin un objeto de Python por fila
+            codigos, ids = pd.factorize(bloque['id'].astype(str))
+            sumidero.escribir(pa.table({
+                'id': pa.DictionaryArray.from_arrays(pa.array(codigos[activo], pa.int32()), pa.array(ids)),
+                'mes': pa.array(resultado['meses'][mes].to_timestamp().to_numpy()),
+                'depreciacion': resultado['depreciacion'][activo, mes],
+                'amortizacion_acumulada': resultado['amortizacion_acumulada'][activo, mes],
+                'valor_libros': resultado['valor_libros'][activo, mes],
+            }))
+            filas += len(activo)
+    return filas
+
+
+def main(argv=None):
+    from ingesta_activos import cargar_activos
+
+    parser = argparse.ArgumentParser(description="Valor en libros y cronograma de depreciación de un registro")
+    parser.add_argument('archivo', help="Exportación del ERP (CSV/Excel) de la clase")
+    parser.add_argument('--clase', choices=list(ORIGENES_REGISTRO), required=True)
+    parser.add_argument('--metodo', choices=METODOS, default=LINEAL)
+    parser.add_argument('--al', default=None, help="Fecha para el valor en libros (por defecto, hoy)")
+    parser.add_argument('--desde', default=None, help="Primer mes del cronograma (AAAA-MM)")
+    parser.add_argument('--hasta', default=None, help="Último mes del cronograma (AAAA-MM)")
+    parser.add_argument('--cronograma', default=None, help="Parquet de salida para el cronograma mensual")
+    args = parser.parse_args(argv)
+
+    try:
+        registro = registro_depreciacion(args.clase, cargar_activos(args.archivo, args.clase), metodo=args.metodo)
+    except ValueError as e:
+        parser.error(str(e))
+    fecha = pd.Timestamp(args.al) if args.al else pd.Timestamp.today()
+    valores = valor_libros_al(registro, fecha)
+    print(f"{len(registro):,} activos; costo total ${registro['costo'].sum():,.2f}; "
+          f"valor en libros al {fecha:%d/%m/%Y}: ${valores.sum():,.2f}")
+    if valores.isna().any():
+        print(f"{int(valores.isna().sum()):,} activos sin fecha de alta o sin vida útil quedan fuera del valor "
+              "en libros")
+    if args.cronograma:
+        if not (args.desde and args.hasta):
+            parser.error("--cronograma requiere --desde y --hasta")
+        filas = guardar_cronograma(registro, args.desde, args.hasta, args.cronograma)
+        print(f"Cronograma: {filas:,} filas en {args.cronograma}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+# =================================================================
+# DETECCIÓN DE ACTIVOS DUPLICADOS (BLOQUEO + MINHASH)
+# =================================================================
+# Un mismo activo registrado dos veces: maquinarias con la misma descripción,
+# exactamente el mismo código de modelo y casi el mismo valor, o inmuebles con
+# la misma dirección y casi la misma superficie. Comparar todos contra todos
+# es O(n²); aquí sólo se comparan pares candidatos que comparten un bloque
+# (en maquinarias, además, los mismos códigos alfanuméricos: "KEU-4937" y
+# "EEU-4937" son equipos distintos aunque el texto sea casi igual):
+#
+#   - el mismo tipo de activo y el mismo texto normalizado (sin tildes,
+#     mayúsculas, signos ni palabras de relleno), o
+#   - el mismo tipo de activo y la misma banda de la firma MinHash del texto
+#     (LSH), que agrupa textos parecidos aunque no sean iguales.
+#
+# Dentro de cada bloque las filas se ordenan por la columna numérica y se
+# compara cada una con la siguiente (vecindario ordenado), así que el costo es
+# el de ordenar. Los pares que pasan la verificación se unen en grupos.
+#
+#     python duplicados_activos.py maquinarias maq.csv -o duplicados.parquet
+import argparse
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Texto, bloque y columna numérica (con su tolerancia relativa; None: no se exige) de cada clase;
+# codigos: los códigos alfanuméricos del texto deben coincidir exactamente
+REGLAS_DUPLICADOS = {
+    'maquinarias': {'clave': 'id_equipo', 'bloque': 'tipo_equipo', 'texto': 'descripcion',
+                    'numerica': 'valor_adquisicion', 'tolerancia': 0.01, 'codigos': True},
+    'inmuebles': {'clave': 'id_inmueble', 'bloque': 'tipo_inmueble', 'texto': 'direccion',
+                  'numerica': 'superficie_m2', 'tolerancia': 0.002, 'codigos': False},
+}
+
+# Palabras que no distinguen un activo de otro y abreviaturas equivalentes
+PALABRAS_VACIAS = {'modelo', 'mod', 'de', 'del', 'la', 'el', 'los', 'las', 'y', 'nro', 'n'}
+ABREVIATURAS = {'avenida': 'av', 'calle': 'cl', 'piso': 'p', 'departamento': 'dto', 'depto': 'dto',
+                'provincia': 'prov', 'ciudad': 'cdad', 'numero': 'nro'}
+
+# Firma MinHash: NUM_PERMUTACIONES = BANDAS × FILAS_POR_BANDA; umbral LSH ≈ (1 / BANDAS) ** (1 / FILAS_POR_BANDA)
+BANDAS = 8
+FILAS_POR_BANDA = 4
+NUM_PERMUTACIONES = BANDAS * FILAS_POR_BANDA
+# Similitud de Jaccard (estimada) mínima entre los textos de un par para considerarlo duplicado
+UMBRAL_SIMILITUD = 0.7
+# Pares con similitud estimada desde UMBRAL_SIMILITUD - MARGEN_ESTIMACION se verifican con la exacta
+MARGEN_ESTIMACION = 0.15
+# Largo máximo de texto que entra en la firma y textos por tanda al calcularla
+LARGO_MAXIMO = 64
+TANDA_FIRMAS = 50_000
+
+_VACIO = np.uint64(np.iinfo(np.uint32).max)
+
+
+def _simplificar(textos):
+    """Minúsculas, sin tildes y con los signos reemplazados por espacios (vectorizado)."""
+    return (pd.Series(textos, dtype=object).str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+            .str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True))
+
+
+def _patron_palabras(palabras):
+    return r'\b(?:' + '|'.join(re.escape(palabra) for palabra in sorted(palabras)) + r')\b'
+
+
+def normalizar_texto(textos, quitar=None):
+    """Texto en minúsculas, sin tildes ni signos, con abreviaturas unificadas y sin palabras vacías.
+
+    quitar: textos (uno por fila, con pocos valores distintos) cuyas palabras se
+    eliminan, p. ej. el tipo de equipo que repite la descripción y haría
+    parecidos a todos los del tipo.
+    """
+    indice = textos.index if isinstance(textos, pd.Series) else None
+    textos = pd.Series(textos, dtype=object).fillna('').astype(str).to_numpy(dtype=object)
+    quitar = (pd.Series(quitar, dtype=object).fillna('').astype(str).to_numpy(dtype=object)
+              if quitar is not None else np.full(len(textos), '', dtype=object))
+    if not len(textos):
+        return pd.Series(textos, index=indice)
+    # Se normaliza una vez cada combinación distinta (un registro grande repite direcciones y tipos)
+    codigos_texto, textos_unicos = pd.factorize(textos)
+    codigos_quitar, quitar_unicos = pd.factorize(quitar)
+    codigos, combinaciones = pd.factorize(codigos_quitar.astype(np.int64) * len(textos_unicos) + codigos_texto)
+    # Separador de miles: "1.200" y "1200" son la misma altura
+    textos = _simplificar(pd.Series(np.asarray(textos_unicos, dtype=object)[combinaciones % len(textos_unicos)],
+                                    dtype=object).str.replace(r'(?<=\d)\.(?=\d{3}\b)', '', regex=True))
+    for palabra, abreviatura in ABREVIATURAS.items():
+        textos = textos.str.replace(_patron_palabras([palabra]), abreviatura, regex=True)
+    textos = textos.str.replace(_patron_palabras(PALABRAS_VACIAS), ' ', regex=True)
+    quitar = _simplificar(np.asarray(quitar_unicos, dtype=object)[combinaciones // len(textos_unicos)])
+    for valor in quitar.unique():
+        if valor.split():
+            filas = (quitar == valor).to_numpy()
+            textos[filas] = textos[filas].str.replace(_patron_palabras(valor.split()), ' ', regex=True)
+    textos = textos.str.replace(r'\s+', ' ', regex=True).str.strip()
+    return pd.Series(textos.to_numpy(dtype=object)[codigos], index=indice)
+
+
+def codigos_alfanumericos(textos):
+    """Palabras con algún dígito de cada texto, sin tildes ni signos internos, unidas por espacios.
+
+    "Camión modelo KEU-4937" -> "keu4937". Sirve de clave exacta: dos
+    descripciones casi iguales con otro código no son el mismo activo.
+    """
+    indice = textos.index if isinstance(textos, pd.Series) else None
+    codigos, unicos = pd.factorize(pd.Series(textos, dtype=object).fillna('').astype(str).to_numpy(dtype=object))
+    palabras = _simplificar(pd.Series(unicos, dtype=object).str.replace(r'(?<=\w)[-./](?=\w)', '', regex=True))
+    unidos = palabras.str.findall(r'[a-z0-9]*[0-9][a-z0-9]*').map(' '.join).to_numpy(dtype=object)
+    return pd.Series(unidos[codigos], index=indice)
+
+
+def firmas_minhash(textos, semilla=0):
+    """Firma MinHash (uint32, una columna por permutación) de los bigramas de caracteres de cada texto.
+
+    Cada permutación es un hash multiplicativo (a·x + b) mod 2⁶⁴ del que se
+    toman los 32 bits altos. Los textos de menos de dos caracteres no tienen
+    bigramas: su firma es toda _VACIO.
+    """
+    textos = np.asarray(textos, dtype=object)
+    rng = np.random.default_rng(semilla)
+    a = rng.integers(0, 1 << 63, size=NUM_PERMUTACIONES, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=NUM_PERMUTACIONES, dtype=np.uint64)
+    firmas = np.empty((len(textos), NUM_PERMUTACIONES), dtype=np.uint32)
+    for inicio in range(0, len(textos), TANDA_FIRMAS):
+        # Matriz de bytes (textos × largo del más largo de la tanda) rellenada con ceros
+        bytes_ = np.array([t.encode('ascii', 'ignore')[:LARGO_MAXIMO] for t in textos[inicio:inicio + TANDA_FIRMAS]])
+        largo = max(bytes_.dtype.itemsize, 2)
+        bytes_ = np.frombuffer(bytes_.astype(f'S{largo}').tobytes(), dtype=np.uint8).reshape(len(bytes_), largo)
+        bigramas = (bytes_[:, :-1].astype(np.uint64) << np.uint64(8)) | bytes_[:, 1:]
+        validos = (bytes_[:, :-1] > 0) & (bytes_[:, 1:] > 0)
+        for k in range(NUM_PERMUTACIONES):
+            valores = np.where(validos, (a[k] * bigramas + b[k]) >> np.uint64(32), _VACIO)
+            firmas[inicio:inicio + len(bytes_), k] = valores.min(axis=1)
+    return firmas
+
+
+def _claves_bandas(firmas):
+    """Clave entera de cada banda de la firma (filas × BANDAS)."""
+    bandas = firmas.reshape(len(firmas), BANDAS, FILAS_POR_BANDA).astype(np.uint64)
+    clave = np.zeros((len(firmas), BANDAS), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for fila in range(FILAS_POR_BANDA):
+            clave = clave * np.uint64(0x100000001B3) ^ bandas[:, :, fila]
+    return clave
+
+
+def _bigramas_y_numeros(texto):
+    recortado = texto.encode('ascii', 'ignore')[:LARGO_MAXIMO]
+    return {recortado[k:k + 2] for k in range(len(recortado) - 1)}, re.findall(r'\d+', texto)
+
+
+def _similitud_exacta(textos, a, b):
+    """Jaccard de los bigramas de textos[a] y textos[b], par a par (cada par distinto se calcula una vez).
+
+    Si los números del texto (altura de la calle, código de modelo) no coinciden
+    la similitud es 0: "Av. 7 N° 17" y "Av. 8 N° 17" son parecidos pero no el mismo inmueble.
+    """
+    cache = {}
+    similitudes = {}
+    resultado = np.empty(len(a))
+    for posicion, par in enumerate(zip(a.tolist(), b.tolist())):
+        if par not in similitudes:
+            (bigramas_a, numeros_a), (bigramas_b, numeros_b) = (
+                cache.setdefault(k, _bigramas_y_numeros(textos[k])) for k in par)
+            union = len(bigramas_a | bigramas_b)
+            similitudes[par] = (len(bigramas_a & bigramas_b) / union
+                                if union and numeros_a == numeros_b else 0.0)
+        resultado[posicion] = similitudes[par]
+    return resultado
+
+
+def _pares_vecinos(bloque, orden_secundario):
+    """Pares (i, j) de filas consecutivas del mismo bloque, ordenadas por la columna secundaria."""
+    orden = np.lexsort((orden_secundario, bloque))
+    mismo = bloque[orden[1:]] == bloque[orden[:-1]]
+    return orden[:-1][mismo], orden[1:][mismo]
+
+
+def detectar_duplicados(df, clase, umbral_similitud=UMBRAL_SIMILITUD, tolerancia=None):
+    """Grupos de posibles duplicados de una clase.
+
+    Devuelve un DataFrame con el índice de df y las columnas grupo_duplicado
+    (clave del primer registro del grupo, vacía si la fila no tiene
+    duplicados) e is_anomaly_duplicado (-1 duplicado, 1 no). tolerancia
+    reemplaza la tolerancia relativa de la columna numérica de la clase.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    reglas = REGLAS_DUPLICADOS[clase]
+    tolerancia = reglas['tolerancia'] if tolerancia is None else tolerancia
+    n = len(df)
+    if n < 2:
+        return pd.DataFrame({'grupo_duplicado': pd.Series([None] * n, index=df.index, dtype=object),
+                             'is_anomaly_duplicado': np.ones(n, dtype=np.int64)}, index=df.index)
+
+    bloque = pd.factorize(pd.Series(df[reglas['bloque']]).astype(str))[0].astype(np.int64)
+    if reglas['codigos']:
+        codigo = pd.factorize(codigos_alfanumericos(df[reglas['texto']]).to_numpy(dtype=object))[0]
+        bloque = pd.factorize(bloque * np.int64(codigo.max() + 1) + codigo)[0].astype(np.int64)
+    numerica = pd.to_numeric(df[reglas['numerica']], errors='coerce').to_numpy(dtype=float)
+    normalizado = normalizar_texto(df[reglas['texto']], df[reglas['bloque']])
+    texto, unicos = pd.factorize(normalizado.to_numpy(dtype=object))
+    firmas = firmas_minhash(unicos)
+    con_bigramas = firmas[:, 0] != np.uint32(_VACIO)
+
+    # Bloques: (tipo, texto normalizado) y (tipo, banda LSH); los textos sin bigramas sólo entran al primero
+    # y un texto vacío no se compara con nada
+    bloqueos = [np.where(normalizado.to_numpy(dtype=object) != '', bloque * np.int64(len(unicos)) + texto,
+                         -1 - np.arange(n))]
+    claves = _claves_bandas(firmas)
+    for banda in range(BANDAS):
+        codigo = pd.factorize(claves[texto, banda])[0].astype(np.int64)
+        bloqueos.append(np.where(con_bigramas[texto], bloque * np.int64(len(unicos)) + codigo,
+                                 -1 - np.arange(n)))
+
+    origen, destino = [], []
+    secundario = np.nan_to_num(numerica, nan=np.inf)
+    for clave_bloque in bloqueos:
+        i, j = _pares_vecinos(clave_bloque, secundario)
+        if tolerancia is not None:
+            cerca = np.abs(numerica[i] - numerica[j]) <= tolerancia * np.maximum(np.abs(numerica[i]),
+                                                                                 np.abs(numerica[j]))
+            i, j = i[cerca], j[cerca]
+        origen.append(i)
+        destino.append(j)
+    origen, destino = np.concatenate(origen), np.concatenate(destino)
+
+    # Textos distintos: la firma estima la similitud con un error de ~0,08 y la exacta confirma los dudosos
+    distintos = np.flatnonzero(texto[origen] != texto[destino])
+    ti, tj = texto[origen[distintos]], texto[destino[distintos]]
+    dudosos = (firmas[ti] == firmas[tj]).mean(axis=1) >= umbral_similitud - MARGEN_ESTIMACION
+    aceptados = np.ones(len(origen), dtype=bool)
+    aceptados[distintos] = False
+    aceptados[distintos[dudosos]] = _similitud_exacta(unicos, ti[dudosos], tj[dudosos]) >= umbral_similitud
+    origen, destino = origen[aceptados], destino[aceptados]
+
+    grafo = coo_matrix((np.ones(len(origen), dtype=np.int8), (origen, destino)), shape=(n, n))
+    _, componente = connected_components(grafo, directed=False)
+    tamanos = np.bincount(componente)
+    duplicado = tamanos[componente] > 1
+    # Primer registro (en el orden de df) de cada grupo
+    primero = np.full(len(tamanos), n, dtype=np.int64)
+    np.minimum.at(primero, componente, np.arange(n))
+    claves_registro = pd.Series(df[reglas['clave']]).astype(str).to_numpy(dtype=object)
+    grupo = np.where(duplicado, claves_registro[np.minimum(primero[componente], n - 1)], None)
+    return pd.DataFrame({'grupo_duplicado': grupo, 'is_anomaly_duplicado': np.where(duplicado, -1, 1)},
+                        index=df.index)
+
+
+def main(argv=None):
+    from ingesta_activos import cargar_activos
+
+    parser = argparse.ArgumentParser(description="Detecta maquinarias o inmuebles registrados más de una vez")
+    parser.add_argument('clase', choices=list(REGLAS_DUPLICADOS))
+    parser.add_argument('archivo')
+    parser.add_argument('-o', '--salida', default=None, help="Parquet con las filas duplicadas y su grupo")
+    parser.add_argument('--umbral-similitud', type=float, default=UMBRAL_SIMILITUD)
+    parser.add_argument('--tolerancia', type=float, default=None,
+                        help="Diferencia relativa admitida en la columna numérica de la clase")
+    args = parser.parse_args(argv)
+
+    df = cargar_activos(args.archivo, args.clase)
+    duplicados = detectar_duplicados(df, args.clase, args.umbral_similitud, args.tolerancia)
+    filas = df.join(duplicados).loc[duplicados['is_anomaly_duplicado'] == -1]
+    print(f"{len(filas)} de {len(df)} registros en {filas['grupo_duplicado'].nunique()} grupos de duplicados")
+    if args.salida:
+        filas.sort_values('grupo_duplicado', kind='stable').to_parquet(args.salida, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
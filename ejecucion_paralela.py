@@ -0,0 +1,120 @@
+# =================================================================
+# EJECUCIÓN PARALELA DE LAS AUDITORÍAS POR CLASE DE ACTIVO
+# =================================================================
+# Maquinarias, inmuebles, intangibles y otros activos no comparten datos, así
+# que cada par generación/carga + auditoría corre en un proceso del pool. Los
+# resultados se entregan a medida que terminan, con el tiempo de cada clase.
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from auditoria_activos import auditar_clase
+from generador_datos_activos import generar_datos
+from esquema_activos import compactar_con_informe
+from ingesta_activos import cargar_activos
+from modelos_anomalias import RegistroModelos, DIRECTORIO_MODELOS
+
+CLASES = ['maquinarias', 'inmuebles', 'intangibles', 'otros_activos']
+
+# Registro de modelos propio de cada proceso del pool (los modelos se comparten vía disco)
+_registros_por_directorio = {}
+
+
+def _registro_del_proceso(directorio_modelos):
+    if directorio_modelos not in _registros_por_directorio:
+        _registros_por_directorio[directorio_modelos] = RegistroModelos(directorio_modelos)
+    return _registros_por_directorio[directorio_modelos]
+
+
+def n_jobs_por_proceso(max_workers):
+    """Núcleos para cada IsolationForest sin sobresuscribir la CPU entre procesos del pool."""
+    return max(1, (os.cpu_count() or 1) // max_workers)
+
+
+def ejecutar_clase(clase, ruta=None, n_registros=None, semilla=None, fecha_referencia=None,
+                   parametros=None, n_jobs=None, directorio_modelos=DIRECTORIO_MODELOS):
+    """Carga (ruta del ERP) o genera los datos de una clase y los audita.
+
+    Devuelve un dict con la clase, el DataFrame auditado (con tipos compactos),
+    el tiempo total en segundos, los tiempos de entrenamiento/puntuación del
+    modelo de IA y la memoria del DataFrame antes y después de compactarlo.
+    """
+    inicio = time.perf_counter()
+    if ruta:
+        df = cargar_activos(ruta, clase)
+    else:
+        df = generar_datos(clase, n_registros, semilla, fecha_referencia)
+    registro = _registro_del_proceso(directorio_modelos)
+    df = auditar_clase(clase, df, fecha_referencia, registro_modelos=registro, n_jobs=n_jobs,
+                       **(parametros or {}))
+    df, memoria = compactar_con_informe(df, clase)
+    return {
+        'clase': clase,
+        'df': df,
+        'tiempo_s': time.perf_counter() - inicio,
+        'tiempos_modelo': registro.tiempos_ultimo(clase) if clase in ('maquinarias', 'inmuebles') else {},
+        'memoria': memoria,
+    }
+
+
+def crear_pool(max_workers=None):
+    """Pool de procesos para las auditorías (spawn: seguro desde servidores multihilo)."""
+    return ProcessPoolExecutor(max_workers=max_workers or len(CLASES),
+                               mp_context=multiprocessing.get_context('spawn'))
+
+
+def auditar_en_paralelo(tareas, pool=None, max_workers=None, n_jobs=None):
+    """Ejecuta ejecutar_clase para cada tarea y entrega los resultados a medida que terminan.
+
+    tareas: dict clase -> argumentos de ejecutar_clase (ruta, n_registros, ...).
+    """
+    max_workers = max_workers or len(tareas)
+    if n_jobs is None:
+        n_jobs = n_jobs_por_proceso(max_workers)
+    propio = pool is None
+    if propio:
+        pool = crear_pool(max_workers)
+    try:
+        futuros = [pool.submit(ejecutar_clase, clase, n_jobs=n_jobs, **argumentos)
+                   for clase, argumentos in tareas.items()]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+    finally:
+        if propio:
+            pool.shutdown()
+
+
+# =================================================================
+# CACHÉ COMPARTIDA DE RESULTADOS
+# =================================================================
+
+class CacheResultados:
+    """Resultados de ejecutar_clase por clave, compartidos entre sesiones, con descarte LRU.
+
+    Guarda futuros del pool: si varias sesiones piden la misma clave mientras se
+    calcula, todas esperan el mismo cálculo en lugar de repetirlo.
+    """
+
+    def __init__(self, max_workers=None, max_entradas=16, n_jobs=None):
+        max_workers = max_workers or len(CLASES)
+        self.pool = crear_pool(max_workers)
+        self.max_entradas = max_entradas
+        self.n_jobs = n_jobs if n_jobs is not None else n_jobs_por_proceso(max_workers)
+        self._futuros = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, clase, **argumentos):
+        """Futuro con el resultado de ejecutar_clase(clase, **argumentos) para la clave."""
+        with self._lock:
+            futuro = self._futuros.get(clave)
+            if futuro is not None and not (futuro.done() and futuro.exception() is not None):
+                self._futuros.move_to_end(clave)
+                return futuro
+            futuro = self.pool.submit(ejecutar_clase, clase, n_jobs=self.n_jobs, **argumentos)
+            self._futuros[clave] = futuro
+            while len(self._futuros) > self.max_entradas:
+                self._futuros.popitem(last=False)
+            return futuro
@@ -0,0 +1,99 @@
+# =================================================================
+# TIPOS COMPACTOS PARA LOS DATAFRAMES DE ACTIVOS
+# =================================================================
+# Convierte las columnas de baja cardinalidad a category, las marcas -1/1 a
+# int8, los enteros al menor tipo que los contiene y los derivados de
+# precisión acotada (años, Z-scores) a float32. Los importes (valores,
+# costos, amortizaciones, montos) quedan en float64: float32 sólo garantiza
+# ~7 dígitos significativos y perdería centavos en importes millonarios.
+import pandas as pd
+
+# Columna -> tipo compacto ('categoria', 'bandera', 'entero', 'float32') por clase de activo
+TIPOS_COMPACTOS = {
+    'maquinarias': {
+        'tipo_equipo': 'categoria',
+        'ubicacion': 'categoria',
+        'estado': 'categoria',
+        'vida_util_anios': 'entero',
+        'edad_anios': 'float32',
+        'vida_util_restante_anios': 'float32',
+        'valor_adquisicion_zscore': 'float32',
+        'is_anomaly_ia': 'bandera',
+        'modelo_ia': 'categoria',
+        'alerta_combinada': 'categoria',
+        'grupo_duplicado': 'categoria',
+        'is_anomaly_duplicado': 'bandera',
+        'empresa': 'categoria',
+    },
+    'inmuebles': {
+        'tipo_inmueble': 'categoria',
+        'ubicacion': 'categoria',
+        'estado': 'categoria',
+        'edad_anios': 'float32',
+        'vida_util_restante_anios': 'float32',
+        'valor_adquisicion_zscore': 'float32',
+        'is_anomaly_zscore': 'bandera',
+        'precio_m2': 'float32',
+        'precio_m2_referencia': 'float32',
+        'precio_m2_zscore': 'float32',
+        'is_anomaly_precio_m2': 'bandera',
+        'is_anomaly_ia': 'bandera',
+        'modelo_ia': 'categoria',
+        'resultado_auditoria': 'categoria',
+        'grupo_duplicado': 'categoria',
+        'is_anomaly_duplicado': 'bandera',
+        'empresa': 'categoria',
+    },
+    'intangibles': {
+        'empresa_id': 'entero',
+        'tipo_activo_intangible': 'categoria',
+        'vida_util_anios': 'entero',
+        'estado_activo': 'categoria',
+        'nombre_empresa_propietaria': 'categoria',
+        'cuit_empresa_propietaria': 'categoria',
+        'anios_transcurridos': 'float32',
+        'antiguedad_anios': 'float32',
+    },
+    'otros_activos': {
+        'tipo_activo': 'categoria',
+        'moneda': 'categoria',
+        'descripcion': 'categoria',
+        'dias_desde_registro': 'entero',
+        'empresa': 'categoria',
+    },
+}
+
+
+def memoria_mb(df):
+    """Memoria del DataFrame en MB, contando el contenido de los textos."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def compactar_tipos(df, clase):
+    """Convierte a tipos compactos las columnas presentes de la clase (in place) y devuelve el df."""
+    for col, tipo in TIPOS_COMPACTOS[clase].items():
+        if col not in df.columns:
+            continue
+        serie = df[col]
+        if tipo == 'categoria':
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                df[col] = serie.astype('category')
+        elif tipo == 'float32':
+            df[col] = serie.astype('float32')
+        elif serie.isna().any():
+            # Los enteros con faltantes quedan como están (int8/int16 no admiten NaN)
+            continue
+        elif tipo == 'bandera':
+            df[col] = serie.astype('int8')
+        elif tipo == 'entero':
+            df[col] = pd.to_numeric(serie, downcast='integer')
+    return df
+
+
+def compactar_con_informe(df, clase):
+    """Compacta los tipos y devuelve (df, informe) con la memoria antes y después en MB."""
+    antes = memoria_mb(df)
+    compactar_tipos(df, clase)
+    despues = memoria_mb(df)
+    return df, {'antes_mb': round(float(antes), 3), 'despues_mb': round(float(despues), 3),
+                'reduccion': round(float(antes / despues), 2) if despues else None}
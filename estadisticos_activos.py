@@ -0,0 +1,371 @@
+# =================================================================
+# RESÚMENES COMBINABLES DE POBLACIÓN (WELFORD + T-DIGEST)
+# =================================================================
+# Guarda, por clase de activo y por segmento (tipo de equipo, tipo de
+# inmueble, ubicación), un resumen de valor_adquisicion de tamaño fijo:
+# media y varianza (Welford/Chan) y un t-digest de cuantiles. Con él se
+# calculan Z-scores y puntajes robustos (mediana/MAD) sin tener la columna en
+# memoria, y los resúmenes de distintos archivos, particiones o días se
+# combinan sin volver a leer los datos.
+#
+#     python estadisticos_activos.py resumir maquinarias maq_enero.csv -o enero.json
+#     python estadisticos_activos.py combinar enero.json febrero.json -o acumulado.json
+#     python estadisticos_activos.py mostrar acumulado.json
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from auditoria_por_lotes import EstadisticosCorrientes, leer_por_lotes, TAMANO_LOTE
+
+# Segmentos con resumen propio, además del total de la clase
+SEGMENTOS = {
+    'maquinarias': ['tipo_equipo', 'ubicacion'],
+    'inmuebles': ['tipo_inmueble', 'ubicacion'],
+}
+COLUMNA_RESUMIDA = 'valor_adquisicion'
+
+# Parámetro de compresión del t-digest (a lo sumo ~COMPRESION centroides)
+COMPRESION = 200
+# Valores (o centroides) que el t-digest acumula antes de recomprimir
+TAMANO_BUFFER = 10_000
+# Puntaje robusto de Iglewicz y Hoaglin: 0,6745 (x - mediana) / MAD
+FACTOR_MAD = 0.6745
+
+
+# =================================================================
+# T-DIGEST
+# =================================================================
+
+def _escala_k(q, n, compresion):
+    """Escala k del t-digest: arcoseno (k1) más logarítmica (k3).
+
+    k1 reparte los centroides en toda la distribución; k3 los afina en las colas,
+    donde con sólo k1 un centroide del p99,9 abarca cientos de puntos.
+    """
+    k1 = compresion / (2 * np.pi) * np.arcsin(2 * q - 1)
+    q = np.clip(q, 0.5 / n, 1 - 0.5 / n)
+    normalizacion = 4 * np.log(max(n / compresion, 1.0)) + 21
+    k3 = compresion / normalizacion * np.where(q <= 0.5, np.log(2 * q), -np.log(2 * (1 - q)))
+    return k1 + k3
+
+
+def _comprimir(medias, pesos, compresion):
+    """Agrupa centroides ordenados de modo que cada grupo abarque a lo sumo una unidad
+    de la escala k: pocos puntos por centroide en las colas, más en el centro."""
+    orden = np.argsort(medias, kind='stable')
+    medias, pesos = medias[orden], pesos[orden]
+    acumulado = np.cumsum(pesos)
+    q_izquierda = (acumulado - pesos) / acumulado[-1]
+    k = _escala_k(q_izquierda, acumulado[-1], compresion)
+    grupos = np.floor(k - k[0]).astype(np.int64)
+    inicios = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]])
+    pesos_grupo = np.add.reduceat(pesos, inicios)
+    return np.add.reduceat(medias * pesos, inicios) / pesos_grupo, pesos_grupo
+
+
+class TDigest:
+    """Cuantiles aproximados de una población con centroides de tamaño acotado (Dunning).
+
+    Los valores y los centroides de otros digests se acumulan en un buffer y se
+    recomprimen juntos, con operaciones vectorizadas, cuando el buffer se llena o
+    antes de consultar: recomprimir lote a lote degrada los centroides.
+    """
+
+    def __init__(self, compresion=COMPRESION, tamano_buffer=TAMANO_BUFFER):
+        self.compresion = compresion
+        self.tamano_buffer = tamano_buffer
+        self._medias = np.empty(0)
+        self._pesos = np.empty(0)
+        self._buffer = []
+        self._en_buffer = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    @property
+    def medias(self):
+        self._vaciar()
+        return self._medias
+
+    @property
+    def pesos(self):
+        self._vaciar()
+        return self._pesos
+
+    @property
+    def n(self):
+        return float(self.pesos.sum())
+
+    def _vaciar(self):
+        if not self._buffer:
+            return
+        medias, pesos = zip(*self._buffer)
+        self._medias, self._pesos = _comprimir(np.concatenate([self._medias, *medias]),
+                                               np.concatenate([self._pesos, *pesos]), self.compresion)
+        self._buffer = []
+        self._en_buffer = 0
+
+    def _agregar(self, medias, pesos, minimo, maximo):
+        self._buffer.append((medias, pesos))
+        self._en_buffer += medias.size
+        self.minimo = min(self.minimo, minimo)
+        self.maximo = max(self.maximo, maximo)
+        if self._en_buffer >= self.tamano_buffer:
+            self._vaciar()
+
+    def actualizar(self, valores):
+        """Incorpora un lote de valores (se ignoran los NaN)."""
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if valores.size:
+            self._agregar(valores, np.ones(valores.size), valores.min(), valores.max())
+        return self
+
+    def combinar(self, otro):
+        """Combina con el digest de otro lote, partición o día."""
+        if otro.pesos.size:
+            self._agregar(otro.medias, otro.pesos, otro.minimo, otro.maximo)
+        return self
+
+    def _puntos(self):
+        # Cada centroide representa su media en el centro de su peso acumulado
+        centros = np.cumsum(self.pesos) - self.pesos / 2
+        return (np.r_[self.minimo, self.medias, self.maximo], np.r_[0.0, centros, self.pesos.sum()])
+
+    def cuantil(self, q):
+        """Cuantil(es) q en [0, 1] (NaN si el digest está vacío)."""
+        if not self.pesos.size:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        valores, posiciones = self._puntos()
+        return np.interp(np.asarray(q, dtype=float) * posiciones[-1], posiciones, valores)
+
+    def cdf(self, x):
+        """Fracción de la población menor o igual que x (aproximada)."""
+        if not self.pesos.size:
+            return np.full(np.shape(x), np.nan) if np.ndim(x) else np.nan
+        valores, posiciones = self._puntos()
+        return np.interp(x, valores, posiciones) / posiciones[-1]
+
+    def mad(self):
+        """Desvío absoluto mediano: el d con cdf(mediana + d) - cdf(mediana - d) = 1/2 (bisección)."""
+        if not self.pesos.size:
+            return np.nan
+        mediana = self.cuantil(0.5)
+        bajo, alto = 0.0, self.maximo - self.minimo
+        for _ in range(60):
+            medio = (bajo + alto) / 2
+            if self.cdf(mediana + medio) - self.cdf(mediana - medio) < 0.5:
+                bajo = medio
+            else:
+                alto = medio
+        return (bajo + alto) / 2
+
+    def a_dict(self):
+        return {'compresion': self.compresion, 'medias': self.medias.tolist(), 'pesos': self.pesos.tolist(),
+                'minimo': self.minimo if self.pesos.size else None,
+                'maximo': self.maximo if self.pesos.size else None}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        digest = cls(datos['compresion'])
+        digest._medias = np.asarray(datos['medias'], dtype=float)
+        digest._pesos = np.asarray(datos['pesos'], dtype=float)
+        if digest.pesos.size:
+            digest.minimo, digest.maximo = datos['minimo'], datos['maximo']
+        return digest
+
+
+# =================================================================
+# RESUMEN DE UNA POBLACIÓN Y ALMACÉN POR CLASE Y SEGMENTO
+# =================================================================
+
+class ResumenPoblacion:
+    """Media y varianza corrientes (EstadisticosCorrientes) más un t-digest.
+
+    Ofrece n, media, desviacion y zscore como EstadisticosCorrientes, así que
+    sirve de estadísticos de población en la auditoría por lotes; no permite
+    retirar valores (un t-digest no los olvida).
+    """
+
+    def __init__(self, compresion=COMPRESION):
+        self.corrientes = EstadisticosCorrientes()
+        self.digest = TDigest(compresion)
+
+    def actualizar(self, valores):
+        self.corrientes.actualizar(valores)
+        self.digest.actualizar(valores)
+        return self
+
+    def combinar(self, otro):
+        self.corrientes.combinar(otro.corrientes)
+        self.digest.combinar(otro.digest)
+        return self
+
+    @property
+    def n(self):
+        return self.corrientes.n
+
+    @property
+    def media(self):
+        return self.corrientes.media
+
+    @property
+    def desviacion(self):
+        return self.corrientes.desviacion
+
+    def zscore(self, valores):
+        return self.corrientes.zscore(valores)
+
+    @property
+    def mediana(self):
+        return self.digest.cuantil(0.5)
+
+    @property
+    def mad(self):
+        return self.digest.mad()
+
+    def puntaje_robusto(self, valores):
+        """Puntaje Z robusto 0,6745 (x - mediana) / MAD (NaN si el MAD es 0)."""
+        mad = self.mad
+        return FACTOR_MAD * (np.asarray(valores, dtype=float) - self.mediana) / (mad if mad else np.nan)
+
+    def a_dict(self):
+        corrientes = self.corrientes
+        return {'n': corrientes.n, 'media': corrientes.media, 'm2': corrientes.m2, 'digest': self.digest.a_dict()}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        resumen = cls()
+        corrientes = resumen.corrientes
+        corrientes.n, corrientes.media, corrientes.m2 = datos['n'], datos['media'], datos['m2']
+        resumen.digest = TDigest.desde_dict(datos['digest'])
+        return resumen
+
+
+class AlmacenEstadisticos:
+    """Resúmenes de valor_adquisicion por clase y por segmento ((clase, columna, valor))."""
+
+    def __init__(self, compresion=COMPRESION):
+        self.compresion = compresion
+        self.resumenes = {}
+
+    def _resumen(self, clave):
+        if clave not in self.resumenes:
+            self.resumenes[clave] = ResumenPoblacion(self.compresion)
+        return self.resumenes[clave]
+
+    def actualizar(self, clase, df, columna=COLUMNA_RESUMIDA):
+        """Incorpora un lote de la clase al total y a cada segmento presente en el lote."""
+        self._resumen((clase, None, None)).actualizar(df[columna])
+        for segmento in SEGMENTOS.get(clase, []):
+            if segmento not in df.columns:
+                continue
+            for valor, grupo in df[columna].groupby(df[segmento].astype(str), observed=True, sort=False):
+                self._resumen((clase, segmento, valor)).actualizar(grupo)
+        return self
+
+    def combinar(self, otro):
+        """Suma los resúmenes de otro almacén (otro archivo, partición o día)."""
+        for clave, resumen in otro.resumenes.items():
+            self._resumen(clave).combinar(resumen)
+        return self
+
+    def resumen(self, clase, segmento=None, valor=None):
+        """Resumen del total de la clase o de un segmento (None si no hay datos)."""
+        return self.resumenes.get((clase, segmento, valor))
+
+    def _por_fila(self, clase, df, segmento, atributo):
+        """Un parámetro de resumen (media, desvío, mediana, MAD) para cada fila según su segmento."""
+        if segmento is None:
+            return getattr(self.resumenes[(clase, None, None)], atributo)
+        valores = df[segmento].astype(str)
+        parametros = {valor: getattr(self.resumenes[(clase, segmento, valor)], atributo)
+                      for valor in valores.unique() if (clase, segmento, valor) in self.resumenes}
+        return valores.map(parametros).to_numpy(dtype=float)
+
+    def zscore(self, clase, df, segmento=None, columna=COLUMNA_RESUMIDA):
+        """Z-score de cada fila respecto de la clase o de su segmento (NaN en segmentos sin resumen)."""
+        media = self._por_fila(clase, df, segmento, 'media')
+        desviacion = self._por_fila(clase, df, segmento, 'desviacion')
+        return (df[columna].to_numpy(dtype=float) - media) / desviacion
+
+    def puntaje_robusto(self, clase, df, segmento=None, columna=COLUMNA_RESUMIDA):
+        """Puntaje robusto (mediana/MAD) de cada fila respecto de la clase o de su segmento."""
+        mediana = self._por_fila(clase, df, segmento, 'mediana')
+        mad = self._por_fila(clase, df, segmento, 'mad')
+        return FACTOR_MAD * (df[columna].to_numpy(dtype=float) - mediana) / np.where(mad == 0, np.nan, mad)
+
+    def tabla(self):
+        """Una fila por resumen con n, media, desvío, cuantiles y MAD."""
+        filas = []
+        for (clase, segmento, valor), resumen in sorted(self.resumenes.items(), key=lambda e: tuple(map(str, e[0]))):
+            p05, mediana, p95 = resumen.digest.cuantil([0.05, 0.5, 0.95])
+            filas.append({'clase': clase, 'segmento': segmento or 'total', 'valor': valor or '', 'n': resumen.n,
+                          'media': resumen.media, 'desviacion': resumen.desviacion, 'p05': p05,
+                          'mediana': mediana, 'p95': p95, 'mad': resumen.mad})
+        return pd.DataFrame(filas)
+
+    def guardar(self, ruta):
+        """Guarda el almacén en JSON (escritura atómica)."""
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        datos = {'compresion': self.compresion,
+                 'resumenes': [{'clase': clase, 'segmento': segmento, 'valor': valor, **resumen.a_dict()}
+                               for (clase, segmento, valor), resumen in self.resumenes.items()]}
+        tmp = f"{ruta}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False)
+        os.replace(tmp, ruta)
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+        almacen = cls(datos['compresion'])
+        for entrada in datos['resumenes']:
+            clave = (entrada['clase'], entrada['segmento'], entrada['valor'])
+            almacen.resumenes[clave] = ResumenPoblacion.desde_dict(entrada)
+        return almacen
+
+
+def resumir_archivo(ruta, clase, almacen=None, tamano_lote=TAMANO_LOTE):
+    """Almacén con los resúmenes de un archivo leído por lotes (memoria acotada)."""
+    almacen = almacen or AlmacenEstadisticos()
+    for lote in leer_por_lotes(ruta, clase, tamano_lote):
+        almacen.actualizar(clase, lote)
+    return almacen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resúmenes combinables de valor_adquisicion por clase y segmento")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    resumir = subcomandos.add_parser('resumir', help="Resume un archivo (CSV/Parquet) por lotes")
+    resumir.add_argument('clase', choices=sorted(SEGMENTOS))
+    resumir.add_argument('archivo')
+    resumir.add_argument('-o', '--salida', required=True)
+    resumir.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE)
+    combinar = subcomandos.add_parser('combinar', help="Combina resúmenes de archivos, particiones o días")
+    combinar.add_argument('resumenes', nargs='+')
+    combinar.add_argument('-o', '--salida', required=True)
+    mostrar = subcomandos.add_parser('mostrar', help="Muestra los resúmenes de un almacén")
+    mostrar.add_argument('resumen')
+    args = parser.parse_args(argv)
+
+    if args.comando == 'resumir':
+        almacen = resumir_archivo(args.archivo, args.clase, tamano_lote=args.tamano_lote)
+        almacen.guardar(args.salida)
+    elif args.comando == 'combinar':
+        almacen = AlmacenEstadisticos.cargar(args.resumenes[0])
+        for ruta in args.resumenes[1:]:
+            almacen.combinar(AlmacenEstadisticos.cargar(ruta))
+        almacen.guardar(args.salida)
+    else:
+        almacen = AlmacenEstadisticos.cargar(args.resumen)
+    print(almacen.tabla().to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
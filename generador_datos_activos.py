@@ -0,0 +1,238 @@
+# =================================================================
+# MOTOR DE GENERACIÓN VECTORIZADA DE DATOS - ACTIVO NO CORRIENTE
+# =================================================================
+# Genera registros simulados con arreglos de NumPy en lugar de un dict por
+# fila. Las cadenas de Faker (direcciones, empresas, CUIT) se extraen de
+# pools pre-generados, por lo que el costo de Faker no crece con la cantidad
+# de filas. Misma semilla + misma fecha de referencia => mismo DataFrame.
+import string
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from esquema_activos import compactar_tipos
+
+# =================================================================
+# CATÁLOGOS
+# =================================================================
+
+TIPOS_MAQUINARIA = ["Torno CNC", "Fresadora", "Impresora industrial", "Camión", "Grua hidráulica"]
+UBICACIONES_MAQUINARIA = ["Planta A", "Planta B", "Depósito Central", "Taller de Mantenimiento"]
+ESTADOS_MAQUINARIA = ["Operativo", "En reparación", "Fuera de servicio", "Pendiente de baja"]
+PESOS_ESTADOS_MAQUINARIA = [0.7, 0.15, 0.1, 0.05]
+
+TIPOS_INMUEBLE = ["Oficina", "Depósito", "Terreno", "Planta industrial",
+                  "Local comercial", "Edificio", "Galpón", "Centro logístico"]
+ESTADOS_INMUEBLE = ["Operativo", "Arrendado", "Mantenimiento", "Disponible", "Inactivo"]
+PESOS_ESTADOS_INMUEBLE = [0.5, 0.2, 0.1, 0.1, 0.1]
+UBICACIONES_INMUEBLE = ["CABA", "Gran Buenos Aires", "Córdoba", "Mendoza", "Rosario", "Neuquén", "Salta"]
+
+TIPOS_ACTIVO_INTANGIBLE = ['Software Licencia', 'Patente', 'Marca Registrada', 'Derechos de Autor',
+                           'Fondo de Comercio', 'Lista de Clientes', 'Tecnología no Patentada']
+VIDA_UTIL_RANGOS_INTANGIBLES = {'Software Licencia': (3, 7), 'Patente': (10, 20), 'Marca Registrada': (5, 15),
+                                'Derechos de Autor': (5, 10), 'Fondo de Comercio': (5, 10),
+                                'Lista de Clientes': (2, 5), 'Tecnología no Patentada': (3, 8)}
+NUM_EMPRESAS_PROPIETARIAS = 10
+
+TIPOS_OTRO_ACTIVO = ['Valores a cobrar LP', 'Inversiones a Largo Plazo',
+                     'Activos por Impuestos Diferidos', 'Cuentas por Cobrar LP']
+MONEDAS = ['ARS', 'USD', 'EUR']
+
+# Tamaño máximo de los pools de cadenas generadas con Faker
+TAMANO_POOL_FAKER = 5000
+
+_LETRAS = np.array(list(string.ascii_letters))
+_DIGITOS = np.array(list(string.digits))
+
+
+# =================================================================
+# UTILIDADES
+# =================================================================
+
+def _fecha_referencia(fecha_referencia):
+    """Normaliza la fecha de referencia (por defecto, hoy) a medianoche, en microsegundos.
+
+    La unidad fija hace que un date, un str o un datetime den el mismo DataFrame.
+    """
+    if fecha_referencia is None:
+        fecha_referencia = datetime.now()
+    return pd.Timestamp(fecha_referencia).normalize().as_unit('us')
+
+
+def _fechas_entre(rng, n, referencia, dias_desde, dias_hasta):
+    """Fechas uniformes entre referencia - dias_desde y referencia - dias_hasta (inclusive)."""
+    dias_atras = rng.integers(dias_hasta, dias_desde + 1, size=n)
+    return pd.Series(referencia - pd.to_timedelta(dias_atras, unit='D'))
+
+
+def _dias(anios):
+    """Convierte años al mismo número de días que usa Faker para '-Ny'."""
+    return int(round(anios * 365.25))
+
+
+def _identificadores(prefijo, inicio, n):
+    """Genera identificadores secuenciales 'PREFIJO-inicio', 'PREFIJO-inicio+1', ..."""
+    return prefijo + pd.Series(np.arange(inicio, inicio + n)).astype(str)
+
+
+def _elegir(rng, opciones, n, pesos=None):
+    """Elige n valores de una lista de opciones (con reposición)."""
+    return np.asarray(opciones, dtype=object)[rng.choice(len(opciones), size=n, p=pesos)]
+
+
+def _codigos_modelo(rng, n):
+    """Equivalente vectorizado de fake.bothify('???-####')."""
+    letras = _LETRAS[rng.integers(0, len(_LETRAS), size=(n, 3))]
+    digitos = _DIGITOS[rng.integers(0, len(_DIGITOS), size=(n, 4))]
+    # Una matriz contigua (n, k) de caracteres '<U1' se reinterpreta como n cadenas '<Uk'
+    return (pd.Series(np.ascontiguousarray(letras).view('<U3').ravel(), dtype=object) + '-'
+            + pd.Series(np.ascontiguousarray(digitos).view('<U4').ravel(), dtype=object))
+
+
+@lru_cache(maxsize=32)
+def _pool_faker(metodo, semilla, tamano):
+    """Pool de cadenas generadas con Faker('es_AR'), reproducible por semilla."""
+    from faker import Faker
+
+    fake = Faker('es_AR')
+    fake.seed_instance(semilla)
+    if metodo == 'direccion':
+        return tuple(fake.address().replace("\n", ", ") for _ in range(tamano))
+    if metodo == 'empresa':
+        return tuple(fake.company() for _ in range(tamano))
+    if metodo == 'cuit':
+        return tuple(fake.unique.bothify(text='30-########-#') for _ in range(tamano))
+    raise ValueError(f"Pool de Faker desconocido: {metodo}")
+
+
+def _elegir_de_pool(rng, metodo, semilla, n):
+    """Elige n cadenas de un pool de Faker de tamaño acotado."""
+    pool = _pool_faker(metodo, semilla, min(max(n, 1), TAMANO_POOL_FAKER))
+    return np.asarray(pool, dtype=object)[rng.integers(0, len(pool), size=n)]
+
+
+# =================================================================
+# GENERADORES
+# =================================================================
+
+def generar_maquinarias(n_registros=30, semilla=42, fecha_referencia=None):
+    """Genera n_registros de inventario de maquinarias."""
+    rng = np.random.default_rng(semilla)
+    referencia = _fecha_referencia(fecha_referencia)
+
+    tipo = _elegir(rng, TIPOS_MAQUINARIA, n_registros)
+    fecha_adquisicion = _fechas_entre(rng, n_registros, referencia, _dias(10), _dias(1))
+    vida_util_anios = rng.integers(5, 16, size=n_registros)
+
+    return pd.DataFrame({
+        "id_equipo": _identificadores("EQ-", 1000, n_registros),
+        "tipo_equipo": tipo,
+        "descripcion": pd.Series(tipo) + " modelo " + _codigos_modelo(rng, n_registros),
+        "ubicacion": _elegir(rng, UBICACIONES_MAQUINARIA, n_registros),
+        "estado": _elegir(rng, ESTADOS_MAQUINARIA, n_registros, PESOS_ESTADOS_MAQUINARIA),
+        "fecha_adquisicion": fecha_adquisicion,
+        "valor_adquisicion": np.round(rng.uniform(200000, 5000000, size=n_registros), 2),
+        "vida_util_anios": vida_util_anios,
+        "fecha_fin_vida_util": fecha_adquisicion + pd.to_timedelta(vida_util_anios * 365, unit='D'),
+    })
+
+
+def generar_inmuebles(n_registros=30, semilla=101, fecha_referencia=None):
+    """Genera n_registros de inventario de inmuebles."""
+    rng = np.random.default_rng(semilla)
+    referencia = _fecha_referencia(fecha_referencia)
+
+    return pd.DataFrame({
+        "id_inmueble": _identificadores("INM-", 1000, n_registros),
+        "tipo_inmueble": _elegir(rng, TIPOS_INMUEBLE, n_registros),
+        "direccion": _elegir_de_pool(rng, 'direccion', semilla, n_registros),
+        "ubicacion": _elegir(rng, UBICACIONES_INMUEBLE, n_registros),
+        "estado": _elegir(rng, ESTADOS_INMUEBLE, n_registros, PESOS_ESTADOS_INMUEBLE),
+        "fecha_adquisicion": _fechas_entre(rng, n_registros, referencia, _dias(25), _dias(2)),
+        "valor_adquisicion": np.round(rng.uniform(100000.0, 15000000.0, size=n_registros), 2),
+        "superficie_m2": np.round(rng.uniform(100.0, 5000.0, size=n_registros), 2),
+    })
+
+
+def generar_intangibles(n_registros=30, semilla=789, fecha_referencia=None):
+    """Genera n_registros de activos intangibles."""
+    rng = np.random.default_rng(semilla)
+    referencia = _fecha_referencia(fecha_referencia)
+
+    empresas_nombre = np.asarray(_pool_faker('empresa', semilla, NUM_EMPRESAS_PROPIETARIAS), dtype=object)
+    empresas_cuit = np.asarray(_pool_faker('cuit', semilla, NUM_EMPRESAS_PROPIETARIAS), dtype=object)
+    idx_empresa = rng.integers(0, NUM_EMPRESAS_PROPIETARIAS, size=n_registros)
+
+    idx_tipo = rng.integers(0, len(TIPOS_ACTIVO_INTANGIBLE), size=n_registros)
+    tipo = np.asarray(TIPOS_ACTIVO_INTANGIBLE, dtype=object)[idx_tipo]
+    vida_min = np.array([VIDA_UTIL_RANGOS_INTANGIBLES[t][0] for t in TIPOS_ACTIVO_INTANGIBLE])[idx_tipo]
+    vida_max = np.array([VIDA_UTIL_RANGOS_INTANGIBLES[t][1] for t in TIPOS_ACTIVO_INTANGIBLE])[idx_tipo]
+    vida_util_anios = rng.integers(vida_min, vida_max + 1)
+
+    fecha_adquisicion = _fechas_entre(rng, n_registros, referencia, _dias(10), 30)
+    costo_adquisicion = np.round(rng.uniform(50000, 2000000, size=n_registros), 2)
+
+    dias_desde_adquisicion = (referencia - fecha_adquisicion).dt.days.to_numpy()
+    amortizacion_anual = costo_adquisicion / vida_util_anios
+    amortizacion_acumulada = np.minimum(
+        np.round(amortizacion_anual * (dias_desde_adquisicion / 365.25), 2), costo_adquisicion)
+    valor_neto_contable = np.round(costo_adquisicion - amortizacion_acumulada, 2)
+
+    estado = np.where(valor_neto_contable <= 0.01, 'Totalmente Amortizado', 'Activo').astype(object)
+    vendido = (rng.random(n_registros) < 0.05) & (estado == 'Activo')
+    estado[vendido] = 'Vendido'
+
+    return pd.DataFrame({
+        'activo_id': _identificadores('INT-', 30000, n_registros),
+        'empresa_id': 3000 + idx_empresa,
+        'tipo_activo_intangible': tipo,
+        'fecha_adquisicion': fecha_adquisicion,
+        'costo_adquisicion': costo_adquisicion,
+        'vida_util_anios': vida_util_anios,
+        'amortizacion_acumulada_simulada': amortizacion_acumulada,
+        'valor_neto_contable_simulado': valor_neto_contable,
+        'estado_activo': estado,
+        'nombre_empresa_propietaria': empresas_nombre[idx_empresa],
+        'cuit_empresa_propietaria': empresas_cuit[idx_empresa],
+    })
+
+
+def generar_otros_activos(n_registros=50, semilla=901, fecha_referencia=None):
+    """Genera n_registros de otros activos no corrientes."""
+    rng = np.random.default_rng(semilla)
+    referencia = _fecha_referencia(fecha_referencia)
+
+    return pd.DataFrame({
+        'id_activo': _identificadores('OA-', 1000, n_registros),
+        'tipo_activo': _elegir(rng, TIPOS_OTRO_ACTIVO, n_registros),
+        'monto': np.round(rng.uniform(10000, 250000, size=n_registros), 2),
+        'moneda': _elegir(rng, MONEDAS, n_registros),
+        'fecha_registro': _fechas_entre(rng, n_registros, referencia, 120, 0),
+        'descripcion': 'Activo ' + pd.Series(_elegir(rng, TIPOS_OTRO_ACTIVO, n_registros)),
+    })
+
+
+# Generador por clase de activo: nombre -> (función, cantidad por defecto, semilla por defecto)
+GENERADORES = {
+    'maquinarias': (generar_maquinarias, 30, 42),
+    'inmuebles': (generar_inmuebles, 30, 101),
+    'intangibles': (generar_intangibles, 30, 789),
+    'otros_activos': (generar_otros_activos, 50, 901),
+}
+
+
+def generar_datos(clase, n_registros=None, semilla=None, fecha_referencia=None, compacto=True):
+    """Genera datos de una clase de activo con los valores por defecto del catálogo.
+
+    Con compacto=True las columnas de catálogo salen como category y los enteros
+    con el menor tipo que los contiene (ver esquema_activos).
+    """
+    funcion, n_defecto, semilla_defecto = GENERADORES[clase]
+    df = funcion(
+        n_registros=n_defecto if n_registros is None else n_registros,
+        semilla=semilla_defecto if semilla is None else semilla,
+        fecha_referencia=fecha_referencia,
+    )
+    return compactar_tipos(df, clase) if compacto else df
@@ -1,55 +1,306 @@
 """
 GENERADOR DE INFORMES DE AUDITORÍA EN PDF - ACTIVO NO CORRIENTE
+
+Genera un informe por entidad y año. El lote corre en un pool de procesos,
+cada proceso arma la hoja de estilos una sola vez, y se omiten los informes
+cuyas entradas (entidad, año, datos auditados y versión de la plantilla)
+tienen la misma huella que el PDF ya generado:
+
+    python generar_informes_activos.py --anios 2020 2021 2022 --entidades "Empresa A" "Empresa B"
+
+Las cifras y las tablas de alertas salen de los resultados de la auditoría:
+por defecto se auditan datos simulados al cierre de cada año; con
+--resultados se informan los Parquet que escribe auditoria_cli:
+
+    python generar_informes_activos.py --anios 2024 --resultados resultados/
 """
 
+import argparse
+import hashlib
+import json
+import multiprocessing
+import re
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
 from datetime import datetime
 import os
 
+from auditoria_activos import (auditar_clase, resumir_auditoria, mascara_alertas, COLUMNAS_RESUMEN,
+                               UMBRAL_Z_MAQUINARIAS, UMBRAL_ZSCORE_INMUEBLES, CONTAMINACION, SEMILLA_VIDA_UTIL)
+from generador_datos_activos import generar_datos, GENERADORES
+from ingesta_activos import hash_archivo
+
+DIRECTORIO_INFORMES = 'data/informes_auditoria_activos'
+ARCHIVO_INDICE = 'indice_informes.json'
+AÑOS_POR_DEFECTO = [2020, 2021, 2022, 2023, 2024]
+
+# Se incrementa al cambiar el contenido o el formato del informe, para regenerar todos los PDF
+VERSION_PLANTILLA = 4
+
+CLASES = ['maquinarias', 'inmuebles', 'intangibles', 'otros_activos']
+
+# Parámetros con que se auditan los datos simulados (forman parte de la huella del informe)
+PARAMETROS_AUDITORIA = {'umbral_z': UMBRAL_Z_MAQUINARIAS, 'umbral_zscore': UMBRAL_ZSCORE_INMUEBLES,
+                        'contamination': CONTAMINACION, 'semilla': SEMILLA_VIDA_UTIL}
+
+# Nombre, unidad y título de sección de cada clase de activo
+ETIQUETAS_CLASES = {
+    'maquinarias': ('Maquinarias', 'equipos', 'INVENTARIO DE MAQUINARIAS'),
+    'inmuebles': ('Inmuebles', 'propiedades', 'INVENTARIO DE INMUEBLES'),
+    'intangibles': ('Activos Intangibles', 'activos', 'ACTIVOS INTANGIBLES'),
+    'otros_activos': ('Otros Activos', 'registros', 'OTROS ACTIVOS'),
+}
+
+DESCRIPCIONES_CLASES = {
+    'maquinarias': "El algoritmo Isolation Forest y el Z-score del valor de adquisición se combinan "
+                   "para detectar valores atípicos y vidas útiles inconsistentes; además se buscan "
+                   "equipos registrados dos veces con la misma descripción.",
+    'inmuebles': "La detección combina Z-score e Isolation Forest sobre valor de adquisición, "
+                 "superficie y vida útil restante, y compara el precio por m² con la mediana de los "
+                 "inmuebles de la misma ubicación, tipo y año de adquisición. También se marcan "
+                 "los inmuebles con la misma dirección y casi la misma superficie.",
+    'intangibles': "Se verificó la consistencia entre costo, amortización acumulada y valor neto contable.",
+    'otros_activos': "Se identificaron los registros con más de 90 días de antigüedad sin regularizar.",
+}
+
+# Columnas de la tabla de alertas: (columna, encabezado, formato, ancho en cm); los anchos
+# suman el ancho útil de A4 (17 cm) y son fijos para que reportlab no mida cada celda
+COLUMNAS_TABLA_ALERTAS = {
+    'maquinarias': [('id_equipo', 'ID', None, 2.2), ('tipo_equipo', 'Tipo', None, 3.2),
+                    ('ubicacion', 'Ubicación', None, 3.2), ('valor_adquisicion', 'Valor', '${:,.0f}', 3.0),
+                    ('valor_adquisicion_zscore', 'Z-score', '{:.2f}', 1.6), ('alerta_combinada', 'Alerta', None, 3.8)],
+    'inmuebles': [('id_inmueble', 'ID', None, 2.2), ('tipo_inmueble', 'Tipo', None, 3.2),
+                  ('ubicacion', 'Ubicación', None, 3.2), ('valor_adquisicion', 'Valor', '${:,.0f}', 3.0),
+                  ('superficie_m2', 'Superficie m²', '{:,.0f}', 2.2), ('resultado_auditoria', 'Resultado', None, 3.2)],
+    'intangibles': [('activo_id', 'ID', None, 2.2), ('tipo_activo_intangible', 'Tipo', None, 3.8),
+                    ('costo_adquisicion', 'Costo', '${:,.0f}', 2.6),
+                    ('valor_neto_calculado', 'VNC calculado', '${:,.0f}', 2.8),
+                    ('valor_neto_contable_simulado', 'VNC registrado', '${:,.0f}', 2.8),
+                    ('discrepancia_vnc', 'Discrepancia', '${:,.2f}', 2.8)],
+    'otros_activos': [('id_activo', 'ID', None, 2.2), ('tipo_activo', 'Tipo', None, 4.4),
+                      ('monto', 'Monto', '{:,.2f}', 3.2), ('moneda', 'Moneda', None, 1.8),
+                      ('fecha_registro', 'Registro', '{:%d/%m/%Y}', 2.6), ('dias_desde_registro', 'Días', '{:,}', 2.8)],
+}
+ORDEN_TABLA_ALERTAS = {
+    'maquinarias': 'valor_adquisicion_zscore',
+    'inmuebles': 'valor_adquisicion',
+    'intangibles': 'discrepancia_vnc',
+    'otros_activos': 'dias_desde_registro',
+}
+
+# Alto fijo de cada fila de la tabla de alertas (en puntos)
+ALTO_FILA_ALERTAS = 12
+
+ESTILO_TABLA_ALERTAS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a237e')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 7),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#e8eaf6')]),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+
+@lru_cache(maxsize=1)
+def obtener_estilos():
+    """Hoja de estilos con los estilos personalizados, creada una sola vez por proceso."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name='TituloPortada',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1a237e'),
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+
+    styles.add(ParagraphStyle(
+        name='Subtitulo',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#283593'),
+        spaceAfter=12,
+        spaceBefore=12,
+        fontName='Helvetica-Bold'
+    ))
+
+    styles.add(ParagraphStyle(
+        name='Justificado',
+        parent=styles['Normal'],
+        fontSize=11,
+        alignment=TA_JUSTIFY,
+        spaceAfter=12,
+        leading=16
+    ))
+    return styles
+
+
+# =================================================================
+# RESULTADOS DE AUDITORÍA PARA EL INFORME
+# =================================================================
+
+def columnas_informe(clase):
+    """Columnas del resultado auditado que usa el informe (resumen + tabla de alertas)"""
+    return list(dict.fromkeys(COLUMNAS_RESUMEN[clase] + [col for col, _, _, _ in COLUMNAS_TABLA_ALERTAS[clase]]))
+
+
+def leer_resultado(fuente, clase):
+    """DataFrame auditado de una clase; de un Parquet (salida de auditoria_cli) se leen sólo las columnas del informe"""
+    if isinstance(fuente, pd.DataFrame):
+        return fuente
+    import pyarrow.parquet as pq
+
+    # Resultados anteriores a una columna del informe (p. ej. is_anomaly_precio_m2) se leen sin ella
+    disponibles = set(pq.read_schema(fuente).names)
+    return pd.read_parquet(fuente, columns=[col for col in columnas_informe(clase) if col in disponibles])
+
+
+def _semilla(clase, año, entidad):
+    return zlib.crc32(f"{clase}|{entidad or ''}|{año}".encode('utf-8'))
+
+
+def auditar_simulados(año, entidad=None):
+    """Audita datos simulados de la entidad al cierre del año, con semillas reproducibles"""
+    fecha_referencia = f"{año}-12-31"
+    resultados = {}
+    for clase in CLASES:
+        semilla = _semilla(clase, año, entidad)
+        df = generar_datos(clase, semilla=semilla, fecha_referencia=fecha_referencia)
+        resultados[clase] = auditar_clase(clase, df, fecha_referencia, **PARAMETROS_AUDITORIA)
+    return resultados
+
+
+def _hash_dataframe(df):
+    contenido = pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def _formatear(valor, formato):
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return ''
+    return formato.format(valor) if formato else str(valor)
+
+
+class TablaAlertas(Flowable):
+    """Tabla de filas con alerta que se arma de a una página cuando el documento la divide.
+
+    Con anchos y alto de fila fijos, las filas que entran en la página se calculan
+    sin medir celdas y sólo existe la tabla de la página en curso: el tiempo es
+    lineal y la memoria no depende de la cantidad de filas.
+    """
+
+    def __init__(self, df, clase, inicio=0):
+        Flowable.__init__(self)
+        self.df = df
+        self.clase = clase
+        self.inicio = inicio
+        self._tabla = None
+        self._filas = 0
+
+    def _bloque(self, n):
+        columnas = COLUMNAS_TABLA_ALERTAS[self.clase]
+        bloque = self.df.iloc[self.inicio:self.inicio + n][[col for col, _, _, _ in columnas]]
+        filas = [[titulo for _, titulo, _, _ in columnas]]
+        filas += [[_formatear(valor, formato) for valor, (_, _, formato, _) in zip(fila, columnas)]
+                  for fila in bloque.itertuples(index=False, name=None)]
+        return Table(filas, colWidths=[ancho * cm for _, _, _, ancho in columnas],
+                     rowHeights=ALTO_FILA_ALERTAS, repeatRows=1, style=ESTILO_TABLA_ALERTAS, hAlign='LEFT')
+
+    def wrap(self, ancho, alto):
+        restantes = len(self.df) - self.inicio
+        self._filas = min(restantes, int(alto // ALTO_FILA_ALERTAS) - 1)
+        if self._filas < 1:
+            # No entra ni el encabezado con una fila: split devuelve [] y sigue en la página siguiente
+            self._tabla = None
+            return ancho, alto + 1
+        self._tabla = self._bloque(self._filas)
+        w, h = self._tabla.wrap(ancho, alto)
+        # Si quedan filas, se declara más alto que la página para que el documento la divida
+        return w, (h if self._filas == restantes else alto + 1)
+
+    def split(self, ancho, alto):
+        self.wrap(ancho, alto)
+        if self._tabla is None:
+            return []
+        return [self._tabla, TablaAlertas(self.df, self.clase, self.inicio + self._filas)]
+
+    def draw(self):
+        self._tabla.drawOn(self.canv, 0, 0)
+
+
+def filas_con_alerta(df, clase):
+    """Filas con alerta, de la más a la menos severa"""
+    alertas = df.loc[mascara_alertas(clase, df)]
+    orden = alertas[ORDEN_TABLA_ALERTAS[clase]].abs().sort_values(ascending=False, kind='stable').index
+    return alertas.loc[orden]
+
+
+# =================================================================
+# INFORME PDF
+# =================================================================
 
 class GeneradorInformePDFActivos:
     """Genera informes de auditoría en formato PDF para Activo No Corriente"""
     
-    def __init__(self, año):
+    def __init__(self, año, entidad=None, resultados=None):
+        """resultados: dict clase -> DataFrame auditado o ruta a su Parquet (salida de auditoria_cli).
+        Sin resultados se auditan datos simulados de la entidad al cierre del año."""
         self.año = año
-        self.styles = getSampleStyleSheet()
-        self._crear_estilos_personalizados()
+        self.entidad = entidad
+        self.fuentes = resultados
+        self.styles = obtener_estilos()
+        self._resultados = None
     
-    def _crear_estilos_personalizados(self):
-        """Crea estilos personalizados"""
-        self.styles.add(ParagraphStyle(
-            name='TituloPortada',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='Subtitulo',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#283593'),
-            spaceAfter=12,
-            spaceBefore=12,
-            fontName='Helvetica-Bold'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='Justificado',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            alignment=TA_JUSTIFY,
-            spaceAfter=12,
-            leading=16
-        ))
+    @property
+    def resultados(self):
+        """DataFrames auditados por clase (se cargan o calculan la primera vez que se usan)"""
+        if self._resultados is None:
+            if self.fuentes is None:
+                self._resultados = auditar_simulados(self.año, self.entidad)
+            else:
+                self._resultados = {clase: leer_resultado(fuente, clase) for clase, fuente in self.fuentes.items()}
+        return self._resultados
+    
+    def cifras(self):
+        """Registros, valor total y alertas de cada clase, tomados de los resultados de la auditoría"""
+        return {clase: resumir_auditoria(clase, df) for clase, df in self.resultados.items()}
+    
+    def _huella_datos(self):
+        if self.fuentes is None:
+            # Los datos simulados se auditan aquí: un cambio en las reglas o el modelo que no toque
+            # semillas ni parámetros cambia igual las columnas del informe y obliga a regenerarlo
+            huellas = {clase: {'semilla': _semilla(clase, self.año, self.entidad),
+                               'registros': GENERADORES[clase][1],
+                               'resultado': _hash_dataframe(df[columnas_informe(clase)])}
+                       for clase, df in self.resultados.items()}
+            huellas['parametros'] = PARAMETROS_AUDITORIA
+            return huellas
+        huellas = {}
+        for clase, fuente in self.fuentes.items():
+            if isinstance(fuente, pd.DataFrame):
+                huellas[clase] = _hash_dataframe(fuente)
+            else:
+                huellas[clase] = hash_archivo(fuente)
+        return huellas
+    
+    def huella(self):
+        """Huella de las entradas del informe: entidad, año, datos auditados y versión de la plantilla"""
+        entradas = {'version': VERSION_PLANTILLA, 'año': self.año, 'entidad': self.entidad,
+                    'datos': self._huella_datos()}
+        return hashlib.sha256(json.dumps(entradas, sort_keys=True, default=str).encode('utf-8')).hexdigest()
     
     def _crear_portada(self):
         """Crea la portada"""
@@ -68,6 +319,8 @@ class GeneradorInformePDFActivos:
             self.styles['Subtitulo']
         )
         elementos.append(subtitulo)
+        if self.entidad:
+            elementos.append(Paragraph(self.entidad, self.styles['Subtitulo']))
         elementos.append(Spacer(1, 2*cm))
         
         fecha_actual = datetime.now().strftime("%d de %B de %Y")
@@ -87,8 +340,14 @@ class GeneradorInformePDFActivos:
         elementos.append(Paragraph("RESUMEN EJECUTIVO", self.styles['Subtitulo']))
         elementos.append(Spacer(1, 0.3*cm))
         
-        # Datos simulados que varían por año
-        factor = 1 + (self.año - 2020) * 0.12
+        cifras = self.cifras()
+        total = sum(c['valor_total'] for c in cifras.values())
+        alertas = sum(c['alertas'] for c in cifras.values())
+        componentes = "<br/>".join(
+            f"• <b>{ETIQUETAS_CLASES[clase][0]}:</b> {c['registros']:,} {ETIQUETAS_CLASES[clase][1]} "
+            f"valorados en ${c['valor_total']:,.0f}"
+            for clase, c in cifras.items()
+        )
         
         texto = f"""
         El presente informe corresponde al análisis algorítmico del <b>Activo No Corriente</b> 
@@ -96,17 +355,11 @@ class GeneradorInformePDFActivos:
         <br/><br/>
         <b>Componentes Analizados:</b>
         <br/><br/>
-        • <b>Maquinarias:</b> 30 equipos valorados en ${95000000 * factor:,.0f}
-        <br/>
-        • <b>Inmuebles:</b> 30 propiedades valoradas en ${180000000 * factor:,.0f}
-        <br/>
-        • <b>Activos Intangibles:</b> 30 activos valorados en ${45000000 * factor:,.0f}
-        <br/>
-        • <b>Otros Activos:</b> 50 registros por ${8000000 * factor:,.0f}
+        {componentes}
         <br/><br/>
-        <b>Total del Activo No Corriente:</b> ${(95000000 + 180000000 + 45000000 + 8000000) * factor:,.0f}
+        <b>Total del Activo No Corriente:</b> ${total:,.0f}
         <br/><br/>
-        Se detectaron anomalías en {3 + self.año % 3} registros que requieren revisión adicional.
+        Se detectaron alertas en {alertas:,} registros que requieren revisión adicional.
         """
         
         elementos.append(Paragraph(texto, self.styles['Justificado']))
@@ -114,45 +367,25 @@ class GeneradorInformePDFActivos:
         return elementos
     
     def _crear_analisis_componentes(self):
-        """Crea el análisis de componentes"""
+        """Crea el análisis de componentes con la tabla de filas con alerta de cada clase"""
         elementos = []
         elementos.append(Paragraph("ANÁLISIS POR COMPONENTE", self.styles['Subtitulo']))
         elementos.append(Spacer(1, 0.3*cm))
         
-        # Maquinarias
-        texto_maq = """
-        <b>1. INVENTARIO DE MAQUINARIAS</b>
-        <br/><br/>
-        Se analizaron 30 equipos industriales distribuidos en 4 ubicaciones. El algoritmo 
-        Isolation Forest detectó anomalías en valores de adquisición y vida útil restante.
-        <br/><br/>
-        <b>Hallazgos:</b> Equipos EQ-1005 y EQ-1018 presentan valores atípicos que requieren verificación.
-        """
-        elementos.append(Paragraph(texto_maq, self.styles['Justificado']))
-        elementos.append(Spacer(1, 0.3*cm))
-        
-        # Inmuebles
-        texto_inm = """
-        <b>2. INVENTARIO DE INMUEBLES</b>
-        <br/><br/>
-        Análisis de 30 propiedades en 7 ubicaciones. Detección mediante Z-score e Isolation Forest 
-        identificó variaciones en valores de adquisición por metro cuadrado.
-        <br/><br/>
-        <b>Hallazgos:</b> Inmuebles INM-1012 y INM-1023 con ratios precio/superficie anómalos.
-        """
-        elementos.append(Paragraph(texto_inm, self.styles['Justificado']))
-        elementos.append(Spacer(1, 0.3*cm))
-        
-        # Intangibles
-        texto_int = """
-        <b>3. ACTIVOS INTANGIBLES</b>
-        <br/><br/>
-        Evaluación de 30 activos intangibles incluyendo software, patentes y marcas. 
-        Se verificó la consistencia de amortización acumulada.
-        <br/><br/>
-        <b>Hallazgos:</b> Activo INT-30007 presenta discrepancia en valor neto contable.
-        """
-        elementos.append(Paragraph(texto_int, self.styles['Justificado']))
+        for numero, (clase, df) in enumerate(self.resultados.items(), start=1):
+            _, unidad, titulo = ETIQUETAS_CLASES[clase]
+            alertas = filas_con_alerta(df, clase)
+            texto = f"""
+            <b>{numero}. {titulo}</b>
+            <br/><br/>
+            Se analizaron {len(df):,} {unidad}. {DESCRIPCIONES_CLASES[clase]}
+            <br/><br/>
+            <b>Hallazgos:</b> {len(alertas):,} {unidad} con alertas{':' if len(alertas) else '.'}
+            """
+            elementos.append(Paragraph(texto, self.styles['Justificado']))
+            if len(alertas):
+                elementos.append(TablaAlertas(alertas, clase))
+            elementos.append(Spacer(1, 0.5*cm))
         elementos.append(PageBreak())
         return elementos
     
@@ -218,21 +451,126 @@ class GeneradorInformePDFActivos:
             return False
 
 
-def generar_todos_los_informes():
-    """Genera informes para años 2020-2024"""
-    os.makedirs('data/informes_auditoria_activos', exist_ok=True)
-    
-    for año in [2020, 2021, 2022, 2023, 2024]:
-        print(f"Generando informe {año}...")
-        generador = GeneradorInformePDFActivos(año)
-        archivo = f'data/informes_auditoria_activos/informe_activos_{año}.pdf'
-        if generador.generar_informe(archivo):
-            print(f"✅ {archivo}")
-        else:
-            print(f"❌ Error en {año}")
-    
-    print("\n✅ Todos los informes generados")
+# =================================================================
+# GENERACIÓN POR LOTES (ENTIDADES × AÑOS)
+# =================================================================
+
+def nombre_archivo_informe(año, entidad=None):
+    """Nombre del PDF: informe_activos_<año>.pdf o informe_activos_<entidad>_<año>.pdf"""
+    if not entidad:
+        return f'informe_activos_{año}.pdf'
+    return f"informe_activos_{re.sub(r'[^A-Za-z0-9]+', '_', entidad).strip('_').lower()}_{año}.pdf"
+
+
+def _leer_indice(directorio):
+    try:
+        with open(os.path.join(directorio, ARCHIVO_INDICE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _escribir_indice(directorio, indice):
+    ruta = os.path.join(directorio, ARCHIVO_INDICE)
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, ruta)
+
+
+def _generar_en_proceso(tarea):
+    """Genera un informe dentro de un proceso del pool; escribe a un temporal y lo renombra al terminar."""
+    año, entidad, resultados, ruta = tarea
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    ok = GeneradorInformePDFActivos(año, entidad, resultados).generar_informe(tmp)
+    if ok:
+        os.replace(tmp, ruta)
+    elif os.path.exists(tmp):
+        os.remove(tmp)
+    return ok
+
+
+def generar_informes(años=AÑOS_POR_DEFECTO, entidades=None, directorio=DIRECTORIO_INFORMES,
+                     max_workers=None, forzar=False, fuentes=None):
+    """Genera los informes de cada entidad y año en paralelo, omitiendo los que no cambiaron.
+
+    entidades: lista de nombres (None genera un informe por año sin entidad).
+    fuentes: dict (año, entidad) -> {clase: ruta al Parquet auditado}; los pares sin fuente
+    se informan sobre datos simulados.
+    Devuelve un dict con las listas de archivos generados, omitidos y con error.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    indice = _leer_indice(directorio)
+    resumen = {'generados': [], 'omitidos': [], 'errores': []}
+
+    pendientes = []
+    for entidad in entidades or [None]:
+        for año in años:
+            nombre = nombre_archivo_informe(año, entidad)
+            resultados = (fuentes or {}).get((año, entidad))
+            huella = GeneradorInformePDFActivos(año, entidad, resultados).huella()
+            if not forzar and indice.get(nombre) == huella and os.path.exists(os.path.join(directorio, nombre)):
+                resumen['omitidos'].append(nombre)
+            else:
+                pendientes.append(((año, entidad, resultados, os.path.join(directorio, nombre)), nombre, huella))
+
+    tareas = [tarea for tarea, _, _ in pendientes]
+    if len(tareas) <= 1 or max_workers == 1:
+        resultados = map(_generar_en_proceso, tareas)
+        pool = None
+    else:
+        max_workers = min(max_workers or os.cpu_count() or 1, len(tareas))
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+        resultados = pool.map(_generar_en_proceso, tareas, chunksize=max(1, len(tareas) // (max_workers * 4)))
+    try:
+        for (_, nombre, huella), ok in zip(pendientes, resultados):
+            if ok:
+                indice[nombre] = huella
+                resumen['generados'].append(nombre)
+            else:
+                indice.pop(nombre, None)
+                resumen['errores'].append(nombre)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        _escribir_indice(directorio, indice)
+    return resumen
+
+
+def generar_todos_los_informes(años=AÑOS_POR_DEFECTO, entidades=None, max_workers=None, forzar=False,
+                               fuentes=None):
+    """Genera los informes de los años (y entidades) indicados e imprime el resultado"""
+    resumen = generar_informes(años, entidades, max_workers=max_workers, forzar=forzar, fuentes=fuentes)
+    for archivo in resumen['generados']:
+        print(f"✅ {archivo}")
+    for archivo in resumen['errores']:
+        print(f"❌ Error en {archivo}")
+    print(f"\n✅ {len(resumen['generados'])} informes generados, "
+          f"{len(resumen['omitidos'])} sin cambios, {len(resumen['errores'])} con error")
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera los informes PDF de auditoría del Activo No Corriente")
+    parser.add_argument('--anios', type=int, nargs='+', default=AÑOS_POR_DEFECTO)
+    parser.add_argument('--entidades', nargs='+', default=None, help="Un informe por entidad y año")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos del pool (por defecto, uno por núcleo)")
+    parser.add_argument('--forzar', action='store_true', help="Regenera aunque las entradas no hayan cambiado")
+    parser.add_argument('--resultados', default=None,
+                        help="Directorio con <clase>.parquet de auditoria_cli; informa esos resultados (un solo año y entidad)")
+    args = parser.parse_args(argv)
+    fuentes = None
+    if args.resultados:
+        if len(args.anios) != 1 or len(args.entidades or [None]) != 1:
+            parser.error("--resultados requiere un solo año y a lo sumo una entidad")
+        rutas = {clase: os.path.join(args.resultados, f"{clase}.parquet") for clase in CLASES}
+        rutas = {clase: ruta for clase, ruta in rutas.items() if os.path.exists(ruta)}
+        if not rutas:
+            parser.error(f"No hay resultados .parquet en {args.resultados}")
+        fuentes = {(args.anios[0], (args.entidades or [None])[0]): rutas}
+    resumen = generar_todos_los_informes(args.anios, args.entidades, args.procesos, args.forzar, fuentes)
+    return 1 if resumen['errores'] else 0
 
 
 if __name__ == "__main__":
-    generar_todos_los_informes()
+    sys.exit(main())
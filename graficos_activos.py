@@ -0,0 +1,66 @@
+# =================================================================
+# GRÁFICOS DEL DASHBOARD: AGREGACIÓN EN EL SERVIDOR + VEGA-LITE
+# =================================================================
+# Los gráficos se arman sobre agregados pequeños (sumas y conteos por
+# categoría) calculados con pandas en el servidor. Al navegador sólo viaja el
+# agregado dentro de una especificación Vega-Lite (vectorial e interactiva),
+# nunca las filas originales ni un PNG rasterizado.
+import hashlib
+import json
+
+import pandas as pd
+
+ESQUEMA_COLOR = 'viridis'
+
+
+def sumar_por(df, categoria, valor, nombre=None):
+    """Suma de una columna por categoría, de mayor a menor."""
+    agregado = df.groupby(categoria, observed=True, sort=False)[valor].sum()
+    agregado = agregado.rename(nombre or valor).sort_values(ascending=False)
+    return agregado.reset_index()
+
+
+def contar_por(df, columnas, nombre='cantidad'):
+    """Cantidad de registros por una o más columnas, de mayor a menor."""
+    agregado = df.groupby(columnas, observed=True, sort=False).size().rename(nombre).reset_index()
+    return agregado.sort_values(nombre, ascending=False, ignore_index=True)
+
+
+def huella_agregado(agregado):
+    """Hash del contenido de un agregado (columnas y valores), para cachear su gráfico."""
+    digest = hashlib.sha256(json.dumps(list(map(str, agregado.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(agregado, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def especificacion_barras(agregado, x, y, titulo, etiqueta_x='', etiqueta_y='', color=None,
+                          formato_valor=None, orden=None):
+    """Especificación Vega-Lite de barras para un agregado.
+
+    color: columna que apila las barras (con leyenda); por defecto cada barra
+    se colorea por su categoría. formato_valor: formato d3 para rotular el
+    valor sobre cada barra (p. ej. '$,.0f'); None no rotula. orden: lista de
+    categorías del eje x; por defecto de mayor a menor valor.
+    """
+    codificacion = {
+        'x': {'field': x, 'type': 'nominal', 'sort': orden or '-y', 'title': etiqueta_x,
+              'axis': {'labelAngle': -45}},
+        'y': {'field': y, 'type': 'quantitative', 'title': etiqueta_y},
+        'color': {'field': color or x, 'type': 'nominal', 'scale': {'scheme': ESQUEMA_COLOR},
+                  'legend': {'title': color} if color else None},
+        'tooltip': [{'field': campo, 'type': 'nominal'} for campo in dict.fromkeys([x, color or x])]
+                   + [{'field': y, 'type': 'quantitative', 'format': formato_valor or ',.0f'}],
+    }
+    capas = [{'mark': {'type': 'bar'}}]
+    if formato_valor:
+        capas.append({
+            'mark': {'type': 'text', 'baseline': 'bottom', 'dy': -4},
+            'encoding': {'text': {'field': y, 'type': 'quantitative', 'format': formato_valor},
+                         'color': {'value': 'black'}},
+        })
+    return {
+        'title': titulo,
+        'data': {'values': agregado.to_dict(orient='records')},
+        'encoding': codificacion,
+        'layer': capas,
+    }
@@ -0,0 +1,166 @@
+# =================================================================
+# HISTORIAL DE AUDITORÍAS: FOTOS FECHADAS EN PARQUET PARTICIONADO
+# =================================================================
+# Cada resultado auditado se guarda una sola vez como una foto inmutable,
+# particionada por clase y fecha de referencia:
+#
+#     data/historial_auditorias/clase=maquinarias/fecha_referencia=2024-12-31/<foto>.parquet
+#
+# El nombre de la foto sale de la entrada (huella del archivo o datos
+# simulados) y de los parámetros de auditoría, así que la misma auditoría de
+# un período pasado se lee del disco en lugar de recalcularse. Las fotos no
+# se sobrescriben ni se borran: el historial sólo crece.
+#
+#     python historial_auditorias.py                   # lista las fotos guardadas
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+DIRECTORIO_HISTORIAL = "data/historial_auditorias"
+
+# Clave de los metadatos propios en el esquema de cada Parquet
+CLAVE_METADATOS = b'historial_auditoria'
+COLUMNAS_LISTADO = ['clase', 'fecha_referencia', 'foto', 'entrada', 'parametros', 'registros', 'creado', 'ruta']
+
+
+def fecha_particion(fecha_referencia):
+    """Fecha de referencia como texto AAAA-MM-DD (el valor de la partición)."""
+    return pd.Timestamp(fecha_referencia).strftime('%Y-%m-%d')
+
+
+def identificador_foto(entrada, parametros=None):
+    """Nombre de la foto: hash de la entrada y de los parámetros de auditoría (3 y 3.0 dan el mismo)."""
+    parametros = {nombre: float(valor) if isinstance(valor, (int, float)) else valor
+                  for nombre, valor in (parametros or {}).items()}
+    clave = json.dumps([entrada, sorted(parametros.items())], default=str)
+    return hashlib.sha256(clave.encode('utf-8')).hexdigest()[:20]
+
+
+class HistorialAuditorias:
+    """Fotos fechadas y de sólo agregado de los resultados auditados por clase de activo."""
+
+    def __init__(self, directorio=DIRECTORIO_HISTORIAL):
+        self.directorio = directorio
+
+    def _directorio_fecha(self, clase, fecha_referencia):
+        return os.path.join(self.directorio, f"clase={clase}", f"fecha_referencia={fecha_particion(fecha_referencia)}")
+
+    def ruta(self, clase, fecha_referencia, entrada, parametros=None):
+        """Ruta de la foto de una auditoría (exista o no)."""
+        return os.path.join(self._directorio_fecha(clase, fecha_referencia),
+                            f"{identificador_foto(entrada, parametros)}.parquet")
+
+    def existe(self, clase, fecha_referencia, entrada, parametros=None):
+        return os.path.exists(self.ruta(clase, fecha_referencia, entrada, parametros))
+
+    def guardar(self, clase, df, fecha_referencia, entrada, parametros=None):
+        """Guarda la foto si todavía no existe y devuelve su ruta.
+
+        La foto se escribe en un temporal y se publica con os.link, que falla si
+        otra sesión ya publicó la misma: nunca se pisa ni se lee a medio escribir.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        ruta = self.ruta(clase, fecha_referencia, entrada, parametros)
+        if os.path.exists(ruta):
+            return ruta
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        metadatos = {'clase': clase, 'fecha_referencia': fecha_particion(fecha_referencia), 'entrada': entrada,
+                     'parametros': parametros or {}, 'registros': len(df), 'creado': time.time()}
+        tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}),
+                                               CLAVE_METADATOS: json.dumps(metadatos, default=str).encode('utf-8')})
+        tmp = f"{ruta}.{os.getpid()}.tmp"
+        pq.write_table(tabla, tmp)
+        try:
+            os.link(tmp, ruta)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+        return ruta
+
+    def cargar(self, ruta, columnas=None):
+        """DataFrame auditado de una foto."""
+        return pd.read_parquet(ruta, columns=columnas)
+
+    def listar(self, clase=None):
+        """Fotos guardadas (DataFrame con COLUMNAS_LISTADO), de la más reciente a la más antigua.
+
+        Sólo lee los pies de los Parquet, no los datos.
+        """
+        import pyarrow.parquet as pq
+
+        filas = []
+        clases = [f"clase={clase}"] if clase else (sorted(os.listdir(self.directorio))
+                                                    if os.path.isdir(self.directorio) else [])
+        for particion_clase in clases:
+            base = os.path.join(self.directorio, particion_clase)
+            if not os.path.isdir(base):
+                continue
+            for particion_fecha in sorted(os.listdir(base)):
+                directorio = os.path.join(base, particion_fecha)
+                for nombre in sorted(os.listdir(directorio)):
+                    if not nombre.endswith('.parquet'):
+                        continue
+                    ruta = os.path.join(directorio, nombre)
+                    metadatos = json.loads(pq.read_schema(ruta).metadata[CLAVE_METADATOS])
+                    filas.append({
+                        'clase': metadatos['clase'],
+                        'fecha_referencia': pd.Timestamp(metadatos['fecha_referencia']),
+                        'foto': nombre[:-len('.parquet')],
+                        'entrada': metadatos['entrada'],
+                        'parametros': json.dumps(metadatos['parametros'], sort_keys=True),
+                        'registros': metadatos['registros'],
+                        'creado': pd.Timestamp(metadatos['creado'], unit='s'),
+                        'ruta': ruta,
+                    })
+        if not filas:
+            return pd.DataFrame(columns=COLUMNAS_LISTADO)
+        return (pd.DataFrame(filas, columns=COLUMNAS_LISTADO)
+                .sort_values(['fecha_referencia', 'creado'], ascending=False, ignore_index=True))
+
+    def fechas(self):
+        """Fechas de referencia con al menos una foto, de la más reciente a la más antigua."""
+        fechas = set()
+        if os.path.isdir(self.directorio):
+            for particion_clase in os.listdir(self.directorio):
+                base = os.path.join(self.directorio, particion_clase)
+                if os.path.isdir(base):
+                    fechas.update(nombre.split('=', 1)[1] for nombre in os.listdir(base)
+                                  if nombre.startswith('fecha_referencia='))
+        return [pd.Timestamp(fecha).date() for fecha in sorted(fechas, reverse=True)]
+
+    def ultima(self, clase, fecha_referencia):
+        """Ruta de la foto más reciente de una clase a esa fecha (None si no hay)."""
+        directorio = self._directorio_fecha(clase, fecha_referencia)
+        if not os.path.isdir(directorio):
+            return None
+        rutas = [os.path.join(directorio, nombre) for nombre in os.listdir(directorio) if nombre.endswith('.parquet')]
+        return max(rutas, key=os.path.getmtime) if rutas else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lista las fotos guardadas del historial de auditorías")
+    parser.add_argument('--directorio', default=DIRECTORIO_HISTORIAL)
+    parser.add_argument('--clase', default=None)
+    args = parser.parse_args(argv)
+
+    fotos = HistorialAuditorias(args.directorio).listar(args.clase)
+    if fotos.empty:
+        print("No hay fotos guardadas.")
+        return 0
+    for fila in fotos.itertuples(index=False):
+        print(f"{fila.fecha_referencia:%Y-%m-%d}  {fila.clase:<14} {fila.registros:>9} registros  "
+              f"{fila.entrada}  {fila.parametros}  ({fila.creado:%Y-%m-%d %H:%M})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
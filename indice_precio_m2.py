@@ -0,0 +1,250 @@
+# =================================================================
+# ÍNDICE DE PRECIO POR M² DE INMUEBLES (UBICACIÓN × TIPO × AÑO)
+# =================================================================
+# Precalcula, por ubicación, tipo de inmueble y año de adquisición, la
+# mediana y el desvío robusto (MAD) del logaritmo de valor_adquisicion /
+# superficie_m2, en arreglos densos de float32. Las celdas con menos de
+# MIN_CELDA inmuebles toman la referencia del nivel siguiente (ubicación ×
+# tipo, luego tipo, luego todos), ya resuelta al construir el índice; cada
+# eje tiene además una posición "desconocido" para ubicaciones, tipos o años
+# que no estaban al construirlo. Evaluar un inmueble es entonces un único
+# acceso al arreglo y una comparación, tanto para millones de filas como
+# para un alta individual.
+#
+#     python indice_precio_m2.py construir inm.csv -o indice_m2.npz
+#     python indice_precio_m2.py evaluar indice_m2.npz inm_nuevos.csv -o evaluados.parquet
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from estadisticos_activos import FACTOR_MAD
+
+CLAVES_INDICE = ['ubicacion', 'tipo_inmueble', 'anio_adquisicion']
+# Menos inmuebles que esto en una celda: se usa la referencia del nivel siguiente
+MIN_CELDA = 30
+# Puntaje robusto (log precio/m²) a partir del cual el precio se marca atípico
+UMBRAL_PRECIO_M2 = 3.5
+
+# Nivel de la referencia de cada celda
+NIVEL_CELDA, NIVEL_UBICACION_TIPO, NIVEL_TIPO, NIVEL_GLOBAL = 0, 1, 2, 3
+
+
+def precio_m2(valor_adquisicion, superficie_m2):
+    """valor_adquisicion / superficie_m2; NaN si la superficie no es positiva."""
+    valor = np.asarray(valor_adquisicion, dtype=float)
+    superficie = np.asarray(superficie_m2, dtype=float)
+    return np.divide(valor, superficie, out=np.full(valor.shape, np.nan), where=superficie > 0)
+
+
+def anio_adquisicion(fechas):
+    """Año de cada fecha como float (NaN si no es una fecha válida)."""
+    return pd.to_datetime(pd.Series(fechas), errors='coerce').dt.year.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _mediana_mad(codigos, x, n_grupos):
+    """(n, mediana, MAD) de x por código 0..n_grupos-1, vectorizado (orden por código y valor)."""
+    orden = np.lexsort((x, codigos))
+    codigos, x = codigos[orden], x[orden]
+    n = np.bincount(codigos, minlength=n_grupos)
+    inicio = np.concatenate([[0], np.cumsum(n)[:-1]])
+    con_datos = n > 0
+
+    def medianas(valores):
+        bajo = inicio + (n - 1) // 2
+        alto = inicio + n // 2
+        resultado = np.full(n_grupos, np.nan)
+        resultado[con_datos] = (valores[bajo[con_datos]] + valores[alto[con_datos]]) / 2
+        return resultado
+
+    mediana = medianas(x)
+    desvios = np.abs(x - mediana[codigos])
+    desvios = desvios[np.lexsort((desvios, codigos))]
+    return n, mediana, medianas(desvios)
+
+
+class IndicePrecioM2:
+    """Referencias de log(precio/m²) por ubicación × tipo de inmueble × año de adquisición."""
+
+    def __init__(self, ubicaciones, tipos, anio_min, mediana, escala, n, nivel):
+        self.ubicaciones = [str(u) for u in ubicaciones]
+        self.tipos = [str(t) for t in tipos]
+        self.anio_min = int(anio_min)
+        # Arreglos de forma (ubicaciones + 1, tipos + 1, años + 1); la última posición es "desconocido"
+        self.mediana = np.asarray(mediana, dtype=np.float32)
+        self.escala = np.asarray(escala, dtype=np.float32)
+        self.n = np.asarray(n, dtype=np.int32)
+        self.nivel = np.asarray(nivel, dtype=np.int8)
+        self.n_anios = self.mediana.shape[2] - 1
+        self._codigo_ubicacion = {u: i for i, u in enumerate(self.ubicaciones)}
+        self._codigo_tipo = {t: i for i, t in enumerate(self.tipos)}
+
+    @classmethod
+    def construir(cls, df, min_celda=MIN_CELDA):
+        """Índice a partir de inmuebles con ubicacion, tipo_inmueble, fecha_adquisicion, valor y superficie."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.log(precio_m2(df['valor_adquisicion'], df['superficie_m2']))
+        anios = anio_adquisicion(df['fecha_adquisicion'])
+        validas = np.isfinite(x) & np.isfinite(anios)
+        ubicacion = pd.Categorical(pd.Series(df['ubicacion']).astype(str)[validas])
+        tipo = pd.Categorical(pd.Series(df['tipo_inmueble']).astype(str)[validas])
+        x, anios = x[validas], anios[validas].astype(np.int64)
+        if not len(x):
+            raise ValueError("No hay inmuebles con valor, superficie y fecha de adquisición válidos")
+
+        nu, nt = len(ubicacion.categories), len(tipo.categories)
+        anio_min = int(anios.min())
+        na = int(anios.max()) - anio_min + 1
+        cu, ct, ca = ubicacion.codes.astype(np.int64), tipo.codes.astype(np.int64), anios - anio_min
+
+        # Estadísticos de cada nivel, con ejes de tamaño 1 donde el nivel agrupa todo
+        niveles = [
+            _mediana_mad((cu * nt + ct) * na + ca, x, nu * nt * na),
+            _mediana_mad(cu * nt + ct, x, nu * nt),
+            _mediana_mad(ct, x, nt),
+            _mediana_mad(np.zeros(len(x), dtype=np.int64), x, 1),
+        ]
+        formas = [(nu, nt, na), (nu, nt, 1), (1, nt, 1), (1, 1, 1)]
+        forma = (nu + 1, nt + 1, na + 1)
+
+        # Del nivel más general al más específico: cada nivel pisa donde tiene datos suficientes
+        mediana, escala, n, nivel = (np.empty(forma), np.empty(forma), np.empty(forma, np.int64),
+                                     np.empty(forma, np.int8))
+        indices = [np.s_[:nu, :nt, :na], np.s_[:nu, :nt, :], np.s_[:, :nt, :], np.s_[:, :, :]]
+        for numero in (NIVEL_GLOBAL, NIVEL_TIPO, NIVEL_UBICACION_TIPO, NIVEL_CELDA):
+            n_nivel, mediana_nivel, mad_nivel = (np.reshape(a, formas[numero]) for a in niveles[numero])
+            suficiente = np.ones(forma, dtype=bool)[indices[numero]] & (n_nivel >= min_celda)
+            if numero == NIVEL_GLOBAL:
+                suficiente[:] = True
+            destino = indices[numero]
+            for arreglo, valores in ((mediana, mediana_nivel), (escala, mad_nivel / FACTOR_MAD),
+                                     (n, n_nivel), (nivel, numero)):
+                arreglo[destino] = np.where(suficiente, valores, arreglo[destino])
+        return cls(ubicacion.categories, tipo.categories, anio_min, mediana, escala, n, nivel)
+
+    # -----------------------------------------------------------------
+    # Búsqueda
+    # -----------------------------------------------------------------
+
+    def _celdas(self, ubicacion, tipo, anio):
+        """Índices (u, t, a) de cada inmueble; lo desconocido va a la última posición de su eje."""
+        # get_indexer devuelve -1 para lo que no está en el índice (Categorical dejará de aceptarlo)
+        cu = pd.Index(self.ubicaciones).get_indexer(pd.Series(ubicacion).astype(str)).astype(np.int64)
+        ct = pd.Index(self.tipos).get_indexer(pd.Series(tipo).astype(str)).astype(np.int64)
+        ca = np.asarray(anio, dtype=float) - self.anio_min
+        ca = np.where((ca >= 0) & (ca < self.n_anios), ca, self.n_anios).astype(np.int64)
+        return (np.where(cu >= 0, cu, len(self.ubicaciones)), np.where(ct >= 0, ct, len(self.tipos)), ca)
+
+    def evaluar(self, df, umbral=UMBRAL_PRECIO_M2):
+        """Precio/m², referencia de su celda, puntaje robusto y marca -1/1 de cada inmueble (DataFrame)."""
+        anios = anio_adquisicion(df['fecha_adquisicion'])
+        celdas = self._celdas(df['ubicacion'], df['tipo_inmueble'], anios)
+        precios = precio_m2(df['valor_adquisicion'], df['superficie_m2'])
+        mediana, escala = self.mediana[celdas].astype(float), self.escala[celdas].astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            puntaje = (np.log(precios) - mediana) / escala
+        return pd.DataFrame({
+            'precio_m2': precios,
+            'precio_m2_referencia': np.exp(mediana),
+            'precio_m2_zscore': puntaje,
+            'is_anomaly_precio_m2': np.where(np.abs(puntaje) > umbral, -1, 1),
+            'nivel_referencia_m2': self.nivel[celdas],
+        }, index=df.index)
+
+    def evaluar_uno(self, ubicacion, tipo_inmueble, anio_adquisicion, valor_adquisicion, superficie_m2,
+                    umbral=UMBRAL_PRECIO_M2):
+        """Igual que evaluar para un solo inmueble, sin pandas (para altas individuales).
+
+        Un año faltante o inválido (None, NaN, NaT) va a la posición "desconocido", como en evaluar.
+        """
+        try:
+            anio = float(anio_adquisicion) - self.anio_min
+        except (TypeError, ValueError):
+            anio = float('nan')
+        celda = (self._codigo_ubicacion.get(str(ubicacion), len(self.ubicaciones)),
+                 self._codigo_tipo.get(str(tipo_inmueble), len(self.tipos)),
+                 int(anio) if 0 <= anio < self.n_anios else self.n_anios)
+        mediana, escala = float(self.mediana[celda]), float(self.escala[celda])
+        precio = valor_adquisicion / superficie_m2 if superficie_m2 and superficie_m2 > 0 else float('nan')
+        if precio > 0 and escala > 0:
+            puntaje = float((np.log(precio) - mediana) / escala)
+        elif precio > 0:
+            puntaje = 0.0 if np.log(precio) == mediana else float('inf')
+        else:
+            puntaje = float('nan')
+        return {'precio_m2': precio, 'precio_m2_referencia': float(np.exp(mediana)), 'precio_m2_zscore': puntaje,
+                'is_anomaly_precio_m2': -1 if abs(puntaje) > umbral else 1,
+                'nivel_referencia_m2': int(self.nivel[celda])}
+
+    def tabla(self):
+        """Referencias de las celdas conocidas (DataFrame con una fila por ubicación × tipo × año)."""
+        nu, nt, na = len(self.ubicaciones), len(self.tipos), self.n_anios
+        u, t, a = (eje.ravel() for eje in np.meshgrid(np.arange(nu), np.arange(nt), np.arange(na), indexing='ij'))
+        return pd.DataFrame({
+            'ubicacion': np.asarray(self.ubicaciones, dtype=object)[u],
+            'tipo_inmueble': np.asarray(self.tipos, dtype=object)[t],
+            'anio_adquisicion': self.anio_min + a,
+            'precio_m2_mediana': np.exp(self.mediana[u, t, a].astype(float)),
+            'escala_log': self.escala[u, t, a],
+            'inmuebles': self.n[u, t, a],
+            'nivel': self.nivel[u, t, a],
+        })
+
+    # -----------------------------------------------------------------
+    # Persistencia
+    # -----------------------------------------------------------------
+
+    def guardar(self, ruta):
+        """Guarda el índice como .npz (arreglos compactos, sin pickle)."""
+        np.savez_compressed(ruta, ubicaciones=np.asarray(self.ubicaciones, dtype=str),
+                            tipos=np.asarray(self.tipos, dtype=str), anio_min=self.anio_min,
+                            mediana=self.mediana, escala=self.escala, n=self.n, nivel=self.nivel)
+        return ruta
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta, allow_pickle=False) as datos:
+            return cls(datos['ubicaciones'].tolist(), datos['tipos'].tolist(), int(datos['anio_min']),
+                       datos['mediana'], datos['escala'], datos['n'], datos['nivel'])
+
+
+# =================================================================
+# LÍNEA DE COMANDOS
+# =================================================================
+
+def main(argv=None):
+    from ingesta_activos import cargar_activos
+
+    parser = argparse.ArgumentParser(description="Índice de precio por m² de inmuebles (ubicación × tipo × año)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    construir = sub.add_parser('construir', help="Construye el índice a partir de una exportación de inmuebles")
+    construir.add_argument('archivo')
+    construir.add_argument('-o', '--salida', required=True, help="Archivo .npz del índice")
+    construir.add_argument('--min-celda', type=int, default=MIN_CELDA)
+    evaluar = sub.add_parser('evaluar', help="Marca los inmuebles con precio/m² atípico según un índice")
+    evaluar.add_argument('indice')
+    evaluar.add_argument('archivo')
+    evaluar.add_argument('-o', '--salida', default=None, help="Parquet con las columnas de precio/m²")
+    evaluar.add_argument('--umbral', type=float, default=UMBRAL_PRECIO_M2)
+    args = parser.parse_args(argv)
+
+    df = cargar_activos(args.archivo, 'inmuebles')
+    if args.comando == 'construir':
+        indice = IndicePrecioM2.construir(df, args.min_celda)
+        indice.guardar(args.salida)
+        celdas = indice.tabla()
+        print(f"✅ {len(df)} inmuebles, {len(celdas)} celdas "
+              f"({int((celdas['nivel'] == NIVEL_CELDA).sum())} con referencia propia) -> {args.salida}")
+        return 0
+
+    evaluados = IndicePrecioM2.cargar(args.indice).evaluar(df, args.umbral)
+    atipicos = int((evaluados['is_anomaly_precio_m2'] == -1).sum())
+    print(f"{atipicos} de {len(df)} inmuebles con precio/m² atípico")
+    if args.salida:
+        pd.concat([df, evaluados], axis=1).to_parquet(args.salida, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
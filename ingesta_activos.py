@@ -0,0 +1,240 @@
+# =================================================================
+# INGESTA DE DATOS REALES (ERP) CON CACHÉ COLUMNAR EN PARQUET
+# =================================================================
+# Lee exportaciones del ERP (CSV/Excel) para cada clase de activo, valida las
+# columnas que esperan las funciones auditar_* y guarda una copia tipada en
+# Parquet identificada por el hash del archivo de origen. Las ejecuciones
+# siguientes leen el Parquet con memory-map en lugar de volver a parsear el CSV.
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+DIRECTORIO_CACHE = "data/cache_ingesta"
+
+# Se incrementa cuando cambian los esquemas o la conversión de tipos, para
+# invalidar los Parquet generados con la versión anterior.
+VERSION_ESQUEMA = 3
+
+# Columnas por clase de activo -> tipo lógico ('texto', 'fecha', 'numero', 'entero')
+ESQUEMAS = {
+    'maquinarias': {
+        'id_equipo': 'texto',
+        'tipo_equipo': 'texto',
+        'descripcion': 'texto',
+        'ubicacion': 'texto',
+        'estado': 'texto',
+        'fecha_adquisicion': 'fecha',
+        'valor_adquisicion': 'numero',
+        'vida_util_anios': 'entero',
+        'fecha_fin_vida_util': 'fecha',
+        'empresa': 'texto',
+        # Para depreciar por unidades producidas (depreciacion_activos)
+        'unidades_totales': 'numero',
+        'unidades_mensuales': 'numero',
+    },
+    'inmuebles': {
+        'id_inmueble': 'texto',
+        'tipo_inmueble': 'texto',
+        'direccion': 'texto',
+        'ubicacion': 'texto',
+        'estado': 'texto',
+        'fecha_adquisicion': 'fecha',
+        'valor_adquisicion': 'numero',
+        'superficie_m2': 'numero',
+        'fecha_fin_vida_util': 'fecha',
+        'empresa': 'texto',
+    },
+    'intangibles': {
+        'activo_id': 'texto',
+        'empresa_id': 'entero',
+        'tipo_activo_intangible': 'texto',
+        'fecha_adquisicion': 'fecha',
+        'costo_adquisicion': 'numero',
+        'vida_util_anios': 'entero',
+        'amortizacion_acumulada_simulada': 'numero',
+        'valor_neto_contable_simulado': 'numero',
+        'estado_activo': 'texto',
+        'nombre_empresa_propietaria': 'texto',
+        'cuit_empresa_propietaria': 'texto',
+    },
+    'otros_activos': {
+        'id_activo': 'texto',
+        'tipo_activo': 'texto',
+        'monto': 'numero',
+        'moneda': 'texto',
+        'fecha_registro': 'fecha',
+        'descripcion': 'texto',
+        'empresa': 'texto',
+    },
+}
+
+# Columnas que pueden faltar en la exportación (auditar_* las completa; sin 'empresa'
+# la consolidación asigna las filas a la entidad que se audita)
+COLUMNAS_OPCIONALES = {
+    'maquinarias': {'empresa', 'unidades_totales', 'unidades_mensuales'},
+    'inmuebles': {'fecha_fin_vida_util', 'empresa'},
+    'intangibles': set(),
+    'otros_activos': {'empresa'},
+}
+
+
+class ErrorValidacionDatos(ValueError):
+    """La exportación no tiene las columnas que requiere la auditoría."""
+
+
+# =================================================================
+# LECTORES POR FORMATO
+# =================================================================
+
+def _leer_csv(ruta, separador=',', **kwargs):
+    """Lee un CSV con el parser multihilo de pyarrow."""
+    return pd.read_csv(ruta, sep=separador, engine='pyarrow', **kwargs)
+
+
+def _leer_excel(ruta, hoja=0, **kwargs):
+    """Lee una hoja de un libro de Excel."""
+    return pd.read_excel(ruta, sheet_name=hoja, **kwargs)
+
+
+# Extensión -> función lectora. Para agregar un formato basta con registrarlo aquí.
+LECTORES = {
+    '.csv': _leer_csv,
+    '.txt': _leer_csv,
+    '.xlsx': _leer_excel,
+    '.xls': _leer_excel,
+}
+
+
+def registrar_lector(extension, funcion):
+    """Registra una función lectora para una extensión de archivo."""
+    LECTORES[extension.lower()] = funcion
+
+
+# =================================================================
+# VALIDACIÓN Y TIPADO
+# =================================================================
+
+def validar_columnas(df, clase):
+    """Verifica que df tenga las columnas requeridas por la clase de activo."""
+    if clase not in ESQUEMAS:
+        raise ErrorValidacionDatos(f"Clase de activo desconocida: {clase}")
+    requeridas = set(ESQUEMAS[clase]) - COLUMNAS_OPCIONALES[clase]
+    faltantes = sorted(requeridas - set(df.columns))
+    if faltantes:
+        raise ErrorValidacionDatos(
+            f"Faltan columnas para '{clase}': {', '.join(faltantes)}")
+
+
+def tipar_columnas(df, clase):
+    """Convierte las columnas del esquema a sus tipos y descarta las no reconocidas."""
+    esquema = ESQUEMAS[clase]
+    columnas = [col for col in esquema if col in df.columns]
+    df = df[columnas].copy()
+    for col in columnas:
+        tipo = esquema[col]
+        if tipo == 'fecha':
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        elif tipo == 'numero':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        elif tipo == 'entero':
+            valores = pd.to_numeric(df[col], errors='coerce')
+            df[col] = valores.astype('int64') if valores.notna().all() else valores.astype('float64')
+        else:
+            df[col] = df[col].astype('string')
+    return df
+
+
+# =================================================================
+# CACHÉ POR HASH DE ARCHIVO
+# =================================================================
+
+def hash_archivo(ruta, tamano_bloque=1 << 20):
+    """SHA-256 del contenido de un archivo, leído por bloques."""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(tamano_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _hash_con_indice(ruta, directorio_cache):
+    """Hash del archivo, reutilizando el último cálculo si tamaño y mtime no cambiaron."""
+    ruta_indice = os.path.join(directorio_cache, 'indice_hashes.json')
+    try:
+        with open(ruta_indice, encoding='utf-8') as f:
+            indice = json.load(f)
+    except (OSError, ValueError):
+        indice = {}
+
+    estado = os.stat(ruta)
+    clave = os.path.abspath(ruta)
+    firma = [estado.st_size, estado.st_mtime_ns]
+    registro = indice.get(clave)
+    if registro and registro['firma'] == firma:
+        return registro['hash']
+
+    digest = hash_archivo(ruta)
+    indice[clave] = {'firma': firma, 'hash': digest}
+    tmp = f"{ruta_indice}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(indice, f)
+    os.replace(tmp, ruta_indice)
+    return digest
+
+
+def ruta_cache(ruta, clase, directorio_cache=DIRECTORIO_CACHE, mapeo_columnas=None, **opciones_lector):
+    """Ruta del Parquet en caché correspondiente a un archivo de origen, su mapeo de columnas
+    y las opciones del lector (hoja, separador, codificación: cambian lo que se lee)."""
+    os.makedirs(directorio_cache, exist_ok=True)
+    digest = _hash_con_indice(ruta, directorio_cache)
+    if mapeo_columnas:
+        mapeo = json.dumps(sorted(mapeo_columnas.items()), ensure_ascii=False).encode('utf-8')
+        digest = hashlib.sha256(digest.encode('ascii') + mapeo).hexdigest()
+    if opciones_lector:
+        opciones = json.dumps(sorted(opciones_lector.items()), ensure_ascii=False, default=str).encode('utf-8')
+        digest = hashlib.sha256(digest.encode('ascii') + b'|' + opciones).hexdigest()
+    return os.path.join(directorio_cache, f"{clase}_v{VERSION_ESQUEMA}_{digest[:24]}.parquet")
+
+
+def leer_parquet(ruta):
+    """Lee un Parquet con memory-map (sin copiar el archivo completo a un búfer)."""
+    import pyarrow.parquet as pq
+
+    return pq.read_table(ruta, memory_map=True).to_pandas()
+
+
+def cargar_activos(ruta, clase, directorio_cache=DIRECTORIO_CACHE, mapeo_columnas=None, **opciones_lector):
+    """Carga una exportación del ERP para una clase de activo, usando la caché Parquet si existe.
+
+    mapeo_columnas permite renombrar encabezados del ERP a los nombres del esquema.
+    Las opciones adicionales se pasan a la función lectora del formato.
+    """
+    if clase not in ESQUEMAS:
+        raise ErrorValidacionDatos(f"Clase de activo desconocida: {clase}")
+
+    destino = ruta_cache(ruta, clase, directorio_cache, mapeo_columnas, **opciones_lector)
+    if os.path.exists(destino):
+        return leer_parquet(destino)
+
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.parquet':
+        df = leer_parquet(ruta)
+    elif extension in LECTORES:
+        df = LECTORES[extension](ruta, **opciones_lector)
+    else:
+        raise ErrorValidacionDatos(f"Formato de archivo no soportado: {extension}")
+
+    df.columns = [str(col).strip() for col in df.columns]
+    if mapeo_columnas:
+        df = df.rename(columns=mapeo_columnas)
+    validar_columnas(df, clase)
+    df = tipar_columnas(df, clase)
+
+    # Escritura atómica: una ejecución concurrente nunca ve un Parquet a medio escribir
+    tmp = f"{destino}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, destino)
+    # Se devuelve lo leído del Parquet para que la primera carga y las siguientes tengan los mismos tipos
+    return leer_parquet(destino)
@@ -0,0 +1,74 @@
+# =================================================================
+# REGLAS DE AUDITORÍA VECTORIZADAS
+# =================================================================
+# Reemplazan los df.apply(lambda row: ...) fila por fila de las funciones
+# auditar_*. Cada regla opera sobre columnas completas y devuelve los mismos
+# rótulos y valores que la versión por fila.
+import numpy as np
+import pandas as pd
+
+ALERTA_Z_E_IA = 'Z-score alto y Anomalía IA'
+ALERTA_Z = 'Z-score alto'
+ALERTA_IA = 'Anomalía IA'
+SIN_ALERTA = 'Sin alerta'
+
+
+def clasificar_alerta_combinada(zscores, is_anomaly_ia, umbral_z):
+    """Rótulo de alerta combinada (Z-score / IA) para cada maquinaria."""
+    z_alto = np.abs(np.asarray(zscores, dtype=float)) > umbral_z
+    anomalia_ia = np.asarray(is_anomaly_ia) == -1
+    # np.select respeta el orden de las condiciones, igual que los if/else anidados
+    return np.select(
+        [z_alto & anomalia_ia, z_alto, anomalia_ia],
+        [ALERTA_Z_E_IA, ALERTA_Z, ALERTA_IA],
+        default=SIN_ALERTA,
+    )
+
+
+RESULTADO_Z_E_IA = 'Anomalía Z-score e IA'
+RESULTADO_Z = 'Anomalía Z-score'
+RESULTADO_IA = 'Anomalía IA'
+RESULTADO_NORMAL = 'Normal'
+
+
+def clasificar_resultado(is_anomaly_zscore, is_anomaly_ia):
+    """Rótulo resultado_auditoria (Z-score / IA) para cada inmueble."""
+    anomalia_z = np.asarray(is_anomaly_zscore) == -1
+    anomalia_ia = np.asarray(is_anomaly_ia) == -1
+    return np.select(
+        [anomalia_z & anomalia_ia, anomalia_z, anomalia_ia],
+        [RESULTADO_Z_E_IA, RESULTADO_Z, RESULTADO_IA],
+        default=RESULTADO_NORMAL,
+    )
+
+
+def sumar_anios(fechas, anios):
+    """Suma una cantidad entera de años a cada fecha, como fecha + DateOffset(years=n).
+
+    Igual que DateOffset, un 29 de febrero que cae en un año no bisiesto pasa
+    al 28 de febrero; la hora del día se conserva. Sólo aritmética de
+    datetime64 (sin pandas), así que sirve también para un registro suelto.
+    """
+    if not (isinstance(fechas, np.ndarray) and fechas.dtype.kind == 'M'):
+        fechas = pd.to_datetime(fechas)
+    fechas = np.asarray(fechas, dtype='datetime64[ns]').ravel()
+    anios = np.broadcast_to(np.asarray(anios, dtype=np.int64), fechas.shape)
+
+    mes = fechas.astype('datetime64[M]')
+    dia = fechas.astype('datetime64[D]')
+    mes_destino = mes + anios * 12
+    dias_mes_destino = (mes_destino + 1).astype('datetime64[D]') - mes_destino.astype('datetime64[D]')
+    desplazamiento = np.minimum(dia - mes.astype('datetime64[D]'), dias_mes_destino - np.timedelta64(1, 'D'))
+    resultado = mes_destino.astype('datetime64[D]') + desplazamiento + (fechas - dia)
+    return np.where(np.isnat(fechas), np.datetime64('NaT', 'ns'), resultado.astype('datetime64[ns]'))
+
+
+def minimo_por_fila(a, b):
+    """Equivalente vectorizado de min(a, b) de Python aplicado fila por fila.
+
+    min(a, b) devuelve a salvo que b < a, por lo que un NaN en b no se propaga
+    (a diferencia de np.minimum).
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    return np.where(b < a, b, a)
@@ -0,0 +1,377 @@
+# =================================================================
+# SERVICIO DE PUNTUACIÓN DE ANOMALÍAS (HTTP/JSON, ASYNCIO)
+# =================================================================
+# Puntúa maquinarias e inmuebles apenas se registran en el ERP, sin Streamlit.
+# Al arrancar carga una sola vez, por clase, el IsolationForest y la media y
+# el desvío de valor_adquisicion de la última auditoría incremental
+# (data/estado_auditoria) y compila el bosque a arreglos de NumPy
+# (BosqueCompilado). Los pedidos que llegan mientras se puntúa un lote se
+# juntan en el siguiente, así que bajo carga concurrente cada lote se puntúa
+# con una sola pasada vectorizada.
+#
+#     python servicio_puntuacion.py --puerto 8600
+#     curl -X POST localhost:8600/puntuar/maquinarias -d '{"id_equipo": "EQ-1", ...}'
+#     curl localhost:8600/salud
+#
+# Un objeto JSON devuelve un objeto; una lista de registros, una lista en el
+# mismo orden. Sin estado guardado, --simulados N ajusta el modelo sobre N
+# registros simulados (útil para probar el servicio).
+import argparse
+import asyncio
+import json
+import sys
+import time
+import warnings
+from collections import deque
+from http import HTTPStatus
+
+import numpy as np
+import pandas as pd
+
+from auditoria_activos import (FEATURES_MAQUINARIAS, FEATURES_INMUEBLES, UMBRAL_Z_MAQUINARIAS,
+                               UMBRAL_ZSCORE_INMUEBLES, FECHA_ADQUISICION_FALTANTE, SEMILLA_VIDA_UTIL,
+                               VIDA_UTIL_INMUEBLES, VIDA_UTIL_FECHA_VACIA, marcar_zscore, resolver_fecha_referencia, vida_util_por_id)
+from auditoria_incremental import CLAVES_PRIMARIAS, DIRECTORIO_ESTADO, cargar_estado, auditar_incremental
+from modelos_anomalias import RegistroModelos, BosqueCompilado, DIRECTORIO_MODELOS
+from reglas_auditoria import clasificar_alerta_combinada, clasificar_resultado, sumar_anios
+
+CLASES_SERVICIO = ('maquinarias', 'inmuebles')
+FEATURES = {'maquinarias': FEATURES_MAQUINARIAS, 'inmuebles': FEATURES_INMUEBLES}
+# Campos que debe traer cada registro (los demás del esquema son opcionales)
+CAMPOS_REQUERIDOS = ('valor_adquisicion', 'fecha_adquisicion')
+
+# Filas máximas por lote puntuado (los pedidos que no entran pasan al siguiente)
+MAX_FILAS_LOTE = 512
+MAX_CUERPO = 8 << 20
+# Cantidad de latencias recientes para los percentiles de /salud
+VENTANA_LATENCIAS = 10_000
+
+
+class ErrorPedido(ValueError):
+    """Pedido con JSON inválido o registros sin los campos requeridos."""
+
+
+# =================================================================
+# PUNTUACIÓN VECTORIZADA DE UN LOTE
+# =================================================================
+
+def _fechas(registros, campo):
+    """Fechas ISO 8601 de un campo (NaT si falta); NumPy las lee mucho más rápido que pandas,
+    que queda para los formatos que NumPy rechaza (zona horaria, texto inválido)."""
+    valores = [registro.get(campo) for registro in registros]
+    try:
+        with warnings.catch_warnings():
+            # "...Z" se lee como UTC, igual que en pandas; NumPy avisa en cada llamada
+            warnings.simplefilter('ignore', UserWarning)
+            return np.array(valores, dtype='datetime64[ns]')
+    except ValueError:
+        return pd.to_datetime(valores, format='ISO8601', errors='coerce', utc=True).tz_localize(None).to_numpy()
+
+
+def _anios_entre(desde, hasta):
+    """Años entre dos arreglos de fechas con días completos, como calcular_vida_util."""
+    return np.round(np.floor((hasta - desde) / np.timedelta64(1, 'D')) / 365.25, 2)
+
+
+def features_registros(clase, registros, fecha_referencia, semilla=SEMILLA_VIDA_UTIL):
+    """Features de IsolationForest (columnas de FEATURES[clase]) de una lista de registros, sin pandas.
+
+    Mismas reglas que preparar_* + features_* de la auditoría, en NumPy para
+    que un registro suelto se puntúe en microsegundos. Un registro sin el campo
+    fecha_fin_vida_util se prepara como en una exportación sin esa columna (vida
+    útil simulada) y uno con el campo vacío o inválido, como una celda vacía
+    (75 años). Los faltantes quedan en NaN.
+    """
+    referencia = np.datetime64(pd.Timestamp(fecha_referencia), 'ns')
+    adquisicion = _fechas(registros, 'fecha_adquisicion')
+    fin = _fechas(registros, 'fecha_fin_vida_util')
+    if clase == 'inmuebles':
+        adquisicion = np.where(np.isnat(adquisicion), np.datetime64(FECHA_ADQUISICION_FALTANTE, 'ns'), adquisicion)
+        con_campo = np.array(['fecha_fin_vida_util' in registro for registro in registros], dtype=bool)
+        sin_fin = np.isnat(fin)
+        if sin_fin.any():
+            fin = fin.copy()
+            vacias = np.flatnonzero(sin_fin & con_campo)
+            fin[vacias] = sumar_anios(adquisicion[vacias], VIDA_UTIL_FECHA_VACIA)
+            sin_campo = np.flatnonzero(sin_fin & ~con_campo)
+            if len(sin_campo) and any('id_inmueble' in registro for registro in registros):
+                anios = vida_util_por_id([registros[i].get('id_inmueble') for i in sin_campo], semilla)
+            else:
+                anios = np.random.default_rng(semilla).integers(*VIDA_UTIL_INMUEBLES, size=len(sin_campo))
+            fin[sin_campo] = sumar_anios(adquisicion[sin_campo], anios)
+    columnas = {
+        'valor_adquisicion': np.array([registro.get('valor_adquisicion') for registro in registros], dtype=float),
+        'edad_anios': _anios_entre(adquisicion, referencia),
+        'vida_util_restante_anios': np.maximum(_anios_entre(referencia, fin), 0),
+    }
+    if clase == 'inmuebles':
+        columnas['superficie_m2'] = np.array([registro.get('superficie_m2') for registro in registros],
+                                             dtype=float)
+    X = np.column_stack([columnas[columna] for columna in FEATURES[clase]])
+    X[~np.isfinite(X)] = np.nan
+    return X
+
+
+class PuntuadorClase:
+    """Modelo compilado, estadísticos de Z-score y medianas de las features de una clase."""
+
+    def __init__(self, clase, modelo, estadisticos, medianas, fecha_referencia=None,
+                 umbral_z=UMBRAL_Z_MAQUINARIAS, umbral_zscore=UMBRAL_ZSCORE_INMUEBLES):
+        self.clase = clase
+        self.bosque = BosqueCompilado(modelo)
+        self.estadisticos = estadisticos
+        self.medianas = np.asarray(medianas, dtype=float)
+        self.fecha_referencia = fecha_referencia
+        self.umbral_z = umbral_z
+        self.umbral_zscore = umbral_zscore
+
+    @classmethod
+    def desde_estado(cls, clase, directorio_estado=DIRECTORIO_ESTADO, directorio_modelos=DIRECTORIO_MODELOS,
+                     **opciones):
+        """Puntuador de la última auditoría incremental guardada (None si no hay estado o modelo)."""
+        estado = cargar_estado(clase, directorio_estado)
+        if estado is None or estado.clave_modelo is None:
+            return None
+        modelo = RegistroModelos(directorio_modelos).cargar(estado.clave_modelo)
+        if modelo is None:
+            return None
+        return cls(clase, modelo, estado.estadisticos, estado.df[FEATURES[clase]].median(), **opciones)
+
+    @classmethod
+    def desde_datos(cls, clase, df, directorio_modelos=DIRECTORIO_MODELOS, **opciones):
+        """Puntuador ajustado sobre un DataFrame de la clase (auditoría completa)."""
+        registro = RegistroModelos(directorio_modelos)
+        auditado, estado, _ = auditar_incremental(clase, df, None, opciones.get('fecha_referencia'),
+                                                  registro_modelos=registro)
+        return cls(clase, registro.cargar(estado.clave_modelo), estado.estadisticos,
+                   auditado[FEATURES[clase]].median(), **opciones)
+
+    def features(self, registros, fecha_referencia):
+        """Matriz de features (columnas de FEATURES[clase]) con los faltantes en la mediana."""
+        X = features_registros(self.clase, registros, fecha_referencia)
+        return np.where(np.isnan(X), self.medianas, X)
+
+    def puntuar(self, registros):
+        """Rótulos de auditoría de una lista de registros (dicts), en el mismo orden."""
+        fecha_referencia = resolver_fecha_referencia(self.fecha_referencia)
+        X = self.features(registros, fecha_referencia)
+        zscores = self.estadisticos.zscore(X[:, 0])
+        is_anomaly_ia = self.bosque.predecir(X)
+        clave = CLAVES_PRIMARIAS[self.clase]
+        ids = [registro.get(clave) for registro in registros]
+        zscores_json = [None if np.isnan(z) else round(z, 4) for z in zscores.tolist()]
+        if self.clase == 'maquinarias':
+            alertas = clasificar_alerta_combinada(zscores, is_anomaly_ia, self.umbral_z)
+            return [{clave: id_, 'valor_adquisicion_zscore': z, 'is_anomaly_ia': ia, 'alerta_combinada': alerta}
+                    for id_, z, ia, alerta in zip(ids, zscores_json, is_anomaly_ia.tolist(), alertas.tolist())]
+        is_anomaly_zscore = marcar_zscore(zscores, self.umbral_zscore)
+        resultados = clasificar_resultado(is_anomaly_zscore, is_anomaly_ia)
+        return [{clave: id_, 'valor_adquisicion_zscore': z, 'is_anomaly_zscore': iz, 'is_anomaly_ia': ia,
+                 'resultado_auditoria': resultado}
+                for id_, z, iz, ia, resultado in zip(ids, zscores_json, is_anomaly_zscore.tolist(),
+                                                     is_anomaly_ia.tolist(), resultados.tolist())]
+
+
+def validar_registros(cuerpo):
+    """Lista de registros de un cuerpo JSON y si vino un solo objeto."""
+    try:
+        datos = json.loads(cuerpo)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ErrorPedido(f"JSON inválido: {e}")
+    unico = isinstance(datos, dict)
+    registros = [datos] if unico else datos
+    if not isinstance(registros, list) or not registros:
+        raise ErrorPedido("Se espera un objeto o una lista no vacía de objetos")
+    for posicion, registro in enumerate(registros):
+        if not isinstance(registro, dict):
+            raise ErrorPedido(f"El registro {posicion} no es un objeto")
+        faltantes = [campo for campo in CAMPOS_REQUERIDOS if registro.get(campo) in (None, '')]
+        if faltantes:
+            raise ErrorPedido(f"Al registro {posicion} le faltan campos: {', '.join(faltantes)}")
+        try:
+            registro['valor_adquisicion'] = float(registro['valor_adquisicion'])
+        except (TypeError, ValueError):
+            raise ErrorPedido(f"valor_adquisicion del registro {posicion} no es un número")
+    return registros, unico
+
+
+# =================================================================
+# LOTES Y SERVIDOR HTTP
+# =================================================================
+
+class Loteador:
+    """Junta los pedidos de una clase que esperan mientras se puntúa el lote anterior."""
+
+    def __init__(self, puntuador, max_filas=MAX_FILAS_LOTE):
+        self.puntuador = puntuador
+        self.max_filas = max_filas
+        self.lotes = 0
+        self.filas = 0
+        self._cola = asyncio.Queue()
+        self._tarea = None
+
+    def iniciar(self):
+        self._tarea = asyncio.get_running_loop().create_task(self._procesar())
+
+    async def puntuar(self, registros):
+        futuro = asyncio.get_running_loop().create_future()
+        await self._cola.put((registros, futuro))
+        return await futuro
+
+    async def _procesar(self):
+        while True:
+            pedidos = [await self._cola.get()]
+            # Cede el turno una vez para que los pedidos ya recibidos entren en este lote
+            await asyncio.sleep(0)
+            filas = len(pedidos[0][0])
+            while filas < self.max_filas and not self._cola.empty():
+                pedidos.append(self._cola.get_nowait())
+                filas += len(pedidos[-1][0])
+            registros = [registro for pedido, _ in pedidos for registro in pedido]
+            try:
+                resultados = self.puntuador.puntuar(registros)
+            except Exception as e:
+                for _, futuro in pedidos:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            self.lotes += 1
+            self.filas += len(registros)
+            inicio = 0
+            for pedido, futuro in pedidos:
+                # Un pedido cuyo cliente se desconectó ya está cancelado
+                if not futuro.done():
+                    futuro.set_result(resultados[inicio:inicio + len(pedido)])
+                inicio += len(pedido)
+
+
+class ServicioPuntuacion:
+    """Servidor HTTP/1.1 mínimo (keep-alive) sobre asyncio con un Loteador por clase."""
+
+    def __init__(self, puntuadores, max_filas=MAX_FILAS_LOTE):
+        self.loteadores = {clase: Loteador(puntuador, max_filas) for clase, puntuador in puntuadores.items()}
+        self.latencias = deque(maxlen=VENTANA_LATENCIAS)
+        self.pedidos = 0
+        self.inicio = time.time()
+
+    async def iniciar(self, host='127.0.0.1', puerto=8600):
+        for loteador in self.loteadores.values():
+            loteador.iniciar()
+        return await asyncio.start_server(self._atender, host, puerto)
+
+    def salud(self):
+        latencias = np.fromiter(self.latencias, dtype=float)
+        return {
+            'clases': list(self.loteadores),
+            'pedidos': self.pedidos,
+            'lotes': {clase: loteador.lotes for clase, loteador in self.loteadores.items()},
+            'filas': {clase: loteador.filas for clase, loteador in self.loteadores.items()},
+            'latencia_p50_ms': round(float(np.percentile(latencias, 50)), 3) if len(latencias) else None,
+            'latencia_p99_ms': round(float(np.percentile(latencias, 99)), 3) if len(latencias) else None,
+            'activo_s': round(time.time() - self.inicio, 1),
+        }
+
+    async def responder(self, metodo, ruta, cuerpo):
+        """(estado HTTP, respuesta JSON) de un pedido."""
+        ruta = ruta.split('?', 1)[0].rstrip('/')
+        if ruta == '/salud':
+            return (HTTPStatus.OK, self.salud()) if metodo == 'GET' else (HTTPStatus.METHOD_NOT_ALLOWED, None)
+        partes = ruta.split('/')
+        if len(partes) != 3 or partes[1] != 'puntuar':
+            return HTTPStatus.NOT_FOUND, {'error': f"Ruta desconocida: {ruta}"}
+        if metodo != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': "Use POST"}
+        loteador = self.loteadores.get(partes[2])
+        if loteador is None:
+            return HTTPStatus.NOT_FOUND, {'error': f"Clase sin modelo en el servicio: {partes[2]}"}
+        try:
+            registros, unico = validar_registros(cuerpo)
+        except ErrorPedido as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        resultados = await loteador.puntuar(registros)
+        return HTTPStatus.OK, resultados[0] if unico else resultados
+
+    async def _atender(self, lector, escritor):
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea.strip():
+                    break
+                inicio = time.perf_counter()
+                metodo, ruta, _ = linea.decode('latin-1').split(' ', 2)
+                encabezados = {}
+                while (linea := await lector.readline()) not in (b'\r\n', b'\n', b''):
+                    nombre, _, valor = linea.decode('latin-1').partition(':')
+                    encabezados[nombre.strip().lower()] = valor.strip()
+                largo = int(encabezados.get('content-length') or 0)
+                if largo > MAX_CUERPO:
+                    estado, respuesta = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "Cuerpo demasiado grande"}
+                else:
+                    try:
+                        estado, respuesta = await self.responder(metodo, ruta, await lector.readexactly(largo))
+                    except Exception as e:
+                        estado, respuesta = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+                datos = json.dumps(respuesta, ensure_ascii=False).encode('utf-8')
+                escritor.write(f"HTTP/1.1 {estado.value} {estado.phrase}\r\n"
+                               f"Content-Type: application/json; charset=utf-8\r\n"
+                               f"Content-Length: {len(datos)}\r\n\r\n".encode('latin-1') + datos)
+                await escritor.drain()
+                self.pedidos += 1
+                self.latencias.append((time.perf_counter() - inicio) * 1000)
+                if largo > MAX_CUERPO or encabezados.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+
+def cargar_puntuadores(clases=CLASES_SERVICIO, directorio_estado=DIRECTORIO_ESTADO, simulados=None,
+                       fecha_referencia=None):
+    """Puntuador por clase desde el estado guardado (o desde datos simulados, si se piden)."""
+    from generador_datos_activos import generar_datos
+
+    puntuadores = {}
+    for clase in clases:
+        puntuador = PuntuadorClase.desde_estado(clase, directorio_estado, fecha_referencia=fecha_referencia)
+        if puntuador is None and simulados:
+            datos = generar_datos(clase, simulados, compacto=False)
+            puntuador = PuntuadorClase.desde_datos(clase, datos, fecha_referencia=fecha_referencia)
+        if puntuador is not None:
+            puntuadores[clase] = puntuador
+    return puntuadores
+
+
+async def servir(puntuadores, host, puerto):
+    servidor = await ServicioPuntuacion(puntuadores).iniciar(host, puerto)
+    print(f"Puntuando {', '.join(puntuadores)} en http://{host}:{puerto}", flush=True)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de puntuación de anomalías")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8600)
+    parser.add_argument('--directorio-estado', default=DIRECTORIO_ESTADO,
+                        help="Estado de la auditoría incremental (modelo y estadísticos por clase)")
+    parser.add_argument('--simulados', type=int, metavar='N', default=None,
+                        help="Ajusta sobre N registros simulados las clases sin estado guardado")
+    parser.add_argument('--fecha-referencia', default=None, help="Fecha fija para las edades (por defecto, hoy)")
+    args = parser.parse_args(argv)
+
+    puntuadores = cargar_puntuadores(directorio_estado=args.directorio_estado, simulados=args.simulados,
+                                     fecha_referencia=args.fecha_referencia)
+    if not puntuadores:
+        print("❌ No hay modelos guardados: ejecute auditoria_cli.py --incremental o use --simulados N",
+              file=sys.stderr)
+        return 1
+    try:
+        asyncio.run(servir(puntuadores, args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
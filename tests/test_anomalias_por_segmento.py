@@ -0,0 +1,55 @@
+# =================================================================
+# UN MODELO DE IA POR SEGMENTO
+# =================================================================
+import numpy as np
+import pandas as pd
+
+from anomalias_por_segmento import MODELO_GLOBAL, detectar_por_segmento
+from auditoria_activos import detectar_anomalias_ia
+
+
+def _features(semilla=3):
+    """Dos segmentos grandes de escalas muy distintas y uno chico."""
+    rng = np.random.default_rng(semilla)
+    tamanos = {'Camión': 600, 'Torno CNC': 500, 'Grúa': 40}
+    escalas = {'Camión': 5_000_000.0, 'Torno CNC': 400_000.0, 'Grúa': 2_000_000.0}
+    segmentos = np.repeat(list(tamanos), list(tamanos.values()))
+    valor = np.concatenate([rng.normal(escalas[s], escalas[s] * 0.1, n) for s, n in tamanos.items()])
+    edad = rng.uniform(0, 20, len(valor))
+    features = pd.DataFrame({'valor_adquisicion': valor, 'edad_anios': edad,
+                             'vida_util_restante_anios': 25 - edad})
+    return features, pd.Series(segmentos, name='tipo_equipo')
+
+
+def test_cada_segmento_grande_usa_su_modelo_y_los_chicos_el_global():
+    features, segmentos = _features()
+    etiquetas, modelo_ia = detectar_por_segmento('maquinarias', features, segmentos, max_workers=1)
+
+    global_ = detectar_anomalias_ia('maquinarias', features)
+    for valor in ['Camión', 'Torno CNC']:
+        filas = (segmentos == valor).to_numpy()
+        assert (modelo_ia[filas] == valor).all()
+        np.testing.assert_array_equal(etiquetas[filas], detectar_anomalias_ia('maquinarias', features[filas]))
+    chicas = (segmentos == 'Grúa').to_numpy()
+    assert (modelo_ia[chicas] == MODELO_GLOBAL).all()
+    np.testing.assert_array_equal(etiquetas[chicas], global_[chicas])
+
+
+def test_pool_de_procesos_da_las_mismas_etiquetas():
+    features, segmentos = _features()
+    en_serie = detectar_por_segmento('maquinarias', features, segmentos, max_workers=1)
+    en_paralelo = detectar_por_segmento('maquinarias', features, segmentos, max_workers=2)
+    np.testing.assert_array_equal(en_serie[0], en_paralelo[0])
+    np.testing.assert_array_equal(en_serie[1], en_paralelo[1])
+
+
+def test_valor_normal_en_otro_tipo_se_marca_en_su_segmento():
+    features, segmentos = _features()
+    # Un torno con el precio de un camión: dentro de lo común para el modelo global
+    torno = int(np.flatnonzero(segmentos == 'Torno CNC')[0])
+    features.loc[torno, 'valor_adquisicion'] = 4_000_000.0
+    features.loc[torno, ['edad_anios', 'vida_util_restante_anios']] = [10.0, 15.0]
+
+    etiquetas, _ = detectar_por_segmento('maquinarias', features, segmentos, max_workers=1)
+    assert etiquetas[torno] == -1
+    assert detectar_anomalias_ia('maquinarias', features)[torno] == 1
@@ -0,0 +1,32 @@
+# =================================================================
+# LÍNEA DE COMANDOS EN MODO POR LOTES
+# =================================================================
+import json
+
+from auditoria_activos import auditar_clase
+from auditoria_cli import SALIDA_CON_ALERTAS, main
+from generador_datos_activos import generar_datos
+from reglas_auditoria import ALERTA_Z, ALERTA_Z_E_IA
+
+FECHA_REFERENCIA = '2025-06-30'
+
+
+def test_modo_por_lotes_cuenta_alertas_y_respeta_estricto(tmp_path, capsys):
+    datos = generar_datos('maquinarias', 3000, semilla=4)
+    datos.loc[[10, 1500, 2900], 'valor_adquisicion'] *= 50
+    ruta = tmp_path / 'maquinarias.csv'
+    datos.to_csv(ruta, index=False)
+    salida = tmp_path / 'salida'
+
+    codigo = main(['--maquinarias', str(ruta), '--tamano-lote', '700', '--salida', str(salida),
+                   '--fecha-referencia', FECHA_REFERENCIA, '--estricto'])
+
+    # Sin modelo de IA, el modo por lotes cuenta las alertas de Z-score de la auditoría completa
+    completa = auditar_clase('maquinarias', datos.copy(), FECHA_REFERENCIA)
+    esperadas = int(completa['alerta_combinada'].isin([ALERTA_Z, ALERTA_Z_E_IA]).sum())
+    resumen = json.loads((salida / 'resumen.json').read_text(encoding='utf-8'))['clases']['maquinarias']
+    assert esperadas == 3
+    assert resumen['lotes'] == 5
+    assert resumen['alertas'] == esperadas
+    assert codigo == SALIDA_CON_ALERTAS
+    assert f"✅ maquinarias: 3000 registros, {esperadas} alertas" in capsys.readouterr().out
@@ -0,0 +1,48 @@
+# =================================================================
+# INDEXADOR DE INFORMES EN SEGUNDO PLANO
+# =================================================================
+import os
+import time
+
+import busqueda_informes
+from busqueda_informes import IndexadorEnSegundoPlano, IndiceInformes
+
+
+def _esperar_vuelta(indexador, anterior, espera=10):
+    """Resumen de la próxima vuelta del indexador (distinto del objeto `anterior`)."""
+    limite = time.monotonic() + espera
+    while indexador.ultimo_resumen is anterior:
+        assert time.monotonic() < limite, "el indexador no terminó una vuelta"
+        time.sleep(0.01)
+    return indexador.ultimo_resumen
+
+
+def test_pdf_ilegible_no_se_relee_hasta_que_cambia(tmp_path, monkeypatch):
+    directorio = tmp_path / 'informes'
+    directorio.mkdir()
+    roto = directorio / 'informe_roto.pdf'
+    roto.write_bytes(b'no es un pdf')
+    lecturas = []
+
+    def extraer_fallando(ruta, paginas=None):
+        lecturas.append(ruta)
+        raise ValueError("PDF dañado")
+
+    monkeypatch.setattr(busqueda_informes, 'extraer_paginas', extraer_fallando)
+    indexador = IndexadorEnSegundoPlano(IndiceInformes(str(tmp_path / 'indice.sqlite'), str(directorio)),
+                                        intervalo=3600)
+    resumen = _esperar_vuelta(indexador, None)
+    assert resumen['errores'] == ['informe_roto.pdf']
+
+    indexador.solicitar()
+    resumen = _esperar_vuelta(indexador, resumen)
+    assert resumen['omitidos'] == ['informe_roto.pdf'] and not resumen['errores']
+    assert len(lecturas) == 1
+
+    # Al cambiar el archivo se vuelve a intentar
+    roto.write_bytes(b'todavia no es un pdf')
+    os.utime(roto, (time.time() + 5, time.time() + 5))
+    indexador.solicitar()
+    resumen = _esperar_vuelta(indexador, resumen)
+    assert resumen['errores'] == ['informe_roto.pdf']
+    assert len(lecturas) == 2
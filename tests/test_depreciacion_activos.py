@@ -0,0 +1,88 @@
+# =================================================================
+# DEPRECIACIÓN: FORMAS CERRADAS FRENTE A UN CÁLCULO MES A MES
+# =================================================================
+import numpy as np
+import pandas as pd
+import pytest
+
+from depreciacion_activos import (LINEAL, SALDO_DECRECIENTE, UNIDADES_PRODUCIDAS, cronograma, registro_depreciacion,
+                                  valor_libros_al)
+
+
+def _mes_a_mes(activo, meses):
+    """Valor en libros al cierre de cada mes desde el alta, depreciando un mes por vez."""
+    costo, residual, vida = activo['costo'], activo['valor_residual'], activo['vida_util_meses']
+    valor = costo
+    valores = []
+    for mes in range(1, meses + 1):
+        if activo['metodo'] == LINEAL:
+            cuota = (costo - residual) / vida
+        elif activo['metodo'] == SALDO_DECRECIENTE:
+            # Al cumplir la vida útil se deprecia el saldo hasta el residual
+            cuota = valor - residual if mes >= vida else valor * activo['factor'] / vida
+        else:
+            cuota = (costo - residual) * activo['unidades_mensuales'] / activo['unidades_totales']
+        valor -= min(cuota, valor - residual)
+        valores.append(valor)
+    return np.array(valores)
+
+
+REGISTRO = pd.DataFrame({
+    'id': ['L1', 'L2', 'S1', 'S2', 'U1', 'U2'],
+    'costo': [120_000.0, 50_000.0, 80_000.0, 10_000.0, 300_000.0, 40_000.0],
+    'valor_residual': [0.0, 5_000.0, 8_000.0, 0.0, 30_000.0, 0.0],
+    'fecha_inicio': pd.to_datetime(['2020-01-15', '2021-06-30', '2020-03-01', '2022-11-20', '2019-12-31',
+                                    '2021-02-10']),
+    'vida_util_meses': [60.0, 37.0, 48.0, 30.0, 96.0, 24.0],
+    'metodo': [LINEAL, LINEAL, SALDO_DECRECIENTE, SALDO_DECRECIENTE, UNIDADES_PRODUCIDAS, UNIDADES_PRODUCIDAS],
+    'factor': 2.0,
+    'unidades_totales': [np.nan, np.nan, np.nan, np.nan, 500_000.0, 12_000.0],
+    'unidades_mensuales': [np.nan, np.nan, np.nan, np.nan, 4_500.0, 700.0],
+})
+
+
+def test_formas_cerradas_coinciden_con_el_calculo_mes_a_mes():
+    resultado = cronograma(REGISTRO, '2019-12', '2031-12')
+    meses = resultado['meses']
+    for fila, activo in REGISTRO.iterrows():
+        alta = pd.Period(activo['fecha_inicio'], 'M')
+        desde = meses.get_loc(alta)
+        esperado = _mes_a_mes(activo, len(meses) - desde)
+        np.testing.assert_allclose(resultado['valor_libros'][fila, desde:], esperado, rtol=1e-9, atol=1e-6)
+        # Antes del alta no hay depreciación y el activo vale su costo
+        np.testing.assert_array_equal(resultado['depreciacion'][fila, :desde], 0.0)
+        np.testing.assert_allclose(resultado['depreciacion'][fila, desde:],
+                                   -np.diff(np.concatenate([[activo['costo']], esperado])), atol=1e-6)
+
+    # valor_libros_al toma el cierre del mes de la fecha
+    al = valor_libros_al(REGISTRO, '2023-05-17')
+    np.testing.assert_allclose(al.to_numpy(), resultado['valor_libros'][:, meses.get_loc(pd.Period('2023-05', 'M'))])
+
+
+def test_inmuebles_sin_vida_util_o_sin_alta_quedan_nan():
+    df = pd.DataFrame({
+        'id_inmueble': ['A', 'B', 'C'],
+        'valor_adquisicion': [1_000_000.0, 2_000_000.0, 3_000_000.0],
+        'fecha_adquisicion': pd.to_datetime(['2010-01-01', None, '2015-06-01']),
+    })
+    registro = registro_depreciacion('inmuebles', df)
+    assert registro['vida_util_meses'].isna().all()
+    assert valor_libros_al(registro, '2024-12-31').isna().all()
+
+    df['fecha_fin_vida_util'] = pd.to_datetime(['2060-01-01', '2070-01-01', None])
+    valores = valor_libros_al(registro_depreciacion('inmuebles', df), '2024-12-31')
+    assert valores.notna().tolist() == [True, False, False]
+
+
+def test_unidades_producidas_requiere_las_columnas_de_unidades():
+    df = pd.DataFrame({'id_equipo': ['M1'], 'valor_adquisicion': [100.0],
+                       'fecha_adquisicion': pd.to_datetime(['2020-01-01']),
+                       'fecha_fin_vida_util': pd.to_datetime(['2030-01-01'])})
+    with pytest.raises(ValueError, match='unidades_totales'):
+        registro_depreciacion('maquinarias', df, metodo=UNIDADES_PRODUCIDAS)
+
+    df['unidades_totales'] = 1_000.0
+    df['unidades_mensuales'] = 10.0
+    registro = registro_depreciacion('maquinarias', df, metodo=UNIDADES_PRODUCIDAS)
+    # 2020-01 a 2020-12 inclusive: 12 meses de 10 unidades sobre 1000
+    assert valor_libros_al(registro, '2020-12-31').iloc[0] == pytest.approx(100.0 * (1 - 120 / 1_000))
@@ -0,0 +1,97 @@
+# =================================================================
+# DETECCIÓN DE ACTIVOS DUPLICADOS
+# =================================================================
+import numpy as np
+import pandas as pd
+
+from duplicados_activos import codigos_alfanumericos, detectar_duplicados, normalizar_texto
+
+
+def _maquinarias(semilla=3, n=400):
+    rng = np.random.default_rng(semilla)
+    tipos = rng.choice(['Camión', 'Grúa', 'Excavadora'], n)
+    marcas = rng.choice(['Scania', 'Volvo', 'Caterpillar', 'Komatsu'], n)
+    return pd.DataFrame({
+        'id_equipo': [f"EQ-{k:05d}" for k in range(n)],
+        'tipo_equipo': tipos,
+        'descripcion': [f"{t} {m} modelo {l}{c}U-{k:04d}" for t, m, l, c, k in
+                        zip(tipos, marcas, rng.choice(list('ABCDEFGHJK'), n), rng.choice(list('XYZ'), n),
+                            rng.integers(0, 10_000, n))],
+        'valor_adquisicion': rng.uniform(10_000, 500_000, n).round(2),
+    })
+
+
+def _duplicar(df, filas, cambios):
+    copias = df.iloc[filas].copy()
+    for columna, funcion in cambios.items():
+        copias[columna] = funcion(copias[columna])
+    copias.iloc[:, 0] = [f"{clave}-B" for clave in copias.iloc[:, 0]]
+    return pd.concat([df, copias], ignore_index=True)
+
+
+def test_codigos_alfanumericos():
+    codigos = codigos_alfanumericos(pd.Series(["Camión modelo KEU-4937", "Grúa 3 ejes Nº 12/B", "Sin código"]))
+    assert codigos.tolist() == ['keu4937', '3 12b', '']
+
+
+def test_normalizar_texto_unifica_abreviaturas_y_quita_el_tipo():
+    textos = normalizar_texto(pd.Series(["Avenida Colón N° 1.200, Piso 3", "Av. Colon nro 1200 p 3",
+                                         "Camión Scania modelo R450"]),
+                              pd.Series(['Oficina', 'Oficina', 'Camión']))
+    assert textos[0] == textos[1]
+    assert 'camion' not in textos[2].split()
+
+
+def test_copias_inyectadas_se_agrupan():
+    df = _maquinarias()
+    originales = [5, 40, 41, 300]
+    df = _duplicar(df, originales, {
+        'descripcion': lambda s: s.str.upper() + '.',
+        'valor_adquisicion': lambda s: s * 1.005,
+    })
+    resultado = detectar_duplicados(df, 'maquinarias')
+    marcados = set(np.flatnonzero(resultado['is_anomaly_duplicado'].to_numpy() == -1))
+    copias = range(len(df) - len(originales), len(df))
+    assert marcados == set(originales) | set(copias)
+    for original, copia in zip(originales, copias):
+        assert resultado['grupo_duplicado'].iloc[copia] == df['id_equipo'].iloc[original]
+        assert resultado['grupo_duplicado'].iloc[original] == df['id_equipo'].iloc[original]
+    assert resultado['grupo_duplicado'].drop(index=list(marcados)).isna().all()
+
+
+def test_maquinarias_con_otro_codigo_o_fuera_de_tolerancia_no_son_duplicados():
+    base = {'tipo_equipo': 'Camión', 'descripcion': "Camión Scania modelo KEU-4937", 'valor_adquisicion': 100_000.0}
+    df = pd.DataFrame([
+        {**base, 'id_equipo': 'A'},
+        {**base, 'id_equipo': 'B', 'descripcion': "Camión Scania modelo EEU-4937"},
+        {**base, 'id_equipo': 'C', 'valor_adquisicion': 102_000.0},
+        {**base, 'id_equipo': 'D', 'valor_adquisicion': 100_900.0},
+    ])
+    resultado = detectar_duplicados(df, 'maquinarias')
+    assert resultado['is_anomaly_duplicado'].tolist() == [-1, 1, 1, -1]
+    assert resultado['grupo_duplicado'].tolist()[::3] == ['A', 'A']
+    assert resultado['grupo_duplicado'].iloc[1:3].isna().all()
+    # Con una tolerancia mayor entra el 2 %
+    ampliada = detectar_duplicados(df, 'maquinarias', tolerancia=0.03)
+    assert ampliada['is_anomaly_duplicado'].tolist() == [-1, 1, -1, -1]
+
+
+def test_inmuebles_con_otra_altura_no_son_duplicados():
+    df = pd.DataFrame({
+        'id_inmueble': ['I1', 'I2', 'I3', 'I4', 'I5'],
+        'tipo_inmueble': ['Oficina'] * 5,
+        'direccion': ["Av. 7 N° 17, Piso 2", "Avenida 7 nro 17 piso 2", "Av. 8 N° 17, Piso 2",
+                      "Av. 7 N° 17, Piso 2", "Calle Mitre 450"],
+        'superficie_m2': [120.0, 120.2, 120.0, 125.0, 120.0],
+    })
+    resultado = detectar_duplicados(df, 'inmuebles')
+    assert resultado['is_anomaly_duplicado'].tolist() == [-1, -1, 1, 1, 1]
+    assert resultado['grupo_duplicado'].iloc[:2].tolist() == ['I1', 'I1']
+    assert resultado['grupo_duplicado'].iloc[2:].isna().all()
+
+
+def test_menos_de_dos_filas():
+    df = _maquinarias(n=1)
+    resultado = detectar_duplicados(df, 'maquinarias')
+    assert resultado['is_anomaly_duplicado'].tolist() == [1]
+    assert resultado.index.equals(df.index)
@@ -0,0 +1,51 @@
+# =================================================================
+# T-DIGEST: ERROR DE LOS CUANTILES Y COMBINACIÓN DE PARTICIONES
+# =================================================================
+import numpy as np
+import pytest
+
+from estadisticos_activos import COMPRESION, TDigest
+
+CUANTILES = np.array([0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999])
+
+
+def _error_de_rango(digest, valores):
+    """|rango real del cuantil estimado - q| para cada q de CUANTILES."""
+    ordenados = np.sort(valores)
+    return np.abs(np.searchsorted(ordenados, digest.cuantil(CUANTILES)) / len(valores) - CUANTILES)
+
+
+@pytest.fixture(scope='module')
+def valores():
+    # Cola pesada, como los valores de adquisición
+    return np.random.default_rng(7).lognormal(14, 0.9, 300_000)
+
+
+@pytest.mark.parametrize('lote', [50, 5_000, 300_000])
+def test_error_de_los_cuantiles(valores, lote):
+    digest = TDigest()
+    for inicio in range(0, len(valores), lote):
+        digest.actualizar(valores[inicio:inicio + lote])
+
+    assert digest.n == len(valores)
+    assert len(digest.medias) <= COMPRESION + 10
+    error = _error_de_rango(digest, valores)
+    colas = (CUANTILES <= 0.01) | (CUANTILES >= 0.99)
+    assert error[colas].max() < 5e-4
+    assert error.max() < 2e-3
+    # En la cola la densidad es baja: el valor del p99,9 también tiene que quedar cerca
+    assert digest.cuantil(0.999) == pytest.approx(np.quantile(valores, 0.999), rel=0.01)
+
+
+def test_combinar_particiones_equivale_a_resumir_todo(valores):
+    completo = TDigest().actualizar(valores)
+    combinado = TDigest()
+    for particion in np.array_split(valores, 12):
+        # Cada partición se guarda y se vuelve a leer, como los resúmenes diarios
+        combinado.combinar(TDigest.desde_dict(TDigest().actualizar(particion).a_dict()))
+
+    assert combinado.n == completo.n == len(valores)
+    assert (combinado.minimo, combinado.maximo) == (valores.min(), valores.max())
+    np.testing.assert_allclose(combinado.cuantil(CUANTILES), completo.cuantil(CUANTILES), rtol=0.01)
+    assert _error_de_rango(combinado, valores).max() < 2e-3
+    assert combinado.mad() == pytest.approx(completo.mad(), rel=0.01)
@@ -0,0 +1,89 @@
+# =================================================================
+# ÍNDICE DE PRECIO POR M² DE INMUEBLES
+# =================================================================
+import numpy as np
+import pandas as pd
+import pytest
+
+from estadisticos_activos import FACTOR_MAD
+from indice_precio_m2 import (MIN_CELDA, NIVEL_CELDA, NIVEL_UBICACION_TIPO, IndicePrecioM2, anio_adquisicion,
+                              precio_m2)
+
+
+def _inmuebles(semilla=5):
+    rng = np.random.default_rng(semilla)
+    celdas = [('Córdoba', 'Oficina', 2018, 80), ('Córdoba', 'Oficina', 2019, 60), ('Córdoba', 'Galpón', 2018, 70),
+              ('Rosario', 'Oficina', 2019, 90), ('Rosario', 'Oficina', 2020, 12), ('Rosario', 'Galpón', 2020, 50)]
+    filas = []
+    for ubicacion, tipo, anio, n in celdas:
+        base = {'Oficina': 2_000.0, 'Galpón': 600.0}[tipo] * (1.5 if ubicacion == 'Rosario' else 1.0)
+        superficie = rng.uniform(50, 500, n)
+        filas.append(pd.DataFrame({
+            'ubicacion': ubicacion, 'tipo_inmueble': tipo,
+            'fecha_adquisicion': pd.to_datetime([f"{anio}-{m:02d}-15" for m in rng.integers(1, 13, n)]),
+            'superficie_m2': superficie,
+            'valor_adquisicion': superficie * base * rng.lognormal(0, 0.15, n),
+        }))
+    return pd.concat(filas, ignore_index=True)
+
+
+def _referencia(df, claves):
+    """Mediana y escala (MAD / 0,6745) de log(precio/m²) por grupo, con pandas."""
+    x = np.log(precio_m2(df['valor_adquisicion'], df['superficie_m2']))
+    grupos = pd.Series(x, index=df.index).groupby([df[c] for c in claves])
+    mediana = grupos.median()
+    mad = pd.Series(np.abs(x - mediana.reindex(pd.MultiIndex.from_frame(df[claves])).to_numpy()),
+                    index=df.index).groupby([df[c] for c in claves]).median()
+    return mediana, mad / FACTOR_MAD
+
+
+def test_referencias_por_celda_y_nivel_siguiente():
+    df = _inmuebles()
+    df['anio_adquisicion'] = anio_adquisicion(df['fecha_adquisicion']).astype(int)
+    tabla = IndicePrecioM2.construir(df).tabla().set_index(['ubicacion', 'tipo_inmueble', 'anio_adquisicion'])
+
+    mediana, escala = _referencia(df, ['ubicacion', 'tipo_inmueble', 'anio_adquisicion'])
+    for celda, n in df.groupby(['ubicacion', 'tipo_inmueble', 'anio_adquisicion']).size().items():
+        fila = tabla.loc[celda]
+        if n >= MIN_CELDA:
+            assert fila['nivel'] == NIVEL_CELDA and fila['inmuebles'] == n
+            assert np.log(fila['precio_m2_mediana']) == pytest.approx(mediana[celda], abs=1e-5)
+            assert fila['escala_log'] == pytest.approx(escala[celda], rel=1e-5)
+
+    # Rosario × Oficina × 2020 tiene 12 inmuebles: toma la referencia de Rosario × Oficina
+    mediana_ut, escala_ut = _referencia(df, ['ubicacion', 'tipo_inmueble'])
+    fila = tabla.loc[('Rosario', 'Oficina', 2020)]
+    assert fila['nivel'] == NIVEL_UBICACION_TIPO
+    assert np.log(fila['precio_m2_mediana']) == pytest.approx(mediana_ut[('Rosario', 'Oficina')], abs=1e-5)
+    assert fila['escala_log'] == pytest.approx(escala_ut[('Rosario', 'Oficina')], rel=1e-5)
+
+
+def test_marca_precios_atipicos():
+    df = _inmuebles()
+    df.loc[[3, 150], 'valor_adquisicion'] *= 3
+    df.loc[300, 'valor_adquisicion'] *= 0.3
+    evaluados = IndicePrecioM2.construir(df).evaluar(df)
+    assert set(np.flatnonzero(evaluados['is_anomaly_precio_m2'] == -1)) >= {3, 150, 300}
+    assert (evaluados['is_anomaly_precio_m2'] == -1).mean() < 0.02
+
+
+def test_evaluar_uno_y_guardado_coinciden_con_evaluar(tmp_path):
+    df = _inmuebles()
+    indice = IndicePrecioM2.construir(df)
+    nuevos = pd.DataFrame({
+        'ubicacion': ['Córdoba', 'Mendoza', 'Rosario', 'Córdoba', 'Rosario'],
+        'tipo_inmueble': ['Oficina', 'Oficina', 'Local', 'Galpón', 'Galpón'],
+        'fecha_adquisicion': pd.to_datetime(['2018-03-01', '2019-01-01', '2020-05-05', None, '2031-01-01']),
+        'valor_adquisicion': [400_000.0, 500_000.0, 90_000.0, 60_000.0, 80_000.0],
+        'superficie_m2': [200.0, 250.0, 0.0, 100.0, 90.0],
+    })
+    esperado = indice.evaluar(nuevos)
+    anios = anio_adquisicion(nuevos['fecha_adquisicion'])
+    for i, fila in nuevos.iterrows():
+        uno = indice.evaluar_uno(fila['ubicacion'], fila['tipo_inmueble'], anios[i], fila['valor_adquisicion'],
+                                 fila['superficie_m2'])
+        for columna, valor in uno.items():
+            np.testing.assert_allclose(valor, esperado.at[i, columna], rtol=1e-6, err_msg=columna)
+
+    cargado = IndicePrecioM2.cargar(indice.guardar(tmp_path / 'indice.npz'))
+    pd.testing.assert_frame_equal(cargado.evaluar(nuevos), esperado)
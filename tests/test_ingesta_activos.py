@@ -0,0 +1,27 @@
+# =================================================================
+# CACHÉ PARQUET DE LAS EXPORTACIONES DEL ERP
+# =================================================================
+import os
+
+import pytest
+
+from generador_datos_activos import generar_datos
+from ingesta_activos import ErrorValidacionDatos, cargar_activos, ruta_cache
+
+
+def test_opciones_del_lector_forman_parte_de_la_clave(tmp_path):
+    ruta = tmp_path / 'maquinarias.csv'
+    datos = generar_datos('maquinarias', 50, semilla=2)
+    datos.to_csv(ruta, sep=';', index=False)
+    cache = tmp_path / 'cache'
+
+    assert ruta_cache(ruta, 'maquinarias', cache) != ruta_cache(ruta, 'maquinarias', cache, separador=';')
+
+    df = cargar_activos(ruta, 'maquinarias', cache, separador=';')
+    assert len(df) == len(datos)
+    assert os.path.exists(ruta_cache(ruta, 'maquinarias', cache, separador=';'))
+
+    # Con la coma el archivo no trae las columnas del esquema: no debe servirse el Parquet de antes
+    with pytest.raises(ErrorValidacionDatos):
+        cargar_activos(ruta, 'maquinarias', cache)
+    assert not [f for f in os.listdir(cache) if f.endswith('.tmp')]
@@ -0,0 +1,50 @@
+# =================================================================
+# REUTILIZACIÓN DE MODELOS DEL REGISTRO
+# =================================================================
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from auditoria_activos import auditar_inmuebles
+from generador_datos_activos import generar_datos
+from modelos_anomalias import RegistroModelos
+
+FECHA_REFERENCIA = '2025-06-30'
+
+
+def test_segunda_auditoria_de_inmuebles_carga_el_modelo(tmp_path, monkeypatch):
+    datos = generar_datos('inmuebles', 2000, semilla=5)
+    assert 'fecha_fin_vida_util' not in datos.columns  # la vida útil se simula al preparar
+
+    primera = auditar_inmuebles(datos.copy(), FECHA_REFERENCIA, registro_modelos=RegistroModelos(tmp_path))
+    guardados = sorted(os.listdir(tmp_path))
+    assert len([f for f in guardados if f.endswith('.joblib')]) == 1
+
+    # Otra ejecución (registro nuevo sobre el mismo directorio) no debe volver a ajustar
+    def fit_prohibido(self, *args, **kwargs):
+        pytest.fail("El registro reajustó un modelo con la misma huella")
+
+    monkeypatch.setattr(IsolationForest, 'fit', fit_prohibido)
+    segunda = auditar_inmuebles(datos.copy(), FECHA_REFERENCIA, registro_modelos=RegistroModelos(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == guardados
+    np.testing.assert_array_equal(primera['is_anomaly_ia'], segunda['is_anomaly_ia'])
+
+
+def test_modelo_sin_metadatos_se_reajusta(tmp_path):
+    features = generar_datos('maquinarias', 500, semilla=3)[['valor_adquisicion']]
+    registro = RegistroModelos(tmp_path)
+    registro.obtener_modelo('maquinarias', features)
+    clave = registro.clave_ultimo('maquinarias')
+
+    # Un proceso interrumpido entre el .json y el .joblib (o un .json borrado) no deja un modelo a medias
+    os.remove(tmp_path / f"{clave}.json")
+    assert RegistroModelos(tmp_path).cargar(clave) is None
+
+    otro = RegistroModelos(tmp_path)
+    otro.obtener_modelo('maquinarias', features)
+    assert otro.clave_ultimo('maquinarias') == clave
+    assert os.path.exists(tmp_path / f"{clave}.json")
+    assert otro.cargar(clave) is not None
+    assert not [f for f in os.listdir(tmp_path) if f.endswith('.tmp')]
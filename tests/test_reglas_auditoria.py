@@ -0,0 +1,97 @@
+# =================================================================
+# EQUIVALENCIA DE LAS REGLAS VECTORIZADAS CON LAS VERSIONES POR FILA
+# =================================================================
+# Las versiones por fila son las df.apply(lambda row: ...) que tenían las
+# funciones auditar_* antes de vectorizarlas. El reloj queda fijo en
+# FECHA_REFERENCIA para que ambas vean la misma fecha.
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.tseries.offsets import DateOffset
+
+from auditoria_activos import preparar_intangibles, preparar_inmuebles, vida_util_simulada
+from reglas_auditoria import clasificar_alerta_combinada, clasificar_resultado, sumar_anios, minimo_por_fila
+
+FECHA_REFERENCIA = datetime(2025, 6, 30)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+def alerta_combinada_por_fila(df, umbral_z):
+    return df.apply(lambda row: 'Z-score alto y Anomalía IA' if (
+                abs(row['valor_adquisicion_zscore']) > umbral_z and row['is_anomaly_ia'] == -1) else (
+        'Z-score alto' if abs(row['valor_adquisicion_zscore']) > umbral_z else (
+            'Anomalía IA' if row['is_anomaly_ia'] == -1 else 'Sin alerta')), axis=1)
+
+
+def resultado_por_fila(df):
+    resultado = pd.Series('Normal', index=df.index, dtype=object)
+    resultado[(df['is_anomaly_zscore'] == -1) & (df['is_anomaly_ia'] == -1)] = 'Anomalía Z-score e IA'
+    resultado[(df['is_anomaly_zscore'] == -1) & (df['is_anomaly_ia'] != -1)] = 'Anomalía Z-score'
+    resultado[(df['is_anomaly_zscore'] != -1) & (df['is_anomaly_ia'] == -1)] = 'Anomalía IA'
+    return resultado
+
+
+def test_alerta_combinada(rng):
+    df = pd.DataFrame({'valor_adquisicion_zscore': rng.normal(0, 2, 5000),
+                       'is_anomaly_ia': rng.choice([-1, 1], 5000)})
+    df.loc[:9, 'valor_adquisicion_zscore'] = [2.5, -2.5, 2.5000001, -2.5000001, 0, np.nan, np.inf, -np.inf, 3, -3]
+    for umbral_z in (2.5, 1.0):
+        esperado = alerta_combinada_por_fila(df, umbral_z).to_numpy()
+        obtenido = clasificar_alerta_combinada(df['valor_adquisicion_zscore'], df['is_anomaly_ia'], umbral_z)
+        assert (obtenido == esperado).all()
+
+
+def test_resultado(rng):
+    df = pd.DataFrame({'is_anomaly_zscore': rng.choice([-1, 1], 5000), 'is_anomaly_ia': rng.choice([-1, 1], 5000)})
+    obtenido = clasificar_resultado(df['is_anomaly_zscore'], df['is_anomaly_ia'])
+    assert (obtenido == resultado_por_fila(df).to_numpy()).all()
+
+
+def test_sumar_anios(rng):
+    fechas = pd.Series(pd.to_datetime('1950-01-01') + pd.to_timedelta(rng.integers(0, 27_000, 3000), unit='D')
+                       + pd.to_timedelta(rng.integers(0, 86_400, 3000), unit='s'))
+    # 29 de febrero hacia años bisiestos y no bisiestos, y fin de mes
+    fechas[:4] = pd.to_datetime(['2020-02-29', '2020-02-29', '2000-02-29', '2019-01-31'])
+    fechas[2] += pd.Timedelta(hours=13, minutes=45)
+    anios = rng.integers(50, 100, len(fechas))
+    anios[:4] = [1, 4, 99, 1]
+    df = pd.DataFrame({'fecha_adquisicion': fechas, 'anios': anios})
+    esperado = df.apply(lambda row: row['fecha_adquisicion'] + DateOffset(years=int(row['anios'])), axis=1)
+    obtenido = pd.Series(sumar_anios(df['fecha_adquisicion'], df['anios']))
+    assert (obtenido == esperado.astype(obtenido.dtype)).all()
+    assert obtenido[0] == pd.Timestamp('2021-02-28')
+    assert obtenido[1] == pd.Timestamp('2024-02-29')
+
+
+def test_minimo_por_fila(rng):
+    df = pd.DataFrame({
+        'costo_adquisicion': rng.uniform(50_000, 2_000_000, 3000).round(2),
+        'vida_util_anios': rng.integers(0, 20, 3000).astype(float),
+        'amortizacion_acumulada_simulada': rng.uniform(0, 500_000, 3000).round(2),
+        'valor_neto_contable_simulado': rng.uniform(0, 2_000_000, 3000).round(2),
+        'fecha_adquisicion': pd.to_datetime('2000-01-01') + pd.to_timedelta(rng.integers(0, 9000, 3000), unit='D'),
+    })
+    df = preparar_intangibles(df, FECHA_REFERENCIA)
+    esperado = df.apply(
+        lambda row: min(row['costo_adquisicion'], row['amortizacion_anual_calculada'] * row['anios_transcurridos']),
+        axis=1)
+    np.testing.assert_array_equal(df['amortizacion_acumulada_esperada'].to_numpy(), esperado.to_numpy())
+    # Un NaN en el segundo argumento no se propaga, igual que min()
+    assert minimo_por_fila([1.0, 2.0], [np.nan, 1.0]).tolist() == [1.0, 1.0]
+
+
+def test_vida_util_inmuebles_reproducible():
+    df = pd.DataFrame({'id_inmueble': [f'INM-{i:05d}' for i in range(2000)],
+                       'fecha_adquisicion': pd.to_datetime('2010-03-15')})
+    primera = preparar_inmuebles(df.copy(), FECHA_REFERENCIA)
+    segunda = preparar_inmuebles(df.iloc[::-1].copy(), FECHA_REFERENCIA).sort_index()
+    pd.testing.assert_series_equal(primera['fecha_fin_vida_util'], segunda['fecha_fin_vida_util'])
+    anios = vida_util_simulada(df)
+    assert anios.min() >= 50 and anios.max() < 100
+    assert len(np.unique(anios)) == 50
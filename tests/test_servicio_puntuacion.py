@@ -0,0 +1,64 @@
+# =================================================================
+# FEATURES DEL SERVICIO DE PUNTUACIÓN IGUALES A LAS DE LA AUDITORÍA
+# =================================================================
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from auditoria_activos import (preparar_maquinarias, preparar_inmuebles, features_maquinarias, features_inmuebles,
+                               resolver_fecha_referencia)
+from generador_datos_activos import generar_datos
+from servicio_puntuacion import features_registros
+
+FECHA_REFERENCIA = resolver_fecha_referencia('2025-06-30')
+
+
+def _registros(clase, n=400):
+    """Registros JSON como los que manda el ERP, con fechas, superficies e ids faltantes."""
+    df = generar_datos(clase, n, semilla=3, compacto=False)
+    if clase == 'inmuebles':
+        df['fecha_fin_vida_util'] = pd.to_datetime(df['fecha_adquisicion']) + pd.DateOffset(years=60)
+        df.loc[::5, 'superficie_m2'] = np.nan
+    registros = json.loads(df.to_json(orient='records', date_format='iso'))
+    for posicion, registro in enumerate(registros):
+        if posicion % 3 == 0:
+            registro.pop('fecha_fin_vida_util', None)
+        if posicion % 7 == 0:
+            registro['fecha_adquisicion'] = None
+        if posicion % 11 == 0:
+            registro['fecha_fin_vida_util'] = '2099-02-29x'  # fecha inválida
+    return registros
+
+
+def _features_auditoria(clase, registros):
+    """Features con preparar_* + features_* de la auditoría.
+
+    Los registros con y sin el campo fecha_fin_vida_util van en exportaciones
+    separadas, como los trata el servicio.
+    """
+    preparar = {'maquinarias': preparar_maquinarias, 'inmuebles': preparar_inmuebles}[clase]
+    features = np.full((len(registros), 4 if clase == 'inmuebles' else 3), np.nan)
+    con_campo = np.array(['fecha_fin_vida_util' in registro for registro in registros])
+    for filas in (np.flatnonzero(con_campo), np.flatnonzero(~con_campo)):
+        df = pd.DataFrame([registros[i] for i in filas])
+        for columna in ('fecha_adquisicion', 'fecha_fin_vida_util'):
+            if columna in df.columns:
+                df[columna] = pd.to_datetime(df[columna], format='ISO8601', errors='coerce', utc=True).dt.tz_localize(None)
+        if clase == 'maquinarias':
+            df['fecha_fin_vida_util'] = df.get('fecha_fin_vida_util', pd.NaT)
+            features[filas] = features_maquinarias(preparar(df, FECHA_REFERENCIA))
+        else:
+            # Sin medianas: los faltantes quedan en NaN, como en features_registros
+            features[filas] = features_inmuebles(preparar(df, FECHA_REFERENCIA), pd.Series(np.nan, index=['x']))
+    features[~np.isfinite(features)] = np.nan
+    return features
+
+
+@pytest.mark.parametrize('clase', ['maquinarias', 'inmuebles'])
+def test_features_iguales_a_la_auditoria(clase):
+    registros = _registros(clase)
+    esperado = _features_auditoria(clase, registros)
+    obtenido = features_registros(clase, registros, FECHA_REFERENCIA)
+    np.testing.assert_array_equal(obtenido, esperado)